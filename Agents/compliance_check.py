@@ -1,62 +1,39 @@
-from typing import List
-from pinecone import Pinecone, ServerlessSpec
+from typing import List, Optional
 import time
 import json
-from google import generativeai as genai
-from google.generativeai import GenerativeModel, configure
 from langchain.prompts import PromptTemplate
-import os
 from dotenv import load_dotenv
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+from PreProcessing.llmCache import generate_text, parse_json_response
+from embedding.namespaces import DEFAULT_NAMESPACE
+from embedding.retrieval import retrieve_for_agents
 
 load_dotenv()
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-gemani_api_key = os.getenv("API_KEY")
-
-pc = Pinecone(api_key=pinecone_api_key)
-client = genai.configure(api_key=gemani_api_key)
 
 # Define checkpoint keywords for compliance checks
-CHECKPOINT_KEYWORDS = [
-    "Registration",
-    "Certification",
-    "Experience",
-    "Compliance",
-    "Eligibility",
-    "Audit",
-    "Security",
-    "Turnover",
-    "GST"
-]
-
-def run_compliance_check(COMPANY_DATA: dict ):
+CHECKPOINT_KEYWORDS = KEYWORD_TAXONOMY["compliance"]
+
+# Registration/certification checks hinge on exact identifiers (SAM.gov, CAGE, DUNS),
+# so BM25 gets as much say as the dense score
+DENSE_WEIGHT = 0.5
+
+# Query spec for the shared retrieval stage (embedding.retrieval.retrieve_for_agents)
+RETRIEVAL_QUERY = {"query_text": " ".join(CHECKPOINT_KEYWORDS), "top_k": 3, "dense_weight": DENSE_WEIGHT}
+
+def run_compliance_check(COMPANY_DATA: dict, namespace: str = DEFAULT_NAMESPACE, retrieved: Optional[dict] = None):
     """_summary_
 
     Args:
         COMPANY_DATA (dict): _description_
+        namespace (str): Namespace holding the RFP's chunks, see embedding.namespaces.document_namespace
+        retrieved (dict): This agent's result from retrieve_for_agents; retrieved here when not given
     """    
     
-    index_name_input = "eligibledocone"  # User uploaded RFP document
-    index_input = pc.Index(index_name_input)
-    keyword_query = " ".join(CHECKPOINT_KEYWORDS)
-    
-    print("🔍 Embedding compliance query...")
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
-
     # Retrieve more chunks from the RFP document to ensure we capture all requirements
-    print("📄 Retrieving relevant RFP sections...")
-    top_pdf_chunks = index_input.query(
-        namespace="ns",
-        vector=query_vector,
-        top_k=3,  # Increased to retrieve more relevant sections
-        include_values=False,
-        include_metadata=True
-    )
+    if retrieved is None:
+        print("📄 Retrieving relevant RFP sections...")
+        retrieved = retrieve_for_agents({"compliance": RETRIEVAL_QUERY}, namespace)["compliance"]
+    top_pdf_chunks = retrieved
 
     # Build pdf context with metadata
     pdf_context = "\n\n".join([
@@ -131,23 +108,16 @@ Note:- Note give any extra out like ```json`` or anything else, just return the
     # Run Gemini LLM with structured output format
     print("🧠LLM cooking compliance analysis...")
 
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.3,  # Lower temperature for more factual output
             "top_p": 0.95,
             "max_output_tokens": 1500  # Increased token limit for more detailed analysis
-        }
+        },
+        prompt=prompt,
+        validate=parse_json_response
     )
-
-    response = model.generate_content(prompt)
-    if hasattr(response, 'text'):
-            content = response.text
-    elif hasattr(response, 'parts') and len(response.parts) > 0:
-        content = response.parts[0].text
-    else:
-        # Direct access for newer Gemini API versions
-        content = str(response.candidates[0].content.parts[0].text)
         
     
     # Clean up the content by removing markdown code block markers
@@ -1,70 +1,44 @@
-from typing import List
+from typing import List, Optional
 import json
-from google import generativeai as genai
-from google.generativeai import GenerativeModel, configure
 from langchain.prompts import PromptTemplate
-import os
-from pinecone import Pinecone
 from dotenv import load_dotenv
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+from PreProcessing.llmCache import generate_text, parse_json_response
+from PreProcessing import resources
+from embedding.hybridSearch import hybrid_query
+from embedding.namespaces import DEFAULT_NAMESPACE
+from embedding.providers import embed_queries_cached, index_name_for
+from embedding.retrieval import retrieve_for_agents
+from embedding.vectorStore import get_index
 
 load_dotenv()
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-gemani_api_key = os.getenv("API_KEY")
-
-pc = Pinecone(api_key=pinecone_api_key)
-client = genai.configure(api_key=gemani_api_key)
 
 # Load your single vector database for contract documents
 index_name = "eligibledocone"  # Single index containing contract documents
-index = pc.Index(index_name)
+index = resources.lazy(f"index:{index_name}", lambda: get_index(index_name_for(index_name)))
 
 # Keywords focused on potentially risky contract clauses
-RISK_KEYWORDS = [
-    "Terminate",
-    "Liability",
-    "Indemnity",
-    "Warranty",
-    "Damages",
-    "Penalty",
-    "Unilateral",
-    "Amendment",
-    "Obligation",
-    "Exclusive",
-    "Jurisdiction",
-    "Force Majeure",
-    "Non-compete",
-    "Payment terms",
-    "Intellectual property"
-]
-
-def analyze_contract_risks(COMPANY_DATA: dict) :
+RISK_KEYWORDS = KEYWORD_TAXONOMY["risk"]
+
+# Risky clauses are paraphrased more than named, so lean on the dense score
+DENSE_WEIGHT = 0.7
+
+# Query spec for the shared retrieval stage (embedding.retrieval.retrieve_for_agents)
+RETRIEVAL_QUERY = {"query_text": " ".join(RISK_KEYWORDS), "top_k": 3, "dense_weight": DENSE_WEIGHT}
+
+def analyze_contract_risks(COMPANY_DATA: dict, namespace: str = DEFAULT_NAMESPACE, retrieved: Optional[dict] = None) :
     """_summary_
 
     Args:
         COMPANY_DATA (dict): _description_
+        namespace (str): Namespace holding the RFP's chunks, see embedding.namespaces.document_namespace
+        retrieved (dict): This agent's result from retrieve_for_agents; retrieved here when not given
     """    
-    # Create keyword query string for better retrieval
-    keyword_query = " ".join(RISK_KEYWORDS)
-    index_name = "eligibledocone"  # Single index containing contract documents
-    index = pc.Index(index_name)
-    print("🔍 Embedding contract risk query...")
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
-
     # Retrieve contract document sections focused on risk areas
-    print("📄 Retrieving high-risk sections from contract...")
-    risk_chunks = index.query(
-        namespace="ns",
-        vector=query_vector,
-        top_k=3,
-        include_values=False,
-        include_metadata=True
-    )
+    if retrieved is None:
+        print("📄 Retrieving high-risk sections from contract...")
+        retrieved = retrieve_for_agents({"risk": RETRIEVAL_QUERY}, namespace)["risk"]
+    risk_chunks = retrieved
 
     # Build context with metadata
     contract_context = "\n\n".join([
@@ -127,24 +101,24 @@ Identify exactly 3 clauses from the contract that may be biased or disadvantageo
     # Run Gemini LLM
     print("🧠 Analyzing contract risks and identifying biased clauses...")
 
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest", #gemini-1.5-pro-latest
         generation_config={
             "temperature": 0.2,
             "top_p": 0.9,
             "max_output_tokens": 1500
-        }
+        },
+        prompt=prompt,
+        validate=parse_json_response
     )
-
-    response = model.generate_content(prompt)
     
 
         # Parse the JSON response
-    result = response.text
+    result = content
     print("✅ Contract risk analysis completed")
     return result
 
-def generate_balanced_clause(original_clause, clause_type):
+def generate_balanced_clause(original_clause, clause_type, namespace: str = DEFAULT_NAMESPACE):
     """
     Generates a balanced alternative clause based on the original problematic clause
     and reference sections from the same contract
@@ -156,21 +130,15 @@ def generate_balanced_clause(original_clause, clause_type):
     
     # Create embedding for the combined keywords
     keyword_query = " ".join(reference_keywords)
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
+    query_vector = embed_queries_cached([keyword_query])[0]
     
     # Get additional relevant sections from the same index
-    reference_data = index.query(
-        namespace="ns",
-        vector=query_vector,
+    reference_data = hybrid_query(
+        index, index_name_for(index_name), namespace,
+        query_text=keyword_query,
+        query_vector=query_vector,
         top_k=3,
-        include_values=False,
-        include_metadata=True
+        dense_weight=DENSE_WEIGHT
     )
     
     reference_context = "\n\n".join([match['metadata'].get('chunk', '') for match in reference_data['matches']])
@@ -210,25 +178,16 @@ Return just the drafted clause text without additional comments.
     )
     
     # Run Gemini LLM
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.3,
             "top_p": 0.95,
             "max_output_tokens": 800
-        }
+        },
+        prompt=prompt
     )
-    response = model.generate_content(prompt)
     try:
-        # Extract content from response
-        if hasattr(response, 'text'):
-            content = response.text
-        elif hasattr(response, 'parts') and len(response.parts) > 0:
-            content = response.parts[0].text
-        else:
-            # Direct access for newer Gemini API versions
-            content = str(response.candidates[0].content.parts[0].text)
-
         # Clean up the content by removing markdown code block markers
         if content.startswith("```"):
             # Find the first newline to skip the ```json line
@@ -248,6 +207,6 @@ Return just the drafted clause text without additional comments.
         return result
 
     except Exception as e:
-        return response.text.strip()
+        return content.strip()
 
     
@@ -1,65 +1,38 @@
-from typing import List
-from pinecone import Pinecone, ServerlessSpec
+from typing import List, Optional
 import time
 import json
-from google import generativeai as genai
-from google.generativeai import GenerativeModel, configure
 from langchain.prompts import PromptTemplate
-import os
 from dotenv import load_dotenv
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+from PreProcessing.llmCache import generate_text, parse_json_response
+from embedding.namespaces import DEFAULT_NAMESPACE
+from embedding.retrieval import retrieve_for_agents
 
 load_dotenv()
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-gemani_api_key = os.getenv("API_KEY")
-
-pc = Pinecone(api_key=pinecone_api_key)
-client = genai.configure(api_key=gemani_api_key)
 
 # Keywords focused on mandatory eligibility criteria
-ELIGIBILITY_KEYWORDS = [
-    "Required",
-    "Mandatory",
-    "Must",
-    "Minimum",
-    "Qualification",
-    "Criteria",
-    "Eligibility",
-    "Prerequisite",
-    "Essential",
-    "Experience",
-    "Certification",
-    "License",
-    "Registration"
-]
+ELIGIBILITY_KEYWORDS = KEYWORD_TAXONOMY["eligibility"]
+
+# Share of the dense score in hybrid retrieval; the rest is BM25
+DENSE_WEIGHT = 0.6
 
-def extract_eligibility_criteria(COMPANY_DATA: dict) :
+# Query spec for the shared retrieval stage (embedding.retrieval.retrieve_for_agents)
+RETRIEVAL_QUERY = {"query_text": " ".join(ELIGIBILITY_KEYWORDS), "top_k": 3, "dense_weight": DENSE_WEIGHT}
+
+def extract_eligibility_criteria(COMPANY_DATA: dict, namespace: str = DEFAULT_NAMESPACE, retrieved: Optional[dict] = None) :
     """_summary_
 
     Args:
         COMPANY_DATA (dict): _description_
+        namespace (str): Namespace holding the RFP's chunks, see embedding.namespaces.document_namespace
+        retrieved (dict): This agent's result from retrieve_for_agents; retrieved here when not given
     """   
     
-    keyword_query = " ".join(ELIGIBILITY_KEYWORDS)
-    index_name_input = "eligibledocone"  # User uploaded RFP document
-    index_input = pc.Index(index_name_input)
-    print("🔍 Embedding eligibility criteria query...")
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
-
     # Retrieve RFP document sections focused on requirements
-    print("📄 Retrieving eligibility sections from RFP...")
-    eligibility_chunks = index_input.query(
-        namespace="ns",
-        vector=query_vector,
-        top_k=3,
-        include_values=False,
-        include_metadata=True
-    )
+    if retrieved is None:
+        print("📄 Retrieving eligibility sections from RFP...")
+        retrieved = retrieve_for_agents({"eligibility": RETRIEVAL_QUERY}, namespace)["eligibility"]
+    eligibility_chunks = retrieved
 
     # Build context with metadata
     rfp_context = "\n\n".join([
@@ -90,29 +63,20 @@ Focus on mandatory requirements with phrases like "must have," "required," "mini
         rfp_context=rfp_context,
         company_data=company_data_formatted
     )
-    index_name = "eligibledocone"  # Single index containing contract documents
-    index = pc.Index(index_name)
     # Run Gemini LLM
     print("🧠 Extracting mandatory eligibility criteria...")
 
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.3,
             "top_p": 0.95,
             "max_output_tokens": 1000
-        }
+        },
+        prompt=prompt,
+        validate=parse_json_response
     )
-    response = model.generate_content(prompt)
     try:
-        if hasattr(response, 'text'):
-            content = response.text
-        elif hasattr(response, 'parts') and len(response.parts) > 0:
-            content = response.parts[0].text
-        else:
-            # Direct access for newer Gemini API versions
-            content = str(response.candidates[0].content.parts[0].text)
-
         # Clean up the content by removing markdown code block markers
         if content.startswith("```"):
             # Find the first newline to skip the ```json line
@@ -131,7 +95,7 @@ Focus on mandatory requirements with phrases like "must have," "required," "mini
         result = json.loads(content)
         return result
     except Exception as e:
-        return response.text.strip()
+        return content.strip()
         
 
     
\ No newline at end of file
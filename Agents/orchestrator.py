@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+# Seconds an agent may run before its result is given up on
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "180"))
+
+
+def run_agents(agents: Dict[str, Callable[[], Any]], timeout: float = AGENT_TIMEOUT_SECONDS,
+               timeouts: Optional[Dict[str, float]] = None, max_workers: Optional[int] = None,
+               cancel: Optional[threading.Event] = None,
+               on_done: Optional[Callable[[str, dict], None]] = None) -> Dict[str, dict]:
+    """
+    Runs independent agents concurrently and collects every outcome.
+
+    Each agent is a zero-argument callable (bind its arguments with a lambda
+    or functools.partial). Agents spend most of their time waiting on the LLM,
+    so they run on threads, and the run takes about as long as the slowest
+    agent instead of the sum of all of them.
+
+    One agent raising or running past its timeout (from `timeouts`, else
+    `timeout`, counted from when it starts) doesn't affect the others. Agents
+    that haven't started when they time out or when `cancel` is set are
+    cancelled. Python threads can't be interrupted, so an agent stuck in a
+    call is abandoned: its result is discarded and the run returns without
+    waiting for it.
+
+    on_done(name, outcome) is called on the calling thread as each agent
+    finishes, e.g. to report progress in a UI.
+
+    Returns:
+        dict: name -> {"status": "ok" | "error" | "timeout" | "cancelled",
+        "result", "error", "seconds"} for every agent, in the given order.
+    """
+    timeouts = timeouts or {}
+    started: Dict[str, float] = {}
+    outcomes: Dict[str, dict] = {}
+
+    def call(name: str, agent: Callable[[], Any]):
+        started[name] = time.monotonic()
+        return agent()
+
+    def finish(name: str, status: str, result: Any = None, error: Optional[str] = None):
+        elapsed = time.monotonic() - started[name] if name in started else 0.0
+        outcomes[name] = {"status": status, "result": result, "error": error, "seconds": round(elapsed, 3)}
+        if status == "ok":
+            print(f"✅ {name} finished in {elapsed:.1f}s")
+        else:
+            print(f"⚠️ {name} {status} after {elapsed:.1f}s{f': {error}' if error else ''}")
+        if on_done is not None:
+            on_done(name, outcomes[name])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(len(agents), 1), thread_name_prefix="agent")
+    futures = {executor.submit(call, name, agent): name for name, agent in agents.items()}
+    pending = set(futures)
+    try:
+        while pending:
+            if cancel is not None and cancel.is_set():
+                break
+
+            now = time.monotonic()
+            for future in list(pending):
+                name = futures[future]
+                if name in started and now - started[name] > timeouts.get(name, timeout):
+                    future.cancel()
+                    pending.discard(future)
+                    finish(name, "timeout", error=f"no result within {timeouts.get(name, timeout):g}s")
+            if not pending:
+                break
+
+            deadlines = [started[futures[f]] + timeouts.get(futures[f], timeout) - now for f in pending if futures[f] in started]
+            # Poll at least every second so agents that start late get their deadline and cancel is noticed
+            done, pending = wait(pending, timeout=max(min(deadlines + [1.0]), 0.0), return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    finish(futures[future], "ok", result=future.result())
+                else:
+                    finish(futures[future], "error", error=f"{type(error).__name__}: {error}")
+
+        for future in pending:
+            future.cancel()
+            finish(futures[future], "cancelled")
+    finally:
+        # Don't block on abandoned agents; queued ones never start
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {name: outcomes[name] for name in agents}
+
+
+def results_of(outcomes: Dict[str, dict], default: Any = None) -> Dict[str, Any]:
+    """Each agent's result, or `default` for agents that failed, timed out or were cancelled."""
+    return {name: outcome["result"] if outcome["status"] == "ok" else default for name, outcome in outcomes.items()}
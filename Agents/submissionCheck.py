@@ -1,78 +1,43 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
-from google import generativeai as genai
-from google.generativeai import GenerativeModel, configure
 from langchain.prompts import PromptTemplate
-import os
-from pinecone import Pinecone
 from dotenv import load_dotenv
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+from PreProcessing.llmCache import generate_text, parse_json_response
+from embedding.hybridSearch import hybrid_query
+from embedding.namespaces import DEFAULT_NAMESPACE
+from embedding.providers import embed_queries_cached, index_name_for
+from embedding.retrieval import retrieve_for_agents
+from embedding.vectorStore import get_index
 
 load_dotenv()
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-gemani_api_key = os.getenv("API_KEY")
-
-pc = Pinecone(api_key=pinecone_api_key)
-client = genai.configure(api_key=gemani_api_key)
 
 # # Single index for RFP documents
 # index_name = "eligibledocone"
 # index = pc.Index(index_name)
 
 # Keywords focused on submission requirements
-SUBMISSION_KEYWORDS = [
-    "submit",
-    "submission",
-    "requirement",
-    "format",
-    "guideline",
-    "instruction",
-    "page limit",
-    "page count",
-    "font",
-    "margin",
-    "spacing",
-    "attachment",
-    "form",
-    "deadline",
-    "due date",
-    "table of contents",
-    "TOC",
-    "appendix",
-    "header",
-    "footer",
-    "binding",
-    "electronic",
-    "hard copy",
-    "template"
-]
+SUBMISSION_KEYWORDS = KEYWORD_TAXONOMY["submission"]
+
+# Submission rules are phrased literally ("page limit", "font size"), so lean on BM25
+DENSE_WEIGHT = 0.4
+
+# Query spec for the shared retrieval stage (embedding.retrieval.retrieve_for_agents)
+RETRIEVAL_QUERY = {"query_text": " ".join(SUBMISSION_KEYWORDS), "top_k": 5, "dense_weight": DENSE_WEIGHT}
 
-def generate_submission_checklist():
+def generate_submission_checklist(namespace: str = DEFAULT_NAMESPACE, retrieved: Optional[dict] = None):
     """
     Extracts submission requirements from RFP documents and generates a structured checklist
-    """
-    index_name = "eligibledocone"
-    index = pc.Index(index_name)
-    # Create keyword query string for better retrieval
-    keyword_query = " ".join(SUBMISSION_KEYWORDS)
-    
-    print("🔍 Embedding submission requirements query...")
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
 
+    Args:
+        namespace (str): Namespace holding the RFP's chunks, see embedding.namespaces.document_namespace
+        retrieved (dict): This agent's result from retrieve_for_agents; retrieved here when not given
+    """
     # Retrieve RFP document sections focused on submission requirements
-    print("📄 Retrieving submission instruction sections from RFP...")
-    submission_chunks = index.query(
-        namespace="ns",
-        vector=query_vector,
-        top_k=5,
-        include_values=False,
-        include_metadata=True
-    )
+    if retrieved is None:
+        print("📄 Retrieving submission instruction sections from RFP...")
+        retrieved = retrieve_for_agents({"submission": RETRIEVAL_QUERY}, namespace)["submission"]
+    submission_chunks = retrieved
 
     # Build context with metadata
     rfp_context = "\n\n".join([
@@ -147,44 +112,39 @@ Return this JSON format:
     # Run Gemini LLM
     print("🧠 Extracting submission requirements and generating checklist...")
 
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.2,
             "top_p": 0.9,
             "max_output_tokens": 1500
-        }
+        },
+        prompt=prompt,
+        validate=parse_json_response
     )
-
-    response = model.generate_content(prompt)
     
 
-    result = response.text
+    result = content
     print("✅ Submission checklist generation completed")
     return result
 
-def search_for_templates():
+def search_for_templates(namespace: str = DEFAULT_NAMESPACE):
     """
     Specifically searches for mentions of required templates in the RFP
     """
+    index = get_index(index_name_for("eligibledocone"))
     template_keywords = ["template", "form", "attachment", "exhibit", "appendix", "required document"]
     keyword_query = " ".join(template_keywords)
     
     print("🔍 Searching for specific templates and forms...")
-    embedding = pc.inference.embed(
-        model="multilingual-e5-large",
-        inputs=[keyword_query],
-        parameters={"input_type": "query"}
-    )
-
-    query_vector = embedding[0]['values']
+    query_vector = embed_queries_cached([keyword_query])[0]
     
-    template_chunks = index.query(
-        namespace="ns",
-        vector=query_vector,
+    template_chunks = hybrid_query(
+        index, index_name_for("eligibledocone"), namespace,
+        query_text=keyword_query,
+        query_vector=query_vector,
         top_k=5,
-        include_values=False,
-        include_metadata=True
+        dense_weight=DENSE_WEIGHT
     )
     
     # Process template mentions
@@ -222,29 +182,29 @@ Only include actual templates/forms/attachments, not general document requiremen
     
     prompt = prompt_template.format(template_context=template_context)
     
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.1,
             "top_p": 0.9,
             "max_output_tokens": 800
-        }
+        },
+        prompt=prompt,
+        validate=parse_json_response
     )
     
-    response = model.generate_content(prompt)
-    
-    templates = response.text
+    templates = content
     return templates
 
-def generate_comprehensive_checklist():
+def generate_comprehensive_checklist(namespace: str = DEFAULT_NAMESPACE, retrieved: Optional[dict] = None):
     """
     Generates a comprehensive submission checklist with additional template information
     """
     # Get base checklist
-    checklist = generate_submission_checklist()
+    checklist = generate_submission_checklist(namespace, retrieved)
     
     # Augment with specific template information
-    templates = search_for_templates()
+    templates = search_for_templates(namespace)
     
     # If templates were successfully found, add them to the checklist
     if templates and isinstance(templates, list) and len(templates) > 0:
@@ -276,26 +236,16 @@ Include all the important details but make it concise and practical for proposal
     
     prompt = prompt_template.format(checklist_json=json.dumps(checklist_data))
     
-    model = GenerativeModel(
+    content = generate_text(
         model_name="gemini-1.5-pro-latest",
         generation_config={
             "temperature": 0.1,
             "top_p": 0.9,
             "max_output_tokens": 1000
-        }
+        },
+        prompt=prompt
     )
-    
-    response = model.generate_content(prompt)
     try:
-   
-        # Extract content from response
-        if hasattr(response, 'text'):
-            content = response.text
-        elif hasattr(response, 'parts') and len(response.parts) > 0:
-            content = response.parts[0].text
-        else:
-            # Direct access for newer Gemini API versions
-            content = str(response.candidates[0].content.parts[0].text)
 
         # Clean up markdown code block if present
         if content.startswith("```"):
@@ -313,6 +263,6 @@ Include all the important details but make it concise and practical for proposal
         return result
 
     except Exception as e:
-        return response.text.strip()
+        return content.strip()
 
     
\ No newline at end of file
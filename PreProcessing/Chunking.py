@@ -1,113 +1,144 @@
 import fitz  # PyMuPDF
 import re
 import numpy as np
-import tiktoken
-import json
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import AgglomerativeClustering
-from pinecone import Pinecone, ServerlessSpec
-from typing import List, Dict
+from typing import Iterator, Iterable, Tuple
 import os
 from dotenv import load_dotenv
+from PreProcessing.pdfExtract import extract_pages_parallel
+from PreProcessing.keywords import ALL_KEYWORDS, get_matcher
+from PreProcessing.embeddingCache import EmbeddingCache
+from PreProcessing import resources
 load_dotenv()
 
-# Load model and tokenizer once
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-encoding = tiktoken.get_encoding("cl100k_base")
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-pc = Pinecone(api_key=pinecone_api_key)
-
-CHECKPOINT_KEYWORDS = [
-    "Registration",
-    "Certification",
-    "Experience",
-    "Compliance",
-    "Eligibility",
-    "Audit",
-    "Security",
-    "Turnover",
-    "GST",
-    "Insurance",
-    "Terminate",
-    "Liability",
-    "Indemnity",
-    "Warranty",
-    "Damages",
-    "Penalty",
-    "Unilateral",
-    "Amendment",
-    "Obligation",
-    "Exclusive",
-    "Jurisdiction",
-    "Force Majeure",
-    "Non-compete",
-    "Payment terms",
-    "Intellectual property",
-    "Required",
-    "Mandatory",
-    "Must",
-    "Minimum",
-    "Qualification",
-    "Criteria",
-    "Eligibility",
-    "Prerequisite",
-    "Essential",
-    "Experience",
-    "Certification",
-    "License",
-    "Registration",
-    "submit",
-    "submission",
-    "requirement",
-    "format",
-    "guideline",
-    "instruction",
-    "page limit",
-    "page count",
-    "font",
-    "margin",
-    "spacing",
-    "attachment",
-    "form",
-    "deadline",
-    "due date",
-    "table of contents",
-    "TOC",
-    "appendix",
-    "header",
-    "footer",
-    "binding",
-    "electronic",
-    "hard copy",
-    "template"
- 
-]
+# Model and tokenizer are loaded on first use and shared process-wide
+EMBEDDER_MODEL = resources.SENTENCE_EMBEDDER_MODEL
+embedder = resources.lazy("sentence_embedder")
+encoding = resources.lazy("tiktoken")
+pc = resources.lazy("pinecone")
+
+# Union of every agent's keyword category, see PreProcessing/keywords.py
+CHECKPOINT_KEYWORDS = ALL_KEYWORDS
 
 def extract_keywords(text: str) -> list[str]:
-    found_keywords = []
-    lowered = text.lower()
-    for keyword in CHECKPOINT_KEYWORDS:
-        if keyword.lower() in lowered:
-            found_keywords.append(keyword)
-    return found_keywords
-
-def extract_text_from_pdf(pdf_path: str) -> str:
-    doc = fitz.open(pdf_path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text()
-    return full_text
+    return get_matcher(CHECKPOINT_KEYWORDS).keywords_in(text)
+
+def extract_keywords_batch(texts: list[str]) -> list[list[str]]:
+    # One compiled matcher over all chunks instead of a substring test per keyword
+    return [list(found) for found in get_matcher(CHECKPOINT_KEYWORDS).match_batch(texts)]
+
+def extract_text_from_pdf(pdf_path: str, workers: int = 1) -> str:
+    # Join once at the end instead of growing a string page by page
+    if workers > 1:
+        return "".join(text for _, text in extract_pages_parallel(pdf_path, workers=workers))
+    return "".join(text for _, text in iter_pdf_pages(pdf_path))
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """Yields (page_number, text) for each page, starting at 1."""
+    with fitz.open(pdf_path) as doc:
+        for page_number, page in enumerate(doc, start=1):
+            yield page_number, page.get_text()
+
+SENTENCE_ENDINGS = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
 
 def sentence_tokenize(text: str) -> list[str]:
     # Simple regex-based sentence splitter
-    sentence_endings = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
-    sentences = sentence_endings.split(text)
+    sentences = SENTENCE_ENDINGS.split(text)
     return [s.strip() for s in sentences if s.strip()]
 
+def iter_sentences(pages: Iterable[Tuple[int, str]]) -> Iterator[str]:
+    """
+    Streams sentences out of a page iterator.
+
+    The last fragment of every page is held back and prepended to the next
+    page, so sentences running across a page break come out the same as with
+    sentence_tokenize over the full text.
+    """
+    for _, sentence in iter_sentences_with_pages(pages):
+        yield sentence
+
+def iter_sentences_with_pages(pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+    """Same as iter_sentences but yields (page_number, sentence) for the page each sentence starts on."""
+    carry = ""
+    carry_page = None
+    for page_number, text in pages:
+        parts = SENTENCE_ENDINGS.split(carry + text)
+        first_page = carry_page if carry.strip() else page_number
+        carry = parts.pop()
+        for i, part in enumerate(parts):
+            if part.strip():
+                yield (first_page if i == 0 else page_number), part.strip()
+        carry_page = first_page if not parts else page_number
+    if carry.strip():
+        yield carry_page, carry.strip()
+
+def iter_embedding_batches(sentences: Iterable[str], batch_size: int = 256, use_cache: bool = False) -> Iterator[Tuple[list[str], np.ndarray]]:
+    """Groups streamed sentences into batches and yields (sentences, embeddings)."""
+    batch = []
+    for sentence in sentences:
+        batch.append(sentence)
+        if len(batch) >= batch_size:
+            yield batch, embed_sentences_np(batch, use_cache=use_cache)
+            batch = []
+    if batch:
+        yield batch, embed_sentences_np(batch, use_cache=use_cache)
+
+# Inference settings for the chunking embedder, see configure_embedder
+EMBEDDER_OPTIONS = {
+    "quantized": os.getenv("EMBEDDER_QUANTIZED", "0") == "1",
+    "batch_size": int(os.getenv("EMBEDDER_BATCH_SIZE", "32")),
+    "num_threads": int(os.getenv("EMBEDDER_NUM_THREADS", "0")) or None,
+}
+
+def configure_embedder(quantized: bool = None, batch_size: int = None, num_threads: int = None):
+    """
+    Sets how embed_sentences runs on CPU.
+
+    Args:
+        quantized (bool): Use the dynamically int8-quantized model.
+        batch_size (int): Sentences per forward pass.
+        num_threads (int): torch intra-op thread count.
+    """
+    if quantized is not None:
+        EMBEDDER_OPTIONS["quantized"] = quantized
+    if batch_size is not None:
+        EMBEDDER_OPTIONS["batch_size"] = batch_size
+    if num_threads is not None:
+        EMBEDDER_OPTIONS["num_threads"] = num_threads
+
+def get_embedder():
+    if EMBEDDER_OPTIONS["num_threads"]:
+        import torch
+        torch.set_num_threads(EMBEDDER_OPTIONS["num_threads"])
+    if EMBEDDER_OPTIONS["quantized"]:
+        return resources.get("sentence_embedder_int8")
+    return embedder
+
 def embed_sentences(sentences: list[str]):
-    return embedder.encode(sentences, convert_to_tensor=True)
+    return get_embedder().encode(sentences, batch_size=EMBEDDER_OPTIONS["batch_size"], convert_to_tensor=True)
+
+sentence_caches = {}
+
+def get_sentence_cache() -> EmbeddingCache:
+    # Quantized vectors differ slightly from fp32 ones, so they get their own cache
+    model_name = EMBEDDER_MODEL + ("-int8" if EMBEDDER_OPTIONS["quantized"] else "")
+    if model_name not in sentence_caches:
+        sentence_caches[model_name] = EmbeddingCache(model_name, get_embedder().get_sentence_embedding_dimension())
+    return sentence_caches[model_name]
+
+def embed_sentences_np(sentences: list[str], use_cache: bool = False) -> np.ndarray:
+    """
+    Embeds sentences as a NumPy array. With use_cache=True, sentences already
+    in the on-disk EmbeddingCache are not re-encoded.
+    """
+    if use_cache:
+        return get_sentence_cache().encode(sentences, lambda batch: embed_sentences(batch).cpu().numpy())
+    return embed_sentences(sentences).cpu().numpy()
 
 def cluster_sentences(embeddings, threshold: float = 1.5):
+    if len(embeddings) < 2:
+        # AgglomerativeClustering needs at least two samples
+        return np.zeros(len(embeddings), dtype=int)
+    from sklearn.cluster import AgglomerativeClustering
     clustering_model = AgglomerativeClustering(
         n_clusters=None,
         distance_threshold=threshold,
@@ -117,6 +148,61 @@ def cluster_sentences(embeddings, threshold: float = 1.5):
     clustering_model.fit(embeddings)
     return clustering_model.labels_
 
+def segment_sentences(embeddings, window: int = 3, depth_factor: float = 0.5):
+    """
+    Sliding-window topic boundary detection over sentence embeddings.
+
+    Alternative to cluster_sentences that runs in O(n * dim) time and memory.
+    For every gap between two sentences the mean embedding of the `window`
+    sentences before it is compared with the mean of the `window` sentences
+    after it. Gaps whose cosine similarity is a local minimum and falls below
+    mean - depth_factor * std of all gap similarities become segment
+    boundaries (TextTiling style). Segments are contiguous, so reading order
+    is preserved inside each chunk.
+
+    Args:
+        embeddings: (n, dim) array of sentence embeddings.
+        window (int): Number of sentences on each side of a gap.
+        depth_factor (float): Higher values produce fewer, longer segments.
+
+    Returns:
+        np.ndarray: Segment label for each sentence.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(n, dtype=int)
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.maximum(norms, 1e-12)
+    prefix = np.vstack([np.zeros((1, normalized.shape[1]), dtype=np.float32), np.cumsum(normalized, axis=0)])
+
+    gaps = np.arange(1, n)
+    left = prefix[gaps] - prefix[np.maximum(gaps - window, 0)]
+    right = prefix[np.minimum(gaps + window, n)] - prefix[gaps]
+    similarity = np.einsum("ij,ij->i", left, right) / np.maximum(
+        np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1), 1e-12
+    )
+
+    cutoff = similarity.mean() - depth_factor * similarity.std()
+    padded = np.concatenate([[np.inf], similarity, [np.inf]])
+    local_min = (similarity <= padded[:-2]) & (similarity <= padded[2:])
+    boundaries = local_min & (similarity < cutoff)
+
+    labels = np.zeros(n, dtype=int)
+    labels[1:] = np.cumsum(boundaries)
+    return labels
+
+SEGMENTERS = ("agglomerative", "sliding_window")
+
+def label_sentences(embeddings, segmenter: str = "agglomerative", threshold: float = 1.5, window: int = 3):
+    """Dispatches to the selected segmentation engine."""
+    if segmenter == "agglomerative":
+        return cluster_sentences(embeddings, threshold=threshold)
+    if segmenter == "sliding_window":
+        return segment_sentences(embeddings, window=window)
+    raise ValueError(f"Unknown segmenter '{segmenter}', expected one of {SEGMENTERS}")
+
 def group_by_clusters(sentences: list[str], labels: list[int]) -> list[list[str]]:
     clustered = {}
     for label, sentence in zip(labels, sentences):
@@ -126,30 +212,65 @@ def group_by_clusters(sentences: list[str], labels: list[int]) -> list[list[str]
 def count_tokens(text: str) -> int:
     return len(encoding.encode(text))
 
+def tail_tokens(pieces: list[str], piece_counts: list[int], chunk_text: str, n: int) -> list[int]:
+    """
+    Returns encoding.encode(chunk_text)[-n:] without encoding the whole chunk.
+
+    chunk_text is " ".join(pieces).strip(). tiktoken never merges a token
+    across the end of a stripped piece into the following space, so tokens
+    after piece j are the same whether encoding starts at the chunk or at
+    piece j. Only the shortest suffix holding n tokens after its first piece
+    gets encoded, and piece_counts (the length of each piece encoded on its
+    own) tells us how far back to start.
+    """
+    if n <= 0:
+        # Negative/zero slices keep the original all_tokens[-n:] semantics
+        return encoding.encode(chunk_text)[-n:]
+
+    after = 0
+    j = len(pieces) - 1
+    while j >= 1:
+        piece = pieces[j]
+        if not piece or piece != piece.strip():
+            break
+        if after >= n:
+            suffix_tokens = encoding.encode(" ".join(pieces[j:]))
+            if len(suffix_tokens) - piece_counts[j] >= n:
+                return suffix_tokens[-n:]
+        after += piece_counts[j]
+        j -= 1
+    return encoding.encode(chunk_text)[-n:]
+
 def merge_chunks(clusters: list[list[str]], max_tokens: int = 1500,overlap_tokens: int = 50) -> list[str]:
     final_chunks = []
 
     for cluster in clusters:
+        # Each sentence is encoded exactly once. encoding.encode_batch was
+        # measured slower here: its per-item thread dispatch costs more than
+        # encoding one sentence.
+        sentence_counts = [count_tokens(sentence) for sentence in cluster]
+
         current_chunk = []
+        current_counts = []
         current_token_count = 0
 
-        for sentence in cluster:
-            sentence_token_count = count_tokens(sentence)
-
+        for sentence, sentence_token_count in zip(cluster, sentence_counts):
             # If adding sentence exceeds max_tokens, save current chunk and start new one with overlap
             if current_token_count + sentence_token_count > max_tokens:
                 chunk_text = " ".join(current_chunk).strip()
                 final_chunks.append(chunk_text)
 
                 # Create overlap from last N tokens
-                all_tokens = encoding.encode(chunk_text)
-                overlap_token_ids = all_tokens[-overlap_tokens:]
-                overlap_text = encoding.decode(overlap_token_ids)
+                overlap_token_ids = tail_tokens(current_chunk, current_counts, chunk_text, overlap_tokens)
+                overlap_text = encoding.decode(overlap_token_ids).strip()
+                overlap_token_count = count_tokens(overlap_text)
 
-                current_chunk = [overlap_text.strip(), sentence]
-                current_token_count = count_tokens(current_chunk[0]) + sentence_token_count
+                current_chunk = [overlap_text, sentence]
+                current_counts = [overlap_token_count, sentence_token_count]
+                current_token_count = overlap_token_count + sentence_token_count
             else:
                 current_chunk.append(sentence)
+                current_counts.append(sentence_token_count)
                 current_token_count += sentence_token_count
 
         # Add final leftover chunk
@@ -159,19 +280,63 @@ def merge_chunks(clusters: list[list[str]], max_tokens: int = 1500,overlap_token
     return final_chunks
 
 
-def semantic_chunk_pdf_json(pdf_path: str, max_tokens: int = 1000, threshold: float = 1.5) -> list[dict]:
+def iter_semantic_chunks(pdf_path: str, max_tokens: int = 1000, threshold: float = 1.5, batch_size: int = 256, segmenter: str = "agglomerative", workers: int = 1, use_cache: bool = False) -> Iterator[dict]:
+    """
+    Streaming version of semantic_chunk_pdf_json.
+
+    Pages are read lazily, split into sentences and embedded batch_size
+    sentences at a time. Each batch is clustered and merged on its own, so
+    memory stays bounded by the batch size rather than the document size and
+    the first chunks are yielded before the last page has been parsed.
+    Clusters never span two batches.
+
+    Args:
+        pdf_path (str): Path to the RFP PDF.
+        max_tokens (int): Token limit per chunk.
+        threshold (float): Distance threshold for clustering.
+        batch_size (int): Number of sentences embedded and clustered together.
+        segmenter (str): "agglomerative" or "sliding_window", see label_sentences.
+        workers (int): If > 1, pages are extracted up front by a process pool
+            instead of lazily; chunks are still embedded batch by batch.
+        use_cache (bool): Reuse sentence embeddings from the on-disk cache.
+
+    Yields:
+        dict: {"id", "chunk", "keywords"} in the same format as semantic_chunk_pdf_json.
+    """
+    chunk_id = 0
+    pages = extract_pages_parallel(pdf_path, workers=workers) if workers > 1 else iter_pdf_pages(pdf_path)
+    sentences = iter_sentences(pages)
+    for batch, embeddings_np in iter_embedding_batches(sentences, batch_size=batch_size, use_cache=use_cache):
+        labels = label_sentences(embeddings_np, segmenter=segmenter, threshold=threshold)
+        sentence_clusters = group_by_clusters(batch, labels)
+        chunks = merge_chunks(sentence_clusters, max_tokens=max_tokens)
+        for chunk, keywords in zip(chunks, extract_keywords_batch(chunks)):
+            chunk_id += 1
+            yield {
+                "id": chunk_id,
+                "chunk": chunk,
+                "keywords": keywords
+            }
+
+
+def semantic_chunk_pdf_json(pdf_path: str, max_tokens: int = 1000, threshold: float = 1.5, streaming: bool = False, batch_size: int = 256, segmenter: str = "agglomerative", workers: int = 1, use_cache: bool = False) -> list[dict]:
+    if streaming:
+        print("Streaming chunks from PDF...")
+        return list(iter_semantic_chunks(pdf_path, max_tokens=max_tokens, threshold=threshold, batch_size=batch_size, segmenter=segmenter, workers=workers, use_cache=use_cache))
+
     print("Extracting text from PDF...")
-    raw_text = extract_text_from_pdf(pdf_path)
+    raw_text = extract_text_from_pdf(pdf_path, workers=workers)
 
     print("Tokenizing into sentences...")
     sentences = sentence_tokenize(raw_text)
 
     print("Generating embeddings...")
-    embeddings = embed_sentences(sentences)
-    embeddings_np = embeddings.cpu().numpy()
+    embeddings_np = embed_sentences_np(sentences, use_cache=use_cache)
+    if use_cache:
+        print(f"Embedding cache: {get_sentence_cache().stats()}")
 
-    print("Clustering sentences by semantics...")
-    labels = cluster_sentences(embeddings_np, threshold=threshold)
+    print(f"Segmenting sentences by semantics ({segmenter})...")
+    labels = label_sentences(embeddings_np, segmenter=segmenter, threshold=threshold)
 
     print("Grouping sentences into clusters...")
     sentence_clusters = group_by_clusters(sentences, labels)
@@ -181,8 +346,7 @@ def semantic_chunk_pdf_json(pdf_path: str, max_tokens: int = 1000, threshold: fl
 
     print("Extracting keywords and formatting output...")
     json_output = []
-    for idx, chunk in enumerate(chunks, start=1):
-        keywords = extract_keywords(chunk)
+    for idx, (chunk, keywords) in enumerate(zip(chunks, extract_keywords_batch(chunks)), start=1):
         json_output.append({
             "id": idx,
             "chunk": chunk,
@@ -1,103 +1,351 @@
-import fitz  # PyMuPDF
-import re
-import numpy as np
-import tiktoken
-import json
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import AgglomerativeClustering
-from pinecone import Pinecone, ServerlessSpec
-from typing import List, Dict
-import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
+from PreProcessing import resources
+from PreProcessing.dedup import dedupe_chunks
+from PreProcessing.ingestManifest import DEFAULT_MANIFEST_DIR, IngestManifest, content_hash, vector_id_for
+from embedding.contentStore import get_content_store
+from embedding.lexicalIndex import get_lexical_index
+from embedding.namespaces import DEFAULT_NAMESPACE, touch_namespace
+from embedding.providers import get_embedding_provider, index_name_for
+from embedding.provisioning import ensure_index_async
+from embedding.vectorStore import get_index, is_local
 load_dotenv()
 
-# Load model and tokenizer once
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-encoding = tiktoken.get_encoding("cl100k_base")
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-pc = Pinecone(api_key=pinecone_api_key)
+# Pinecone client is created on first use and shared with the other modules
+pc = resources.lazy("pinecone")
+
+DELETE_BATCH_SIZE = 1000
+FETCH_BATCH_SIZE = 100
+
+# Client exception types (requests, urllib3, httpx, google.api_core) that mean the call may succeed if repeated
+TRANSIENT_ERROR_NAMES = {
+    "Timeout", "ConnectTimeout", "ReadTimeout", "TimeoutException", "ConnectionError", "ConnectError",
+    "MaxRetryError", "ProtocolError", "DeadlineExceeded", "ServiceUnavailable", "TooManyRequests", "ResourceExhausted",
+}
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether an error is worth retrying: timeouts, connection failures, and
+    HTTP 408/429/5xx responses. Anything else (bad requests, auth errors,
+    dimension mismatches) fails the same way every time.
+    """
+    transient = getattr(error, "transient", None)
+    if isinstance(transient, bool):
+        return transient
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    response = getattr(error, "response", None)
+    for status in (getattr(error, "status", None), getattr(error, "status_code", None),
+                   getattr(error, "code", None), getattr(response, "status_code", None)):
+        if isinstance(status, int) and not isinstance(status, bool) and 100 <= status < 600:
+            return status in (408, 429) or status >= 500
+    return False
+
+def with_retry(fn: Callable, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0, description: str = "request"):
+    """
+    Calls fn(), retrying transient errors (see is_transient) with exponential
+    backoff and jitter. Other errors are re-raised at once, and so is the last
+    transient one when max_retries retries are used up.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not is_transient(e):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2)
+            print(f"⚠️ {description} failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+def fetch_embeddings(index, positions: List[int], vector_ids: List[str], namespace: str = DEFAULT_NAMESPACE, max_retries: int = 5) -> Dict[int, Dict]:
+    """
+    Reads stored vectors back from the index instead of re-embedding their
+    chunks. Positions whose vector is missing are left out of the result.
+    """
+    found = {}
+    for start in range(0, len(positions), FETCH_BATCH_SIZE):
+        batch = positions[start:start + FETCH_BATCH_SIZE]
+        response = with_retry(
+            lambda: index.fetch(ids=[vector_ids[position] for position in batch], namespace=namespace),
+            max_retries=max_retries,
+            description=f"Fetching {len(batch)} stored vectors"
+        )
+        vectors = response["vectors"] if isinstance(response, dict) else response.vectors
+        for position in batch:
+            vector = vectors.get(vector_ids[position])
+            if vector is not None:
+                found[position] = {"values": list(vector["values"] if isinstance(vector, dict) else vector.values)}
+    return found
+
+def chunk_sources(entry: Dict) -> List[str]:
+    """IDs of the chunks a (possibly deduplicated) entry stands for."""
+    return list(entry.get("sources", [str(entry.get("id", "unknown"))]))
+
+def fold_identical(data: List[Dict], hashes: List[str]):
+    """
+    Merges entries with the same content hash, which would otherwise get the
+    same content-derived vector ID and overwrite each other, into the first
+    one with the sources of all of them.
+
+    Returns:
+        tuple: (folded entries, their hashes, index into the folded list for every entry)
+    """
+    first: Dict[str, int] = {}
+    folded, folded_hashes, assignment = [], [], []
+    for entry, digest in zip(data, hashes):
+        if digest not in first:
+            first[digest] = len(folded)
+            folded.append(dict(entry, sources=chunk_sources(entry)))
+            folded_hashes.append(digest)
+        else:
+            representative = folded[first[digest]]
+            representative["sources"].extend(chunk_sources(entry))
+            if "source_pages" in entry:
+                representative["source_pages"] = representative.get("source_pages", []) + entry["source_pages"]
+        assignment.append(first[digest])
+    return folded, folded_hashes, assignment
+
+def lexical_text(entry: Dict) -> str:
+    """Text indexed by BM25: the chunk plus its title and tagged keywords."""
+    return " ".join([entry.get("Sub Title", ""), entry.get("chunk", ""), " ".join(entry.get("keywords", []))])
 
 def generate_embeddings_with_keywords(
     data: List[Dict],
-    model: str = "multilingual-e5-large",
+    model: Optional[str] = None,
     index_name: str = "eligibledocone",
-    dimension: int = 1024,
+    dimension: Optional[int] = None,
     region: str = "us-east-1",
     cloud: str = "aws",
-    create_index: bool = True
+    create_index: bool = True,
+    namespace: str = DEFAULT_NAMESPACE,
+    embed_batch_size: int = 96,
+    upsert_batch_size: int = 100,
+    max_in_flight: int = 4,
+    max_retries: int = 5,
+    dedupe_threshold: Optional[float] = 1.0,
+    document_id: Optional[str] = None,
+    manifest_dir: Optional[str] = None,
+    text_in_metadata: bool = False,
+    provider=None,
+    client=None
 ) -> List[List[float]]:
     """
-    Creates embeddings for a list of chunks with keyword weighting.
+    Creates embeddings for a list of chunks and indexes them for hybrid
+    retrieval: chunk text goes to the dense index, and chunk text plus
+    keywords to a local BM25 index of the same namespace.
+
+    Chunks are embedded and upserted in batches. Up to max_in_flight batches
+    are processed concurrently, so embedding one batch overlaps with
+    upserting the previous one, and each embed/upsert request is retried on
+    its own with exponential backoff instead of failing the whole document.
 
     Args:
         data (list): List of dicts with "chunk" and "keywords" fields.
-        model (str): Pinecone-supported embedding model.
-        index_name (str): Pinecone index name.
-        dimension (int): Dimensionality of embeddings.
+        model (str): Embedding model; defaults to the provider's.
+        index_name (str): Base index name; providers whose dimension isn't 1024 get
+            their own index, see embedding.providers.index_name_for.
+        dimension (int): Dimensionality of embeddings; defaults to the provider's.
         region (str): Pinecone region.
         cloud (str): Pinecone cloud provider.
-        create_index (bool): Whether to create the index if it doesn't exist.
+        create_index (bool): Whether to create the index if it doesn't exist. An existing
+            index is reused as long as its dimension and metric match.
+        namespace (str): Namespace to write to, e.g. embedding.namespaces.document_namespace(pdf_path)
+            so each RFP is isolated; non-default namespaces are registered for TTL cleanup.
+        embed_batch_size (int): Chunks per embedding request.
+        upsert_batch_size (int): Vectors per index.upsert request.
+        max_in_flight (int): Maximum number of batches being processed at once.
+        max_retries (int): Retries per request before the batch is marked failed.
+        dedupe_threshold (float): Duplicate chunks are embedded and stored once, with all their
+            IDs in the "sources" metadata field. 1 (the default) merges exact copies only; a lower
+            value also merges near-duplicates at or above that MinHash similarity, see
+            PreProcessing.dedup.dedupe_chunks. None disables deduplication.
+        document_id (str): Enables delta upserts. A manifest of content hash -> vector ID
+            is kept per document; chunks already in the index are not re-embedded,
+            vectors of chunks that disappeared are deleted, and vector IDs are derived
+            from the document and chunk content, so identical chunks of a document share one
+            vector listing all their IDs in "sources" while other documents in the namespace
+            keep their own; stored vectors whose sources changed get their metadata rewritten.
+            Without it every chunk is upserted under its own "id".
+        manifest_dir (str): Where manifests are kept; defaults to INGEST_MANIFEST_DIR.
+        text_in_metadata (bool): Also put the chunk text in vector metadata, for readers
+            without access to the local content store (embedding.contentStore).
+        provider: Embedding provider from embedding.providers; defaults to EMBEDDING_PROVIDER.
+        client: Pinecone client to use, e.g. embedding.fakePinecone.FakePinecone; defaults to the
+            shared client, with vectors going to the index selected by VECTOR_BACKEND.
+            When given, it also does the embedding unless a provider is passed.
 
     Returns:
-        list: List of embeddings.
+        list: List of embeddings, in the same order as data. Duplicates share their
+            representative's embedding.
     """
-    if create_index:
-        print(f"Creating index '{index_name}' if it doesn't exist...")
-        pc.create_index(
-            name=index_name,
-            dimension=dimension,
-            metric="cosine",
-            spec=ServerlessSpec(cloud=cloud, region=region)
-        )
+    if provider is None:
+        provider = get_embedding_provider("pinecone" if client is not None else None,
+                                          model=model, dimension=dimension, client=client)
+    model, dimension = provider.model, provider.dimension
+    index_name = index_name_for(index_name, provider)
 
-    # Prepare weighted text by repeating or prepending keywords
-    contents = []
-    for entry in data:
-        chunk = entry.get("chunk", "")
-        keywords = entry.get("keywords", [])
-        if keywords:
-            # Weight keywords: repeat or prepend them
-            weighted_keywords = " ".join(keywords * 3)  # Repeat 3x
-            full_text = f"{weighted_keywords}. {chunk}"
-        else:
-            full_text = chunk
-        contents.append(full_text)
-
-    print("Sending data for embedding...")
-    embeddings = pc.inference.embed(
-        model=model,
-        inputs=contents,
-        parameters={"input_type": "passage", "truncate": "END"}
-    )
-
-    print("✅ Embedding complete. Sample vector:")
-    # print(embeddings[0])
-    
-    # Ensure Pinecone index is loaded
-    index = pc.Index(index_name)
-    print("✅ Vectors upserting...")
-
-    vectors = []
-    for entry, embedding in zip(data, embeddings):
-        # Use a meaningful or unique ID, fallback to entry ID
-        vector_id = str(entry.get('id', 'unknown'))
-
-        vectors.append({
-            "id": vector_id,
-            "values": embedding['values'],  # or just `embedding` if it's a list
-            "metadata": {
-                "chunk": entry.get('chunk', ''),
+    all_data = data
+    assignment = None
+    if dedupe_threshold is not None and len(data) > 1:
+        data, assignment, stats = dedupe_chunks(all_data, threshold=dedupe_threshold)
+        if stats["duplicates"]:
+            saved_calls = -(-len(all_data) // embed_batch_size) - -(-len(data) // embed_batch_size)
+            # Each dropped copy would have stored a float32 vector, and its chunk text either
+            # as vector metadata (text_in_metadata) or in the local content store
+            seen = set()
+            index_bytes = text_bytes = 0
+            for entry, position in zip(all_data, assignment):
+                if position in seen:
+                    index_bytes += dimension * 4
+                    text_bytes += len(entry.get("chunk", "").encode("utf-8"))
+                seen.add(position)
+            if text_in_metadata:
+                index_bytes, text_bytes = index_bytes + text_bytes, 0
+            print(f"Deduplicated {stats['chunks']} chunks to {stats['unique']}: "
+                  f"saved {stats['duplicates']} embeddings, {saved_calls} embed calls, "
+                  f"~{index_bytes / 1024:.1f} KB of index storage and ~{text_bytes / 1024:.1f} KB of content store")
+
+    manifest = None
+    vector_ids = [str(entry.get('id', 'unknown')) for entry in data]
+    pending = list(range(len(data)))
+    stored, stale, relabel = [], [], []
+    if document_id is not None:
+        manifest = IngestManifest(document_id, index_name, namespace, manifest_dir or DEFAULT_MANIFEST_DIR)
+        hashes = [content_hash(entry, model) for entry in data]
+        data, hashes, folded = fold_identical(data, hashes)
+        if len(data) < len(folded):
+            assignment = [folded[position] for position in assignment] if assignment is not None else folded
+        vector_ids = [manifest.vectors.get(digest, vector_id_for(digest, document_id)) for digest in hashes]
+        pending, stored, stale = manifest.diff(hashes)
+        shared = manifest.referenced_elsewhere(stale)
+        if shared:
+            print(f"Keeping {len(shared)} stale vectors that other documents in '{namespace}' still use")
+            stale = [vector_id for vector_id in stale if vector_id not in shared]
+        relabel = manifest.changed_sources(hashes, [chunk_sources(entry) for entry in data], stored)
+        print(f"Manifest for '{document_id}': {len(stored)} chunks already indexed "
+              f"({len(relabel)} with new sources), {len(pending)} to embed, {len(stale)} stale vectors to delete")
+
+    # Provisioning runs in the background so the first batches can be embedded while
+    # the index becomes ready; it is a no-op after the first call in this process
+    provisioned = None
+    if create_index and (pending or stale or relabel) and not (client is None and is_local()):
+        provisioned = ensure_index_async(client or pc, index_name, dimension=dimension, metric="cosine", cloud=cloud, region=region)
+
+    # Ensure the index is loaded; a local one when VECTOR_BACKEND=local
+    index = client.Index(index_name) if client is not None else get_index(index_name)
+
+    results = {}
+    if stored:
+        results = fetch_embeddings(index, stored, vector_ids, namespace, max_retries)
+        missing = [position for position in stored if position not in results]
+        if missing:
+            print(f"⚠️ {len(missing)} chunks in the manifest are missing from the index; re-embedding them")
+            pending = sorted(pending + missing)
+
+    # Text is stored locally before any vector becomes visible to queries
+    content_store = get_content_store()
+    content_store.put(index_name, namespace, ((vector_ids[position], entry.get('chunk', '')) for position, entry in enumerate(data)))
+
+    def upsert_positions(positions: List[int], embeddings: List[List[float]]):
+        if provisioned is not None:
+            provisioned.result()  # wait for the index to exist and be ready before upserting
+
+        vectors = []
+        for position, embedding in zip(positions, embeddings):
+            entry = data[position]
+            vector_id = vector_ids[position]
+
+            # Chunk text lives in the content store; metadata keeps only small fields
+            metadata = {
                 "Sub Title": entry.get('Sub Title', ''),
-                "keywords": entry.get('keywords', [])
+                "keywords": entry.get('keywords', []),
+                "sources": chunk_sources(entry)
             }
-        })
+            if text_in_metadata:
+                metadata["chunk"] = entry.get('chunk', '')
+            vectors.append({
+                "id": vector_id,
+                "values": embedding,
+                "metadata": metadata
+            })
+
+        for offset in range(0, len(vectors), upsert_batch_size):
+            upsert_batch = vectors[offset:offset + upsert_batch_size]
+            with_retry(
+                lambda: index.upsert(
+                    vectors=upsert_batch,
+                    namespace=namespace
+                ),
+                max_retries=max_retries,
+                description=f"Upserting chunks {positions[offset]}-{positions[offset + len(upsert_batch) - 1]}"
+            )
+
+    def process_batch(positions: List[int]):
+        embeddings = with_retry(
+            lambda: provider.embed_passages([data[position].get('chunk', '') for position in positions]),
+            max_retries=max_retries,
+            description=f"Embedding chunks {positions[0]}-{positions[-1]}"
+        )
+        upsert_positions(positions, embeddings)
+        return [{"values": embedding} for embedding in embeddings]
+
+    # A local index writes its files once at the end instead of after every batch
+    saves = index.deferred_save() if hasattr(index, "deferred_save") else nullcontext()
+    with saves:
+        print(f"Embedding and upserting {len(pending)} chunks in batches of {embed_batch_size}...")
+        batches = [pending[start:start + embed_batch_size] for start in range(0, len(pending), embed_batch_size)]
+        failures = []
+        with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as executor:
+            futures = {executor.submit(process_batch, positions): positions for positions in batches}
+            for future in as_completed(futures):
+                positions = futures[future]
+                try:
+                    results.update(zip(positions, future.result()))
+                except Exception as e:
+                    failures.append((positions, e))
+
+        if failures:
+            failed = ", ".join(f"{positions[0]}-{positions[-1]} ({e})" for positions, e in sorted(failures, key=lambda f: f[0][0]))
+            raise RuntimeError(f"{len(failures)} of {len(batches)} batches failed after retries: {failed}")
+
+        # Stored chunks whose sources changed (renumbered, or duplicates added or removed)
+        # keep their vectors; only the metadata is rewritten
+        reembedded = set(pending)
+        relabel = [position for position in relabel if position in results and position not in reembedded]
+        if relabel:
+            upsert_positions(relabel, [results[position]["values"] for position in relabel])
+
+        print("✅ Vectors upserted.")
+        touch_namespace(index_name, namespace)
+
+        if manifest is not None:
+            # Stale vectors are removed only after the new ones are in, so queries never see a gap
+            if provisioned is not None:
+                provisioned.result()
+            for start in range(0, len(stale), DELETE_BATCH_SIZE):
+                stale_batch = stale[start:start + DELETE_BATCH_SIZE]
+                with_retry(
+                    lambda: index.delete(ids=stale_batch, namespace=namespace),
+                    max_retries=max_retries,
+                    description=f"Deleting {len(stale_batch)} stale vectors"
+                )
+            content_store.delete(index_name, namespace, stale)
+            manifest.save(hashes, [chunk_sources(entry) for entry in data])
 
-    # Upsert into the Pinecone index
-    index.upsert(
-        vectors=vectors,
-        namespace="ns"  # Replace with your actual namespace if needed
-    )
+    # Keywords are matched lexically at query time (embedding.hybridSearch) rather than
+    # being repeated into the embedded text; re-adding unchanged chunks is cheap and idempotent
+    lexical = get_lexical_index(index_name, namespace)
+    lexical.add((vector_ids[position], lexical_text(entry)) for position, entry in enumerate(data))
+    lexical.delete(stale)
+    lexical.save()
 
-    # Optional: Check index stats
-    print("✅ Vectors upserted. Printing describe_index_stats():")
-    return embeddings
\ No newline at end of file
+    embeddings = [results[position] for position in range(len(data))]
+    if assignment is not None:
+        return [embeddings[position] for position in assignment]
+    return embeddings
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+")
+# Words whose presence changes what a clause requires; "t" is what's left of "don't", "can't"
+_NEGATIONS = frozenset({"not", "no", "nor", "never", "none", "neither", "without", "cannot", "unless", "except", "t"})
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """32-bit hashes of the word size-grams of text (the whole text if it is shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+class MinHasher:
+    """MinHash signatures with num_perm universal hash functions (a * x + b) mod p."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        # a, b < 2^31 and hashes < 2^32, so a * x + b fits in 64 bits
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def _same_terms(a: set, b: set) -> bool:
+    """
+    False when the words only one of two chunks has include a negation or a
+    number: "shall" vs "shall not" or "30 days" vs "60 days" barely move the
+    shingle similarity but reverse or change the requirement.
+    """
+    return not any(word in _NEGATIONS or any(char.isdigit() for char in word) for word in a ^ b)
+
+
+def dedupe_chunks(data: List[Dict], threshold: Optional[float] = None, num_perm: int = 128, bands: int = 32,
+                  shingle_size: int = 5) -> Tuple[List[Dict], List[int], dict]:
+    """
+    Collapses duplicate chunks (repeated terms, certification pages,
+    attachments restating the same clauses) before they are embedded.
+
+    Exact copies, equal after lowercasing and dropping punctuation, are found
+    by hash. Near-identical chunks are only merged when a threshold below 1
+    is given: MinHash signatures over word shingles are split into bands
+    (LSH) to find candidate pairs, and a pair is merged when its estimated
+    Jaccard similarity is at least threshold and the words that differ
+    between the two include no negation or number. Each group is represented
+    by its first chunk, which gets a "sources" list with the IDs of every
+    chunk it stands for (and "source_pages" when the chunks carry "pages").
+
+    Args:
+        data (list): Chunks with "id", "chunk" and "keywords", as produced by semantic_chunk_pdf_json.
+        threshold (float): Minimum estimated Jaccard similarity for two different chunks to be
+            merged; None (or 1) merges exact copies only.
+        num_perm (int): MinHash signature length.
+        bands (int): Number of LSH bands; num_perm must be divisible by it.
+        shingle_size (int): Words per shingle.
+
+    Returns:
+        tuple: (unique chunks in document order, index into the unique list for every
+        input chunk, {"chunks", "unique", "duplicates"}).
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+    parent = list(range(len(data)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)  # the earliest chunk represents the group
+
+    exact: Dict[str, int] = {}
+    candidates = []
+    words = []
+    for i, entry in enumerate(data):
+        normalized = _WORD.findall(entry.get("chunk", "").lower())
+        digest = hashlib.sha1(" ".join(normalized).encode("utf-8")).hexdigest()
+        if digest in exact:
+            union(exact[digest], i)
+        else:
+            exact[digest] = i
+            candidates.append(i)
+            words.append(set(normalized))
+
+    if threshold is not None and threshold < 1 and len(candidates) > 1:
+        hasher = MinHasher(num_perm)
+        signatures = np.stack([hasher.signature(shingles(data[i].get("chunk", ""), shingle_size)) for i in candidates])
+        rows = num_perm // bands
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for position in range(len(candidates)):
+            for band in range(bands):
+                key = (band, signatures[position, band * rows:(band + 1) * rows].tobytes())
+                buckets.setdefault(key, []).append(position)
+
+        checked = set()
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pair = (members[x], members[y])
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    similarity = float(np.mean(signatures[pair[0]] == signatures[pair[1]]))
+                    if similarity >= threshold and _same_terms(words[pair[0]], words[pair[1]]):
+                        union(candidates[pair[0]], candidates[pair[1]])
+
+    unique: List[Dict] = []
+    position_of: Dict[int, int] = {}
+    assignment = []
+    for i, entry in enumerate(data):
+        root = find(i)
+        if root not in position_of:
+            position_of[root] = len(unique)
+            unique.append(dict(data[root], sources=[]))
+        representative = unique[position_of[root]]
+        representative["sources"].append(str(entry.get("id", "unknown")))
+        if "pages" in entry:
+            representative.setdefault("source_pages", []).append("-".join(str(page) for page in entry["pages"]))
+        assignment.append(position_of[root])
+
+    stats = {"chunks": len(data), "unique": len(unique), "duplicates": len(data) - len(unique)}
+    return unique, assignment, stats
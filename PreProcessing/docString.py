@@ -1,14 +1,15 @@
-from google import generativeai as genai
 import json
 import os
 from dotenv import load_dotenv
+from PreProcessing.llmBackends import LLM_BACKEND, get_llm_backend
+from PreProcessing.llmCache import generate_text
 
-def analyze_chunk(client, chunk_data):
+def analyze_chunk(backend, chunk_data):
     """
     Analyzes a chunk and enriches it with a summary while maintaining existing fields.
     
     Args:
-        client: The Google AI client
+        backend: LLM backend, see PreProcessing.llmBackends
         chunk_data: A dictionary containing chunk information
     
     Returns:
@@ -31,12 +32,6 @@ def analyze_chunk(client, chunk_data):
                 "max_output_tokens": 256,
             }
             
-            # Get the Gemini model
-            model = client.GenerativeModel(
-                model_name="gemini-2.0-flash",
-                generation_config=generation_config
-            )
-            
             prompt = "Summarize this document"
             prompt = f"""
             Generate a brief summary (2-3 sentences) of the key information in this text. 
@@ -47,8 +42,7 @@ def analyze_chunk(client, chunk_data):
             """
             
             # Generate summary
-            response = model.generate_content(prompt)
-            result["summary"] = response.text.strip()
+            result["summary"] = generate_text("gemini-2.0-flash", generation_config, prompt, backend=backend).strip()
             
             # Generate title if not present
             if not result["title"]:
@@ -59,8 +53,7 @@ def analyze_chunk(client, chunk_data):
                 Text:
                 {chunk_data['content']}
                 """
-                title_response = model.generate_content(title_prompt)
-                result["title"] = title_response.text.strip()
+                result["title"] = generate_text("gemini-2.0-flash", generation_config, title_prompt, backend=backend).strip()
                 
         except Exception as e:
             result["summary"] = f"Error generating summary: {str(e)}"
@@ -71,23 +64,24 @@ def analyze_chunk(client, chunk_data):
     
     return result
 
-def process_chunks(chunks_data,apiKey):
+def process_chunks(chunks_data, apiKey=None, backend=None):
     """
     Process each chunk in the input data
     
     Args:
         chunks_data: List of dictionaries containing chunk data
+        apiKey: Gemini API key; API_KEY from the environment when not given
+        backend: LLM backend to use instead of the configured one (LLM_BACKEND)
     
     Returns:
         List of processed chunks with title, label, summary, content
     """
-    # Configure the API key
-
-    genai.configure(api_key=apiKey)
+    if backend is None:
+        backend = get_llm_backend("gemini", api_key=apiKey) if apiKey and LLM_BACKEND == "gemini" else get_llm_backend()
     
     results = []
     for chunk in chunks_data:
-        processed_chunk = analyze_chunk(genai, chunk)
+        processed_chunk = analyze_chunk(backend, chunk)
         results.append(processed_chunk)
     
     return results
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(text: str, model_name: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of sentence embeddings.
+
+    Vectors live in a float32 memory-mapped file (vectors.f32) with one row
+    per slot; index.json maps sha256(model, normalized text) to its slot and
+    a last-used tick. When max_entries is reached the least recently used
+    slots are reused. Re-processing an amended RFP therefore only encodes
+    sentences that weren't seen before.
+
+    Each batch of new entries is appended to index.journal rather than
+    rewriting index.json, so storing a batch costs the size of the batch,
+    not of the cache. The journal is folded into index.json once it outgrows
+    it, and by save().
+
+    Several processes can share a directory (the Streamlit app and a prewarm
+    job, say). Lookups hold a shared lock on the directory's lock file and
+    writes an exclusive one; either way the index is re-read first when
+    another process has saved it, so a slot is never handed out twice and a
+    reused slot is never read under its old key.
+
+    Args:
+        model_name (str): Name of the embedding model, part of every key.
+        dim (int): Embedding dimension.
+        cache_dir (str): Root directory; each model gets its own subdirectory.
+        max_entries (int): Maximum number of cached vectors.
+    """
+
+    def __init__(self, model_name: str, dim: int, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 500_000):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model_name))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.journal_path = os.path.join(self.directory, "index.journal")
+        self.lock_path = os.path.join(self.directory, "lock")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._index: Dict[str, List[int]] = {}  # key -> [slot, last_used]
+        self._tick = 0
+        self._used: Dict[str, int] = {}  # hits since the last save, re-applied after a reload
+        self._stamp = None
+        self._journal_offset = 0  # bytes of index.journal already applied
+        self._evicted: List[str] = []
+        self._free: List[int] = []
+        self._vectors: Optional[np.memmap] = None
+        with self._locked(exclusive=False):
+            self._refresh()
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Holds the in-process lock and a shared or exclusive lock on the directory's lock file."""
+        with self._lock, open(self.lock_path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                # msvcrt only has exclusive locks
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _index_stamp(self):
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def _refresh(self):
+        """
+        Catches up with what other processes saved (caller holds the lock):
+        reloads index.json if it was replaced, then applies journal records
+        appended since the last read.
+        """
+        stamp = self._index_stamp()
+        journal_size = self._journal_size()
+        changed = False
+        if stamp != self._stamp or journal_size < self._journal_offset:
+            entries, tick = {}, 0
+            if stamp is not None:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("dim") == self.dim and saved.get("model") == self.model_name:
+                    entries, tick = saved["entries"], saved.get("tick", 0)
+            self._index = entries
+            self._tick = max(self._tick, tick)
+            self._stamp = stamp
+            self._journal_offset = 0
+            changed = True
+        if journal_size > self._journal_offset:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                appended = f.read(journal_size - self._journal_offset)
+            # A record is only complete once its newline is written
+            complete = appended[:appended.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                self._apply(json.loads(line))
+            self._journal_offset += len(complete)
+            changed = True
+        if not changed and self._vectors is not None:
+            return
+
+        for key, last_used in self._used.items():
+            if key in self._index:
+                self._index[key][1] = max(self._index[key][1], last_used)
+        capacity = self._capacity_on_disk()
+        if self._vectors is None or len(self._vectors) != capacity:
+            self._vectors = self._open(capacity)
+        self._free = sorted(set(range(capacity)) - {slot for slot, _ in self._index.values()}, reverse=True)
+
+    def _apply(self, record: dict):
+        for key in record.get("evicted", []):
+            self._index.pop(key, None)
+        self._index.update(record.get("entries", {}))
+        for key, last_used in record.get("used", {}).items():
+            if key in self._index:
+                self._index[key][1] = max(self._index[key][1], last_used)
+        self._tick = max(self._tick, record.get("tick", 0))
+
+    def _capacity_on_disk(self) -> int:
+        if not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _open(self, rows: int) -> Optional[np.memmap]:
+        if rows == 0:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _grow(self, needed: int):
+        """Extends the vector file so at least `needed` more slots are free."""
+        current = self._capacity_on_disk()
+        target = min(self.max_entries, max(current * 2, current + needed, 1024))
+        if target <= current:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(target * self.dim * 4)
+        self._free = list(range(target - 1, current - 1, -1)) + self._free
+        self._vectors = self._open(target)
+
+    def _allocate(self, count: int) -> List[int]:
+        if len(self._free) < count:
+            self._grow(count - len(self._free))
+        if len(self._free) < count:
+            # File is at max_entries: evict the least recently used entries
+            shortfall = count - len(self._free)
+            oldest = sorted(self._index.items(), key=lambda item: item[1][1])[:shortfall]
+            for key, (slot, _) in oldest:
+                del self._index[key]
+                self._evicted.append(key)
+                self._free.append(slot)
+        return [self._free.pop() for _ in range(count)]
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Returns embeddings for texts, calling encode_fn only for texts that
+        are not cached yet (each distinct text at most once).
+        """
+        keys = [cache_key(text, self.model_name) for text in texts]
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+
+        with self._locked(exclusive=False):
+            self._refresh()
+            self._tick += 1
+            missing: Dict[str, List[int]] = {}
+            for position, key in enumerate(keys):
+                entry = self._index.get(key)
+                if entry is None:
+                    missing.setdefault(key, []).append(position)
+                    continue
+                entry[1] = self._used[key] = self._tick
+                result[position] = self._vectors[entry[0]]
+            self.hits += len(texts) - sum(len(positions) for positions in missing.values())
+            self.misses += sum(len(positions) for positions in missing.values())
+
+        if not missing:
+            return result
+
+        missing_keys = list(missing)
+        new_vectors = np.asarray(encode_fn([texts[missing[key][0]] for key in missing_keys]), dtype=np.float32)
+        fresh = dict(zip(missing_keys, new_vectors))
+        for key, vector in fresh.items():
+            result[missing[key]] = vector
+
+        with self._locked(exclusive=True):
+            self._refresh()
+            # Skip keys another thread or process stored meanwhile; anything
+            # beyond max_entries is returned but not stored
+            storable = [key for key in missing_keys if key not in self._index][:self.max_entries]
+            slots = self._allocate(len(storable))
+            stored = {}
+            for key, slot in zip(storable, slots):
+                self._vectors[slot] = fresh[key]
+                self._index[key] = stored[key] = [slot, self._tick]
+            self._append({"tick": self._tick, "entries": stored, "evicted": self._evicted, "used": self._used})
+        return result
+
+    def _append(self, record: dict):
+        """Appends a journal record, folding the journal into index.json once it outgrows it (caller holds the exclusive lock)."""
+        if self._vectors is not None:
+            self._vectors.flush()  # vectors must be on disk before an index entry points at them
+        with open(self.journal_path, "ab") as f:
+            f.write(json.dumps(record).encode("utf-8") + b"\n")
+        self._journal_offset = self._journal_size()
+        self._evicted = []
+        self._used = {}
+        if self._journal_offset > max(self._stamp[2] if self._stamp else 0, 1 << 20):
+            self._save()
+
+    def _save(self):
+        """Writes the vectors and index.json and empties the journal (caller holds the exclusive lock)."""
+        if self._vectors is not None:
+            self._vectors.flush()
+        # Per-process name, so concurrent writers never share a temp file
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self.dim, "tick": self._tick, "entries": self._index}, f)
+        os.replace(tmp_path, self.index_path)
+        # Readers see the new index.json before the journal is emptied, and reload it whole
+        open(self.journal_path, "wb").close()
+        self._stamp = self._index_stamp()
+        self._journal_offset = 0
+        self._evicted = []
+        self._used = {}
+
+    def save(self):
+        with self._locked(exclusive=True):
+            # Keep entries other processes added since our last read
+            self._refresh()
+            self._save()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._index),
+            "max_entries": self.max_entries,
+        }
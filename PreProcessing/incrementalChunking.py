@@ -0,0 +1,202 @@
+import difflib
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from PreProcessing.Chunking import (
+    embed_sentences_np,
+    extract_keywords_batch,
+    iter_pdf_pages,
+    iter_sentences_with_pages,
+    merge_chunks,
+    segment_sentences,
+)
+
+STATE_VERSION = 1
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stable_chunk_ids(chunks: List[str]) -> List[str]:
+    """
+    Content-derived IDs: the first 16 hex digits of sha256(chunk). A chunk
+    whose text appears more than once is told apart by the chunks around it
+    (a suffix hashed from its previous and next chunk), not by its position,
+    so adding or removing a copy elsewhere doesn't renumber the others. Only
+    copies that also share both neighbours fall back to a "-2", "-3", ...
+    suffix in document order.
+    """
+    bases = [_digest(chunk)[:16] for chunk in chunks]
+    copies: Dict[str, int] = {}
+    for base in bases:
+        copies[base] = copies.get(base, 0) + 1
+
+    seen: Dict[str, int] = {}
+    ids = []
+    for position, base in enumerate(bases):
+        if copies[base] == 1:
+            ids.append(base)
+            continue
+        previous_chunk = chunks[position - 1] if position > 0 else ""
+        next_chunk = chunks[position + 1] if position + 1 < len(chunks) else ""
+        context = _digest(previous_chunk + "\0" + next_chunk)[:8]
+        chunk_id = f"{base}-{context}"
+        seen[chunk_id] = seen.get(chunk_id, 0) + 1
+        ids.append(chunk_id if seen[chunk_id] == 1 else f"{chunk_id}-{seen[chunk_id]}")
+    return ids
+
+
+def load_state(state_path: str) -> Optional[dict]:
+    if not state_path or not os.path.exists(state_path):
+        return None
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(state_path: str, state: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+def reusable_segments(old_state: dict, new_hashes: List[str]) -> Dict[int, dict]:
+    """
+    Maps new sentence start index -> old segment for every old segment whose
+    sentences all survive unchanged (and in order) in the new revision.
+    """
+    matcher = difflib.SequenceMatcher(None, old_state["sentences"], new_hashes, autojunk=False)
+    equal_blocks = [(i1, i2, j1) for tag, i1, i2, j1, _ in matcher.get_opcodes() if tag == "equal"]
+
+    reused = {}
+    block = 0
+    for segment in old_state["segments"]:
+        while block < len(equal_blocks) and equal_blocks[block][1] < segment["end"]:
+            block += 1
+        if block == len(equal_blocks):
+            break
+        i1, i2, j1 = equal_blocks[block]
+        if i1 <= segment["start"] and segment["end"] <= i2:
+            reused[j1 + segment["start"] - i1] = segment
+    return reused
+
+
+def chunk_region(sentences: List[str], pages: List[int], start: int, max_tokens: int, window: int, use_cache: bool) -> List[dict]:
+    """Segments and merges one run of new or changed sentences."""
+    embeddings = embed_sentences_np(sentences, use_cache=use_cache)
+    labels = segment_sentences(embeddings, window=window)
+    segments = []
+    segment_start = 0
+    for i in range(1, len(sentences) + 1):
+        if i == len(sentences) or labels[i] != labels[segment_start]:
+            chunks = merge_chunks([sentences[segment_start:i]], max_tokens=max_tokens)
+            segments.append({
+                "start": start + segment_start,
+                "end": start + i,
+                "pages": [pages[segment_start], pages[i - 1]],
+                "chunks": chunks,
+                "keywords": extract_keywords_batch(chunks),
+            })
+            segment_start = i
+    return segments
+
+
+def incremental_chunk_pdf_json(pdf_path: str, state_path: str, max_tokens: int = 1000, window: int = 3, use_cache: bool = False) -> dict:
+    """
+    Re-chunks a new revision of an RFP, touching only what changed.
+
+    The previous revision's page hashes, sentence hashes and segments are
+    kept in a JSON state file. The new revision is diffed against it page by
+    page and sentence by sentence; segments whose sentences are all unchanged
+    are reused as-is and only the remaining runs of sentences are embedded,
+    segmented (sliding-window segmenter, so segments are contiguous) and
+    merged. Chunk IDs are derived from chunk content, so unchanged chunks keep
+    their IDs across revisions.
+
+    Args:
+        pdf_path (str): Path to the new revision.
+        state_path (str): JSON state file; read if present, then overwritten.
+        max_tokens (int): Token limit per chunk.
+        window (int): Window size for segment_sentences.
+        use_cache (bool): Use the on-disk sentence embedding cache.
+
+    Returns:
+        dict: {
+            "chunks": [{"id", "chunk", "keywords", "pages"}] for the whole document,
+            "added": [ids], "removed": [ids], "unchanged": [ids],
+            "changed_pages": [page numbers that differ from the previous revision]
+        }
+    """
+    old_state = load_state(state_path)
+
+    pages = list(iter_pdf_pages(pdf_path))
+    page_hashes = [text_hash(text) for _, text in pages]
+    sentence_pages: List[Tuple[int, str]] = list(iter_sentences_with_pages(pages))
+    sentences = [sentence for _, sentence in sentence_pages]
+    sentence_hashes = [text_hash(sentence) for sentence in sentences]
+    page_numbers = [page for page, _ in sentence_pages]
+
+    if old_state is None:
+        changed_pages = [page for page, _ in pages]
+        reused = {}
+    else:
+        matcher = difflib.SequenceMatcher(None, old_state["pages"], page_hashes, autojunk=False)
+        changed_pages = [
+            j + 1
+            for tag, _, _, j1, j2 in matcher.get_opcodes() if tag != "equal"
+            for j in range(j1, j2)
+        ]
+        reused = reusable_segments(old_state, sentence_hashes)
+
+    segments = []
+    position = 0
+    while position < len(sentences):
+        if position in reused:
+            old_segment = reused[position]
+            length = old_segment["end"] - old_segment["start"]
+            segments.append(dict(old_segment, start=position, end=position + length,
+                                 pages=[page_numbers[position], page_numbers[position + length - 1]]))
+            position += length
+            continue
+        # Run of sentences not covered by any reusable segment
+        run_end = position + 1
+        while run_end < len(sentences) and run_end not in reused:
+            run_end += 1
+        print(f"Re-chunking sentences {position}-{run_end - 1} (pages {page_numbers[position]}-{page_numbers[run_end - 1]})...")
+        segments.extend(chunk_region(sentences[position:run_end], page_numbers[position:run_end], position, max_tokens, window, use_cache))
+        position = run_end
+
+    chunk_texts = [chunk for segment in segments for chunk in segment["chunks"]]
+    chunk_ids = stable_chunk_ids(chunk_texts)
+    chunks = []
+    for segment in segments:
+        for chunk, keywords in zip(segment["chunks"], segment["keywords"]):
+            chunks.append({"id": chunk_ids[len(chunks)], "chunk": chunk, "keywords": keywords, "pages": segment["pages"]})
+
+    old_ids = set(old_state["chunk_ids"]) if old_state else set()
+    new_ids = set(chunk_ids)
+
+    save_state(state_path, {
+        "version": STATE_VERSION,
+        "pages": page_hashes,
+        "sentences": sentence_hashes,
+        "segments": segments,
+        "chunk_ids": chunk_ids,
+    })
+
+    return {
+        "chunks": chunks,
+        "added": [chunk_id for chunk_id in chunk_ids if chunk_id not in old_ids],
+        "removed": sorted(old_ids - new_ids),
+        "unchanged": [chunk_id for chunk_id in chunk_ids if chunk_id in old_ids],
+        "changed_pages": changed_pages,
+    }
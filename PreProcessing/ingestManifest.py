@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+MANIFEST_VERSION = 3  # 2: chunks are embedded without repeated keywords; 3: sources are recorded
+DEFAULT_MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", os.path.join(".cache", "manifests"))
+
+
+def content_hash(entry: Dict, model: str) -> str:
+    """Hash of everything that determines a chunk's vector and metadata."""
+    payload = json.dumps(
+        [model, entry.get("chunk", ""), entry.get("keywords", []), entry.get("Sub Title", "")],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def vector_id_for(digest: str, document_id: str = "") -> str:
+    """
+    Content-derived vector ID, so an unchanged chunk keeps its ID across runs.
+    The document is part of it: documents sharing a namespace can contain the
+    same chunk, and each must be able to drop its copy without touching the others'.
+    """
+    if not document_id:
+        return digest[:16]
+    return hashlib.sha256(f"{document_id}\0{digest}".encode("utf-8")).hexdigest()[:16]
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(name))
+
+
+def _manifest_prefix(index_name: str, namespace: str) -> str:
+    return f"{_safe(index_name)}__{_safe(namespace)}__"
+
+
+def remove_manifests(index_name: str, namespace: str, manifest_dir: str = DEFAULT_MANIFEST_DIR):
+    """Forgets every document manifest of a namespace, e.g. once the namespace is deleted."""
+    if not os.path.isdir(manifest_dir):
+        return
+    prefix = _manifest_prefix(index_name, namespace)
+    for name in os.listdir(manifest_dir):
+        if name.startswith(prefix) and name.endswith(".json"):
+            os.remove(os.path.join(manifest_dir, name))
+
+
+class IngestManifest:
+    """
+    Per-document record of which chunks are already in the index, as
+    content hash -> vector ID, and of the chunk IDs ("sources") each vector's
+    metadata lists. One JSON file per (index, namespace, document).
+    """
+
+    def __init__(self, document_id: str, index_name: str, namespace: str, manifest_dir: str = DEFAULT_MANIFEST_DIR):
+        self.document_id = document_id
+        self.index_name = index_name
+        self.namespace = namespace
+        self.manifest_dir = manifest_dir
+        self.path = os.path.join(manifest_dir, f"{_manifest_prefix(index_name, namespace)}{_safe(document_id)}.json")
+        self.vectors: Dict[str, str] = {}
+        self.sources: Dict[str, List[str]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # Version 2 vectors are still valid; without sources their metadata is rewritten once
+            if state.get("version") in (2, MANIFEST_VERSION):
+                self.vectors = state["vectors"]
+                self.sources = state.get("sources", {})
+
+    def diff(self, hashes: List[str]):
+        """
+        Splits the current chunk hashes into those already stored and those
+        to embed, and lists vector IDs of stored chunks that no longer exist.
+
+        Returns:
+            tuple: (positions of new chunks, positions of stored chunks, stale vector IDs)
+        """
+        current = set(hashes)
+        new = [i for i, digest in enumerate(hashes) if digest not in self.vectors]
+        stored = [i for i, digest in enumerate(hashes) if digest in self.vectors]
+        stale = sorted(vector_id for digest, vector_id in self.vectors.items() if digest not in current)
+        return new, stored, stale
+
+    def referenced_elsewhere(self, vector_ids: List[str]) -> set:
+        """
+        The given vector IDs that another document's manifest in the same
+        namespace also lists; manifests written before IDs included the
+        document can share them, and such vectors must outlive this document.
+        """
+        wanted = set(vector_ids)
+        shared = set()
+        if not wanted or not os.path.isdir(self.manifest_dir):
+            return shared
+        prefix = _manifest_prefix(self.index_name, self.namespace)
+        for name in os.listdir(self.manifest_dir):
+            path = os.path.join(self.manifest_dir, name)
+            if not name.startswith(prefix) or not name.endswith(".json") or path == self.path:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                shared.update(wanted.intersection(json.load(f).get("vectors", {}).values()))
+        return shared
+
+    def changed_sources(self, hashes: List[str], sources: List[List[str]], positions: List[int]) -> List[int]:
+        """Positions among the stored ones whose vector metadata lists different sources than now."""
+        return [i for i in positions if self.sources.get(hashes[i]) != sources[i]]
+
+    def save(self, hashes: List[str], sources: List[List[str]]):
+        self.vectors = {digest: self.vectors.get(digest, vector_id_for(digest, self.document_id)) for digest in hashes}
+        self.sources = dict(zip(hashes, sources))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "document": self.document_id,
+                "index": self.index_name,
+                "namespace": self.namespace,
+                "vectors": self.vectors,
+                "sources": self.sources,
+            }, f)
+        os.replace(tmp_path, self.path)
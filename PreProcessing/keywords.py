@@ -0,0 +1,189 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Central keyword taxonomy shared by the chunker and the agents.
+# Each agent queries with its own category; the chunker tags chunks with all of them.
+KEYWORD_TAXONOMY: Dict[str, List[str]] = {
+    "compliance": [
+        "Registration",
+        "Certification",
+        "Experience",
+        "Compliance",
+        "Eligibility",
+        "Audit",
+        "Security",
+        "Turnover",
+        "GST"
+    ],
+    "risk": [
+        "Insurance",
+        "Terminate",
+        "Liability",
+        "Indemnity",
+        "Warranty",
+        "Damages",
+        "Penalty",
+        "Unilateral",
+        "Amendment",
+        "Obligation",
+        "Exclusive",
+        "Jurisdiction",
+        "Force Majeure",
+        "Non-compete",
+        "Payment terms",
+        "Intellectual property"
+    ],
+    "eligibility": [
+        "Required",
+        "Mandatory",
+        "Must",
+        "Minimum",
+        "Qualification",
+        "Criteria",
+        "Eligibility",
+        "Prerequisite",
+        "Essential",
+        "Experience",
+        "Certification",
+        "License",
+        "Registration"
+    ],
+    "submission": [
+        "submit",
+        "submission",
+        "requirement",
+        "format",
+        "guideline",
+        "instruction",
+        "page limit",
+        "page count",
+        "font",
+        "margin",
+        "spacing",
+        "attachment",
+        "form",
+        "deadline",
+        "due date",
+        "table of contents",
+        "TOC",
+        "appendix",
+        "header",
+        "footer",
+        "binding",
+        "electronic",
+        "hard copy",
+        "template"
+    ],
+}
+
+
+def unique_keywords(*groups: Iterable[str]) -> List[str]:
+    """Concatenates keyword lists, dropping case-insensitive duplicates but keeping order."""
+    seen = set()
+    result = []
+    for group in groups:
+        for keyword in group:
+            if keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                result.append(keyword)
+    return result
+
+
+ALL_KEYWORDS = unique_keywords(*KEYWORD_TAXONOMY.values())
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Builds a prefix-factored regex from a trie of words, e.g.
+    ["submit", "submission"] -> "submi(?:ssion|t)". Matching then walks the
+    trie once per start position instead of trying every keyword in turn.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        if "" in node and len(node) == 1:
+            return ""
+        alternatives = []
+        optional = "" in node
+        # Longer branches first so the engine prefers the longest keyword
+        for char in sorted((c for c in node if c), reverse=True):
+            alternatives.append(re.escape(char) + build(node[char]))
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+        pattern = "(?:" + "|".join(alternatives) + ")"
+        return pattern + "?" if optional else pattern
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Compiled single-pass matcher for a fixed keyword list.
+
+    All keywords are folded into one case-insensitive regex built from a
+    trie, so a text is scanned once regardless of how many keywords there
+    are. By default a keyword matches anywhere, as the substring test it
+    replaces did: "submit" matches "submitted" and "form" matches both
+    "format" and "performance". With whole_words=True a keyword must start a
+    word and may only be followed by a common inflection (s, es, d, ed, ing,
+    or a doubled final consonant plus ed/ing), so "form" no longer matches
+    "performance" while "submitted", "terminated" and "licensed" still match.
+    """
+
+    _INFLECTIONS = r"(?:e?s|e?d|ing|(?<=(?P<last>[bdgklmnprt]))(?P=last)(?:ed|ing))?"
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords = unique_keywords(keywords)
+        self.whole_words = whole_words
+        self._canonical = {keyword.lower(): keyword for keyword in self.keywords}
+        lowered = list(self._canonical)
+        # Keywords that are prefixes of a longer one start at the same place as it
+        self._prefixes = {word: [other for other in lowered if word.startswith(other)] for word in lowered}
+        body = _trie_pattern(lowered)
+        if whole_words:
+            pattern = rf"(?<!\w)({body}){self._INFLECTIONS}(?!\w)"
+        else:
+            # A lookahead tries every start position, so keywords inside another match are found too
+            pattern = f"(?=({body}))"
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+    def match(self, text: str) -> Dict[str, Dict]:
+        """
+        Returns {keyword: {"count": int, "offsets": [(start, end), ...]}} for
+        every keyword found in text, in keyword-list order.
+        """
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        for m in self._regex.finditer(text):
+            start = m.start(1)
+            if self.whole_words:
+                found.setdefault(self._canonical[m.group(1).lower()], []).append(m.span())
+                continue
+            for word in self._prefixes[m.group(1).lower()]:
+                found.setdefault(self._canonical[word], []).append((start, start + len(word)))
+        return {
+            keyword: {"count": len(found[keyword]), "offsets": sorted(found[keyword])}
+            for keyword in self.keywords
+            if keyword in found
+        }
+
+    def match_batch(self, texts: Iterable[str]) -> List[Dict[str, Dict]]:
+        return [self.match(text) for text in texts]
+
+    def keywords_in(self, text: str) -> List[str]:
+        return list(self.match(text))
+
+
+_matchers: Dict[Tuple[Tuple[str, ...], bool], KeywordMatcher] = {}
+
+
+def get_matcher(keywords: Iterable[str] = ALL_KEYWORDS, whole_words: bool = False) -> KeywordMatcher:
+    """Returns a cached matcher so each keyword list is compiled once per process."""
+    key = (tuple(keywords), whole_words)
+    if key not in _matchers:
+        _matchers[key] = KeywordMatcher(key[0], whole_words=whole_words)
+    return _matchers[key]
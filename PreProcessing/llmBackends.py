@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from PreProcessing import resources
+
+load_dotenv()
+
+# "gemini" (Google Generative AI) or "fake" (deterministic, offline)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+
+class GeminiBackend:
+    """Google Gemini through google.generativeai; configured with API_KEY on first use."""
+
+    name = "gemini"
+    # Responses are worth keeping in the shared response cache
+    cacheable = True
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def _genai(self):
+        from google import generativeai as genai
+
+        with self._lock:
+            if not self._configured:
+                genai.configure(api_key=self._api_key or os.getenv("API_KEY"))
+                self._configured = True
+        return genai
+
+    def generate(self, model_name: str, generation_config: Optional[dict], prompt: str) -> str:
+        model = self._genai().GenerativeModel(model_name=model_name, generation_config=generation_config)
+        response = model.generate_content(prompt)
+        if hasattr(response, 'text'):
+            return response.text
+        if hasattr(response, 'parts') and len(response.parts) > 0:
+            return response.parts[0].text
+        # Direct access for newer Gemini API versions
+        return str(response.candidates[0].content.parts[0].text)
+
+
+class FakeLLMError(RuntimeError):
+    """Failure injected by FakeLLMBackend."""
+
+
+class FakeLLMBackend:
+    """
+    Deterministic stand-in for an LLM, to run, benchmark and load-test the
+    pipeline without an API key.
+
+    A prompt containing a key of `responses` gets that canned response.
+    Otherwise, when the prompt shows a JSON example of the expected output
+    (as every agent prompt does), the largest such example is returned with
+    each "true|false" style alternative resolved; any other prompt gets a
+    short text derived from its hash. The same prompt always gives the same
+    response.
+
+    Args:
+        responses (dict): Prompt substring -> canned response; also loaded from
+            the JSON file named by LLM_FAKE_RESPONSES.
+        latency (float): Seconds each call takes (LLM_FAKE_LATENCY_MS).
+        jitter (float): Extra random delay of up to this many seconds (LLM_FAKE_JITTER_MS).
+        failure_rate (float): Share of calls raising FakeLLMError (LLM_FAKE_FAILURE_RATE).
+        seed (int): Seed of the latency and failure draws (LLM_FAKE_SEED).
+        cacheable (bool): Whether responses go to the shared response cache;
+            off by default so load tests measure the backend.
+    """
+
+    name = "fake"
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None, latency: Optional[float] = None,
+                 jitter: Optional[float] = None, failure_rate: Optional[float] = None,
+                 seed: Optional[int] = None, cacheable: bool = False):
+        self.responses = dict(responses or {})
+        if responses is None and os.getenv("LLM_FAKE_RESPONSES"):
+            with open(os.getenv("LLM_FAKE_RESPONSES"), "r", encoding="utf-8") as f:
+                self.responses = json.load(f)
+        self.latency = float(os.getenv("LLM_FAKE_LATENCY_MS", "0")) / 1000 if latency is None else latency
+        self.jitter = float(os.getenv("LLM_FAKE_JITTER_MS", "0")) / 1000 if jitter is None else jitter
+        self.failure_rate = float(os.getenv("LLM_FAKE_FAILURE_RATE", "0")) if failure_rate is None else failure_rate
+        self.cacheable = cacheable
+        self.calls = 0
+        self._random = random.Random(int(os.getenv("LLM_FAKE_SEED", "0")) if seed is None else seed)
+        self._lock = threading.Lock()
+
+    def generate(self, model_name: str, generation_config: Optional[dict], prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.random() * self.jitter
+            fail = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise FakeLLMError(f"Injected failure from the fake {model_name}")
+        return self.respond(prompt)
+
+    def respond(self, prompt: str) -> str:
+        for fragment, response in self.responses.items():
+            if fragment in prompt:
+                return response
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        example = _json_example(prompt, random.Random(digest))
+        if example is not None:
+            return json.dumps(example, indent=2)
+        return f"Fake response {digest[:12]}"
+
+
+# Bare alternatives in JSON examples, e.g. "passed": true|false
+_ALTERNATIVES = re.compile(r"\b(?:true|false|null|-?\d+(?:\.\d+)?)(?:\|(?:true|false|null|-?\d+(?:\.\d+)?))+\b")
+
+
+def _balanced_blocks(text: str):
+    """Yields every balanced {...} / [...] span of text, in one pass over it."""
+    closing = {"{": "}", "[": "]"}
+    stack = []
+    for position, char in enumerate(text):
+        if char in closing:
+            stack.append((closing[char], position))
+        elif char in "}]":
+            if stack and stack[-1][0] == char:
+                yield text[stack.pop()[1]:position + 1]
+            else:
+                # Stray bracket in prose; nothing open before it can be a JSON example
+                stack = []
+
+
+def _json_example(prompt: str, rng: random.Random):
+    """The largest JSON example in the prompt, with alternatives resolved, or None."""
+    best = None
+    for block in _balanced_blocks(prompt):
+        if '"' not in block or (best is not None and len(block) <= len(best)):
+            continue
+        try:
+            json.loads(_ALTERNATIVES.sub(lambda m: "null", block))
+        except ValueError:
+            continue
+        best = block
+    if best is None:
+        return None
+    return json.loads(_ALTERNATIVES.sub(lambda m: rng.choice(m.group(0).split("|")), best))
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeLLMBackend,
+}
+
+for _name, _cls in BACKENDS.items():
+    resources.register(f"llm_backend:{_name}", _cls)
+
+
+def get_llm_backend(name: Optional[str] = None, **options):
+    """
+    Returns the LLM backend for this deployment (LLM_BACKEND). Without
+    options the shared instance is returned; options such as api_key or
+    latency build a dedicated one.
+    """
+    name = name or LLM_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'; expected one of {sorted(BACKENDS)}")
+    options = {key: value for key, value in options.items() if value is not None}
+    if options:
+        return BACKENDS[name](**options)
+    return resources.get(f"llm_backend:{name}")
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from PreProcessing import resources
+from PreProcessing.llmBackends import get_llm_backend
+
+DEFAULT_LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# 0 keeps responses until they are evicted
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "0")) * 3600
+# LLM_CACHE=0 disables reads and writes, e.g. to compare prompt changes against fresh output
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+
+
+def response_key(model_name: str, generation_config: Optional[dict], prompt: str, backend: str = "gemini") -> str:
+    """sha256 of the backend, model, its generation config and the prompt; any change is a different entry."""
+    payload = json.dumps([backend, model_name, generation_config or {}, prompt], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM responses shared by every agent and process.
+
+    Entries live in SQLite (WAL, so concurrent Streamlit sessions can share
+    it) keyed by response_key. Reads refresh an entry's last access time;
+    once the stored text exceeds max_bytes the least recently used entries
+    are evicted. With a ttl_seconds, older entries count as misses and are
+    dropped.
+
+    Args:
+        path (str): SQLite database file.
+        max_bytes (int): Upper bound on the total size of cached responses.
+        ttl_seconds (float): Maximum age of a response, 0 for no expiry.
+    """
+
+    def __init__(self, path: str = DEFAULT_LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def get(self, key: str, validate: Optional[Callable[[str], Any]] = None) -> Optional[str]:
+        """
+        The cached response, or None. Expired responses and ones that validate
+        rejects (see generate_text) are misses and are dropped.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and ((self.ttl_seconds and now - row[1] > self.ttl_seconds)
+                                    or not _valid(row[0], validate)):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model_name: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, size, now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes (caller holds the lock)."""
+        excess = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+resources.register("llm_cache", LLMResponseCache)
+
+
+def get_llm_cache() -> LLMResponseCache:
+    return resources.get("llm_cache")
+
+
+def parse_json_response(content: str) -> Any:
+    """The JSON in an LLM response, without a ```json fence around it; raises ValueError if it isn't JSON."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content[content.find("\n") + 1:] if "\n" in content else ""
+        if "```" in content:
+            content = content[:content.rfind("```")]
+    return json.loads(content)
+
+
+def generate_text(model_name: str, generation_config: Optional[dict], prompt: str, bypass: bool = False,
+                  backend=None, validate: Optional[Callable[[str], Any]] = None) -> str:
+    """
+    Text of an LLM response from the configured backend (LLM_BACKEND, see
+    PreProcessing.llmBackends), served from the shared response cache when
+    the same model, generation config and prompt were seen before.
+
+    validate, e.g. parse_json_response for prompts asking for JSON, is called
+    on the response and must not raise for it to be cached; a malformed
+    response is still returned, but the next call asks the model again, and
+    cached responses failing it count as misses and are dropped. bypass=True skips the
+    lookup and stores the fresh response in place of the cached one;
+    LLM_CACHE=0 turns the cache off entirely. Backends that aren't
+    cacheable, like the offline fake by default, always generate.
+    """
+    backend = backend or get_llm_backend()
+    use_cache = LLM_CACHE_ENABLED and backend.cacheable
+    key = response_key(model_name, generation_config, prompt, backend.name)
+    if use_cache and not bypass:
+        cached = get_llm_cache().get(key, validate)
+        if cached is not None:
+            return cached
+
+    content = backend.generate(model_name, generation_config, prompt)
+    if use_cache and content and _valid(content, validate):
+        get_llm_cache().put(key, model_name, content)
+    return content
@@ -0,0 +1,67 @@
+import fitz  # PyMuPDF
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# Kept separate from Chunking.py so spawned workers only import PyMuPDF,
+# not the sentence-transformer and tokenizer loaded there.
+
+
+def page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extracts pages [start, stop) from a PDF. Each worker opens its own
+    document handle, since fitz documents can't be shared across processes.
+
+    Returns:
+        list: (page_number, text) tuples, page numbers starting at 1.
+    """
+    with fitz.open(pdf_path) as doc:
+        return [(page_number + 1, doc[page_number].get_text()) for page_number in range(start, stop)]
+
+
+def split_page_ranges(total_pages: int, parts: int) -> List[Tuple[int, int]]:
+    parts = max(1, min(parts, total_pages))
+    size, remainder = divmod(total_pages, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pages_parallel(pdf_path: str, workers: Optional[int] = None, ranges_per_worker: int = 4) -> List[Tuple[int, str]]:
+    """
+    Extracts every page of a PDF with a process pool.
+
+    The document is split into contiguous page ranges (a few per worker so a
+    slow range doesn't hold up the whole pool) and the results are put back
+    together in page order.
+
+    Args:
+        pdf_path (str): Path to the PDF.
+        workers (int): Number of worker processes, defaults to os.cpu_count().
+        ranges_per_worker (int): How many page ranges to hand each worker.
+
+    Returns:
+        list: (page_number, text) tuples ordered by page number.
+    """
+    workers = workers or os.cpu_count() or 1
+    total_pages = page_count(pdf_path)
+    if workers <= 1 or total_pages <= 1:
+        return extract_page_range(pdf_path, 0, total_pages)
+
+    ranges = split_page_ranges(total_pages, workers * ranges_per_worker)
+    pages = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [executor.submit(extract_page_range, pdf_path, start, stop) for start, stop in ranges]
+        # Ranges were submitted in order, so collecting in submission order keeps pages sorted
+        for future in futures:
+            pages.extend(future.result())
+    return pages
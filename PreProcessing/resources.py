@@ -0,0 +1,137 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Process-wide registry of expensive models and clients.
+# Nothing is loaded at import time: each resource is built on first use and
+# the same instance is shared by every module that asks for it.
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def register(name: str, factory: Callable[[], Any]):
+    """Registers a factory. Re-registering a name that is already loaded has no effect."""
+    with _registry_lock:
+        _factories.setdefault(name, factory)
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name: str) -> Any:
+    """Returns the shared instance of a resource, building it on first call."""
+    if name in _instances:
+        return _instances[name]
+    if name not in _factories:
+        raise KeyError(f"No resource registered under '{name}'")
+    # Per-resource lock so loading one model doesn't block access to another
+    with _locks[name]:
+        if name not in _instances:
+            _instances[name] = _factories[name]()
+    return _instances[name]
+
+
+def is_loaded(name: str) -> bool:
+    return name in _instances
+
+
+def prewarm(names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+    """
+    Loads resources ahead of first use.
+
+    With background=True loading happens on a daemon thread and the thread is
+    returned; callers that need a resource before it finishes simply wait on
+    its lock in get().
+    """
+    names = list(names) if names is not None else list(_factories)
+
+    def load_all():
+        for name in names:
+            try:
+                get(name)
+            except Exception as e:
+                # Prewarming is best effort; the real call will raise again
+                print(f"Prewarming '{name}' failed: {e}")
+
+    if not background:
+        load_all()
+        return None
+    thread = threading.Thread(target=load_all, name="resource-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def prewarm_from_env(variable: str = "PREWARM_RESOURCES") -> Optional[threading.Thread]:
+    """Prewarms the comma-separated resource names in an environment variable, if set."""
+    names = [name.strip() for name in os.getenv(variable, "").split(",") if name.strip()]
+    return prewarm(names) if names else None
+
+
+class LazyResource:
+    """Attribute proxy that loads the named resource the first time it is used."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(get(self._name), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if is_loaded(self._name) else "not loaded"
+        return f"<LazyResource '{self._name}' ({state})>"
+
+
+def lazy(name: str, factory: Optional[Callable[[], Any]] = None) -> LazyResource:
+    if factory is not None:
+        register(name, factory)
+    return LazyResource(name)
+
+
+def _load_sentence_embedder(model_name: Optional[str] = None):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name or SENTENCE_EMBEDDER_MODEL)
+
+
+def _load_sentence_embedder_int8(model_name: Optional[str] = None):
+    """
+    CPU-only copy of the sentence embedder with dynamic int8 quantization of
+    its Linear layers (weights stored as int8, activations quantized on the fly).
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name or SENTENCE_EMBEDDER_MODEL, device="cpu")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def sentence_embedder_resource(model_name: str, quantized: bool = False) -> str:
+    """
+    Resource name of the SentenceTransformer for model_name. The chunker's
+    model is "sentence_embedder" (or "sentence_embedder_int8"); any other
+    model gets its own resource, registered here on first request.
+    """
+    name = "sentence_embedder_int8" if quantized else "sentence_embedder"
+    if model_name == SENTENCE_EMBEDDER_MODEL:
+        return name
+    name = f"{name}:{model_name}"
+    loader = _load_sentence_embedder_int8 if quantized else _load_sentence_embedder
+    register(name, lambda: loader(model_name))
+    return name
+
+
+def _load_tiktoken():
+    import tiktoken
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def _load_pinecone():
+    from pinecone import Pinecone
+    return Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+
+SENTENCE_EMBEDDER_MODEL = "all-MiniLM-L6-v2"
+
+register("sentence_embedder", _load_sentence_embedder)
+register("sentence_embedder_int8", _load_sentence_embedder_int8)
+register("tiktoken", _load_tiktoken)
+register("pinecone", _load_pinecone)
@@ -1,10 +1,13 @@
 from PreProcessing.Chunking import semantic_chunk_pdf_json
 from PreProcessing.create_embedding import generate_embeddings_with_keywords
 from PreProcessing.extractComData import extract_company_data
-from Agents.compliance_check import run_compliance_check
-from Agents.contractRisk import analyze_contract_risks
-from Agents.mandatoryEligibility import extract_eligibility_criteria
-from Agents.submissionCheck import generate_submission_checklist
+from Agents.compliance_check import RETRIEVAL_QUERY as COMPLIANCE_QUERY, run_compliance_check
+from Agents.contractRisk import RETRIEVAL_QUERY as RISK_QUERY, analyze_contract_risks
+from Agents.mandatoryEligibility import RETRIEVAL_QUERY as ELIGIBILITY_QUERY, extract_eligibility_criteria
+from Agents.submissionCheck import RETRIEVAL_QUERY as SUBMISSION_QUERY, generate_submission_checklist
+from Agents.orchestrator import run_agents
+from embedding.namespaces import DEFAULT_NAMESPACE
+from embedding.retrieval import retrieve_for_agents
 
 import json
 
@@ -12,21 +15,32 @@ if __name__ == "__main__":
     pdf_path = r"D:/OdysseyCode/Odysssey_AI_Hack/Dataset/ELIGIBLE RFP - 1.pdf"
     docx_path = "D:/OdysseyCode/Odysssey_AI_Hack/Dataset/Company Data.docx"
     output_path = "chunked_output.json"
+    # Chunks already ingested into the shared namespace; for a per-document one use
+    # embedding.namespaces.document_namespace(pdf_path) and ingest into it first
+    namespace = DEFAULT_NAMESPACE
     # print("creating chunks for RFD")
     # chunks = semantic_chunk_pdf_json(pdf_path)
     # print("genrerating embeddings")
-    # embeddings = generate_embeddings_with_keywords(chunks)
+    # embeddings = generate_embeddings_with_keywords(chunks, namespace=namespace, document_id=namespace)
     print("extract_company_data")
     result = extract_company_data(docx_path)
     dicDataCom = json.dumps(result, indent=4)
-    compliance_check = run_compliance_check(result)
-    print("compliance_check",compliance_check)
-    eligibility_criteria = extract_eligibility_criteria(result)
-    print("eligibility_criteria",eligibility_criteria)
-    submission_checklist = generate_submission_checklist()
-    print("submission_checklist",submission_checklist)
-    analyze_contract = analyze_contract_risks(result)
-    print("analyze_contract",analyze_contract)
+    # Retrieval for all four agents in one pass
+    retrieved = retrieve_for_agents({
+        "compliance": COMPLIANCE_QUERY,
+        "eligibility": ELIGIBILITY_QUERY,
+        "submission": SUBMISSION_QUERY,
+        "risk": RISK_QUERY,
+    }, namespace)
+    # The four agents run concurrently, so the analysis takes about as long as the slowest one
+    outcomes = run_agents({
+        "compliance_check": lambda: run_compliance_check(result, namespace, retrieved["compliance"]),
+        "eligibility_criteria": lambda: extract_eligibility_criteria(result, namespace, retrieved["eligibility"]),
+        "submission_checklist": lambda: generate_submission_checklist(namespace, retrieved["submission"]),
+        "analyze_contract": lambda: analyze_contract_risks(result, namespace, retrieved["risk"]),
+    })
+    for name, outcome in outcomes.items():
+        print(name, outcome["result"] if outcome["status"] == "ok" else f"{outcome['status']}: {outcome['error']}")
     
 
     
@@ -0,0 +1,126 @@
+"""
+Throughput and concurrency of the analysis agents, offline.
+
+Runs the four agents against the fake LLM backend (LLM_BACKEND=fake, see
+PreProcessing.llmBackends) with a configurable per-call latency and failure
+rate, sequentially and through Agents.orchestrator.run_agents, and reports
+the wall-clock time per analysis and the share of agents that failed.
+Retrieval is replaced by fixed chunks, so no index, embedding provider or
+API key is needed.
+
+Usage (from the repository root):
+    python -m benchmarks.agent_pipeline
+    python -m benchmarks.agent_pipeline --latency-ms 2000 --jitter-ms 500 --failure-rate 0.1 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ["LLM_BACKEND"] = "fake"
+
+from Agents.compliance_check import run_compliance_check
+from Agents.contractRisk import analyze_contract_risks
+from Agents.mandatoryEligibility import extract_eligibility_criteria
+from Agents.orchestrator import run_agents
+from Agents.submissionCheck import generate_submission_checklist
+from PreProcessing.llmBackends import get_llm_backend
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+COMPANY_DATA = {
+    "Company Name": "FirstStaff Workforce Solutions, LLC",
+    "State of Incorporation": "Delaware",
+    "Years of Experience": "9 years",
+    "DUNS Number": "07-842-1490",
+    "CAGE Code": "8J4T7",
+    "SAM.gov Registration": "Active",
+}
+
+
+def synthetic_retrieval(top_k: int = 5) -> dict:
+    """Fixed retrieval results shaped like retrieve_for_agents output, one per agent."""
+    return {
+        category: {
+            "matches": [
+                {"id": f"{category}-{i}", "score": 1.0 - i / 10,
+                 "metadata": {"Sub Title": f"{category.title()} section {i}",
+                              "chunk": f"Section {i} of the RFP covers {', '.join(keywords)}.",
+                              "keywords": keywords[:5]}}
+                for i in range(top_k)
+            ],
+            "namespace": "benchmark",
+        }
+        for category, keywords in KEYWORD_TAXONOMY.items()
+    }
+
+
+def agent_calls(retrieved: dict) -> dict:
+    return {
+        "compliance_check": lambda: run_compliance_check(COMPANY_DATA, retrieved=retrieved["compliance"]),
+        "eligibility_criteria": lambda: extract_eligibility_criteria(COMPANY_DATA, retrieved=retrieved["eligibility"]),
+        "submission_checklist": lambda: generate_submission_checklist(retrieved=retrieved["submission"]),
+        "contract_risks": lambda: analyze_contract_risks(COMPANY_DATA, retrieved=retrieved["risk"]),
+    }
+
+
+def run_sequential(agents: dict) -> dict:
+    outcomes = {}
+    for name, agent in agents.items():
+        try:
+            outcomes[name] = {"status": "ok", "result": agent()}
+        except Exception as e:
+            outcomes[name] = {"status": "error", "error": str(e)}
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=1000, help="Latency of each fake LLM call")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random latency of up to this much")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of LLM calls that fail")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-agent timeout of the concurrent run (s)")
+    parser.add_argument("--runs", type=int, default=3, help="Analyses per mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "agent_pipeline.json"))
+    args = parser.parse_args()
+
+    # The agents use the shared fake backend, which reads its settings on first use
+    os.environ.update({"LLM_FAKE_LATENCY_MS": str(args.latency_ms), "LLM_FAKE_JITTER_MS": str(args.jitter_ms),
+                       "LLM_FAKE_FAILURE_RATE": str(args.failure_rate), "LLM_FAKE_SEED": str(args.seed)})
+    backend = get_llm_backend()
+    agents = agent_calls(synthetic_retrieval())
+
+    results = {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "failure_rate": args.failure_rate, "modes": {}}
+    for mode, run in (("sequential", run_sequential),
+                      ("concurrent", lambda calls: run_agents(calls, timeout=args.timeout))):
+        seconds, failed = [], 0
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            outcomes = run(agents)
+            seconds.append(time.perf_counter() - start)
+            failed += sum(outcome["status"] != "ok" for outcome in outcomes.values())
+        results["modes"][mode] = {
+            "mean_seconds": statistics.mean(seconds),
+            "max_seconds": max(seconds),
+            "analyses_per_minute": 60 / statistics.mean(seconds),
+            "failed_agents": failed / (args.runs * len(agents)),
+        }
+
+    print(f"{'mode':<12}{'mean':>9}{'max':>9}{'per min':>9}{'failed':>9}")
+    for mode, stats in results["modes"].items():
+        print(f"{mode:<12}{stats['mean_seconds']:>8.2f}s{stats['max_seconds']:>8.2f}s"
+              f"{stats['analyses_per_minute']:>9.1f}{stats['failed_agents']:>9.1%}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"{backend.calls} fake LLM calls")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
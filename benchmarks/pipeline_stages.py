@@ -0,0 +1,200 @@
+"""
+Stage-level benchmark of semantic_chunk_pdf_json.
+
+Runs extraction, sentence split, embedding, clustering, merge and keyword
+tagging one after another over every PDF in Dataset/ and over synthetic
+documents made by repeating a Dataset/ PDF's pages (10x, 100x, ...). For
+every stage it records wall time, peak RSS and items per second, writes the
+results as JSON and compares them with a saved baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.pipeline_stages                      # run and compare
+    python -m benchmarks.pipeline_stages --save-baseline      # record a new baseline
+    python -m benchmarks.pipeline_stages --scales 1,10 --segmenter sliding_window
+
+Exits with status 1 if any stage is slower than the baseline by more than
+--tolerance.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+
+from PreProcessing import Chunking
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(ROOT, "Dataset")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes, or 0 if it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+@contextmanager
+def measure(record: dict, interval: float = 0.01):
+    """Times the block and samples RSS on a background thread to find its peak."""
+    start_rss = current_rss()
+    peak = [start_rss]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            peak[0] = max(peak[0], current_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        done.set()
+        sampler.join()
+        record["peak_rss_mb"] = max(peak[0], current_rss()) / (1024 * 1024)
+        record["rss_growth_mb"] = record["peak_rss_mb"] - start_rss / (1024 * 1024)
+
+
+def run_stages(pdf_path: str, max_tokens: int, threshold: float, segmenter: str) -> dict:
+    stages = {}
+
+    def stage(name: str, items_of):
+        record = stages.setdefault(name, {})
+
+        @contextmanager
+        def wrapper():
+            with measure(record):
+                yield
+            record["items"] = items_of()
+            record["items_per_sec"] = record["items"] / record["seconds"] if record["seconds"] else 0.0
+        return wrapper()
+
+    out = {}
+    with stage("extraction", lambda: out["pages"]):
+        raw_text = Chunking.extract_text_from_pdf(pdf_path)
+        with fitz.open(pdf_path) as doc:
+            out["pages"] = doc.page_count
+    with stage("sentence_split", lambda: len(sentences)):
+        sentences = Chunking.sentence_tokenize(raw_text)
+    with stage("embedding", lambda: len(sentences)):
+        embeddings = Chunking.embed_sentences_np(sentences)
+    with stage("clustering", lambda: len(sentences)):
+        labels = Chunking.label_sentences(embeddings, segmenter=segmenter, threshold=threshold)
+        clusters = Chunking.group_by_clusters(sentences, labels)
+    with stage("merge", lambda: len(chunks)):
+        chunks = Chunking.merge_chunks(clusters, max_tokens=max_tokens)
+    with stage("keyword_tagging", lambda: len(chunks)):
+        Chunking.extract_keywords_batch(chunks)
+    return stages
+
+
+def make_scaled_pdf(source_path: str, factor: int, directory: str) -> str:
+    """Writes a synthetic PDF consisting of source_path's pages repeated factor times."""
+    path = os.path.join(directory, f"{os.path.splitext(os.path.basename(source_path))[0]} x{factor}.pdf")
+    with fitz.open(source_path) as source, fitz.open() as scaled:
+        for _ in range(factor):
+            scaled.insert_pdf(source)
+        scaled.save(path)
+    return path
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_seconds: float = 0.05) -> list[str]:
+    regressions = []
+    for document, stages in results["documents"].items():
+        for name, record in stages.items():
+            base = baseline.get("documents", {}).get(document, {}).get(name)
+            if not base:
+                continue
+            # Ignore stages too short to time reliably
+            if record["seconds"] > base["seconds"] * (1 + tolerance) and record["seconds"] - base["seconds"] > min_seconds:
+                regressions.append(f"{document} / {name}: {record['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+            if base.get("peak_rss_mb") and record["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+                regressions.append(f"{document} / {name}: peak RSS {record['peak_rss_mb']:.0f}MB vs baseline {base['peak_rss_mb']:.0f}MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated scale factors for synthetic documents")
+    parser.add_argument("--scale-source", default="ELIGIBLE RFP - 1.pdf", help="Dataset/ PDF the synthetic documents are built from")
+    parser.add_argument("--segmenter", default="agglomerative", choices=Chunking.SEGMENTERS)
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=1.5)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline as well")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a stage counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Slowdowns smaller than this are ignored")
+    args = parser.parse_args()
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "segmenter": args.segmenter,
+        "documents": {},
+    }
+
+    Chunking.embed_sentences(["warm up"])  # keep model loading out of the embedding stage
+
+    with tempfile.TemporaryDirectory() as tmp:
+        documents = sorted(glob.glob(os.path.join(DATASET_DIR, "*.pdf")))
+        for factor in (int(f) for f in args.scales.split(",") if f.strip()):
+            if factor > 1:
+                documents.append(make_scaled_pdf(os.path.join(DATASET_DIR, args.scale_source), factor, tmp))
+
+        for pdf_path in documents:
+            name = os.path.basename(pdf_path)
+            print(f"Benchmarking {name}...")
+            stages = run_stages(pdf_path, args.max_tokens, args.threshold, args.segmenter)
+            results["documents"][name] = stages
+            for stage_name, record in stages.items():
+                print(f"  {stage_name:<16} {record['seconds']:>9.3f}s  {record['peak_rss_mb']:>8.0f}MB  "
+                      f"{record['items_per_sec']:>10.1f} items/s ({record['items']} items)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
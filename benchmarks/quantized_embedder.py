@@ -0,0 +1,87 @@
+"""
+Compares the fp32 and dynamically int8-quantized chunking embedders on the
+bundled RFPs.
+
+Reports sentences/second for each mode and how closely the quantized
+embeddings reproduce the fp32 clustering (adjusted Rand index and exact
+label-partition agreement).
+
+Usage (from the repository root):
+    python -m benchmarks.quantized_embedder --batch-size 32 --threads 4
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from PreProcessing import Chunking
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Dataset")
+
+
+def time_embedding(sentences: list[str], quantized: bool, batch_size: int, threads: int) -> tuple[np.ndarray, float]:
+    Chunking.configure_embedder(quantized=quantized, batch_size=batch_size, num_threads=threads)
+    Chunking.embed_sentences(sentences[:batch_size])  # load model and warm up kernels
+    start = time.perf_counter()
+    embeddings = Chunking.embed_sentences(sentences).cpu().numpy()
+    return embeddings, time.perf_counter() - start
+
+
+def pair_agreement(labels_a, labels_b) -> float:
+    """Fraction of sentence pairs that both labelings put together or apart."""
+    from sklearn.metrics import pair_confusion_matrix
+    matrix = pair_confusion_matrix(labels_a, labels_b)
+    return float(np.trace(matrix) / matrix.sum()) if matrix.sum() else 1.0
+
+
+def benchmark_pdf(pdf_path: str, batch_size: int, threads: int, threshold: float) -> dict:
+    from sklearn.metrics import adjusted_rand_score
+    sentences = Chunking.sentence_tokenize(Chunking.extract_text_from_pdf(pdf_path))
+    fp32, fp32_seconds = time_embedding(sentences, False, batch_size, threads)
+    int8, int8_seconds = time_embedding(sentences, True, batch_size, threads)
+
+    fp32_labels = Chunking.cluster_sentences(fp32, threshold=threshold)
+    int8_labels = Chunking.cluster_sentences(int8, threshold=threshold)
+    cosine = np.sum(fp32 * int8, axis=1) / (np.linalg.norm(fp32, axis=1) * np.linalg.norm(int8, axis=1))
+
+    return {
+        "pdf": os.path.basename(pdf_path),
+        "sentences": len(sentences),
+        "fp32_sentences_per_sec": len(sentences) / fp32_seconds,
+        "int8_sentences_per_sec": len(sentences) / int8_seconds,
+        "speedup": fp32_seconds / int8_seconds,
+        "mean_cosine_to_fp32": float(cosine.mean()),
+        "adjusted_rand_index": float(adjusted_rand_score(fp32_labels, int8_labels)),
+        "pair_agreement": pair_agreement(fp32_labels, int8_labels),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--threshold", type=float, default=1.5)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for pdf_path in sorted(glob.glob(os.path.join(DATASET_DIR, "*.pdf"))):
+        result = benchmark_pdf(pdf_path, args.batch_size, args.threads, args.threshold)
+        results.append(result)
+        print(
+            f"{result['pdf']}: {result['sentences']} sentences | "
+            f"fp32 {result['fp32_sentences_per_sec']:.1f}/s | int8 {result['int8_sentences_per_sec']:.1f}/s "
+            f"({result['speedup']:.2f}x) | cosine {result['mean_cosine_to_fp32']:.4f} | "
+            f"ARI {result['adjusted_rand_index']:.3f} | pair agreement {result['pair_agreement']:.3f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
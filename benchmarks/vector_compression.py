@@ -0,0 +1,141 @@
+"""
+Recall versus memory and latency of compressed local vector storage.
+
+Chunks every RFP in Dataset/, embeds the chunks with the configured
+embedding provider (EMBEDDING_PROVIDER), and queries a full-precision
+LocalIndex and compressed ones (see LOCAL_VECTOR_COMPRESSION) with the four
+agents' keyword queries plus the first sentence of every chunk. For each
+compression spec and re-score factor it reports recall@k against the exact
+top-k, the bytes held in memory for search and the mean query latency.
+--repeat tiles the corpus (with small noise) to measure at a larger scale.
+
+Usage (from the repository root):
+    python -m benchmarks.vector_compression
+    python -m benchmarks.vector_compression --specs int8,pca256-int8,pca128-int8 --repeat 50
+"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from PreProcessing.Chunking import semantic_chunk_pdf_json, sentence_tokenize
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+from embedding.localIndex import LocalIndex, compression_options
+from embedding.providers import get_embedding_provider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(ROOT, "Dataset")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def load_corpus(cache_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Chunk and query embeddings for the bundled RFPs, cached since embedding is the slow part."""
+    provider = get_embedding_provider()
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            if str(cached["model"]) == provider.model:
+                return cached["passages"], cached["queries"]
+
+    chunks = []
+    for pdf_path in sorted(glob.glob(os.path.join(DATASET_DIR, "*.pdf"))):
+        print(f"Chunking {os.path.basename(pdf_path)}...")
+        chunks.extend(entry["chunk"] for entry in semantic_chunk_pdf_json(pdf_path))
+    queries = [" ".join(keywords) for keywords in KEYWORD_TAXONOMY.values()]
+    queries += [sentences[0] for sentences in map(sentence_tokenize, chunks) if sentences]
+
+    print(f"Embedding {len(chunks)} chunks and {len(queries)} queries with {provider.model}...")
+    passages = np.asarray(provider.embed_passages(chunks), dtype=np.float32)
+    query_vectors = np.asarray(provider.embed_queries(queries), dtype=np.float32)
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    np.savez(cache_path, passages=passages, queries=query_vectors, model=np.array(provider.model))
+    return passages, query_vectors
+
+
+def tile(passages: np.ndarray, repeat: int, noise: float = 0.02, seed: int = 0) -> np.ndarray:
+    if repeat <= 1:
+        return passages
+    rng = np.random.RandomState(seed)
+    tiled = np.concatenate([passages + noise * rng.randn(*passages.shape).astype(np.float32) for _ in range(repeat)])
+    return tiled.astype(np.float32)
+
+
+def build_index(store_dir: str, passages: np.ndarray, spec: str, batch: int = 1000) -> LocalIndex:
+    # hnsw_threshold is raised so the full-precision baseline is an exact search
+    index = LocalIndex(f"bench-{spec or 'full'}", store_dir=store_dir, hnsw_threshold=1 << 62,
+                       autosave=False, **compression_options(spec))
+    for start in range(0, len(passages), batch):
+        index.upsert([{"id": str(i), "values": passages[i]} for i in range(start, min(start + batch, len(passages)))], "bench")
+    index.save("bench")
+    # Reload, so compressed indexes search from their memory-mapped files like in production
+    return LocalIndex(index.name, store_dir=store_dir, hnsw_threshold=1 << 62, autosave=False, **compression_options(spec))
+
+
+def run_queries(index: LocalIndex, queries: np.ndarray, top_k: int) -> tuple[list[list[str]], float]:
+    start = time.perf_counter()
+    results = [[match["id"] for match in index.query("bench", query, top_k=top_k)["matches"]] for query in queries]
+    return results, (time.perf_counter() - start) / max(len(queries), 1)
+
+
+def search_bytes(index: LocalIndex) -> int:
+    store = index.namespaces["bench"]
+    if store.codes is not None:
+        return int(store.codes.nbytes)
+    return int(store.vectors.nbytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--specs", default="int8,truncate256-int8,pca256-int8,pca128-int8,pca64-int8",
+                        help="Comma-separated compression specs to compare with full precision")
+    parser.add_argument("--rescore-factors", default="1,2,4,8", help="Candidates re-scored, as multiples of top_k")
+    parser.add_argument("--top-k", default="3,5", help="Comma-separated k values for recall@k")
+    parser.add_argument("--repeat", type=int, default=1, help="Tile the corpus this many times")
+    parser.add_argument("--embeddings", default=os.path.join(RESULTS_DIR, "vector_compression_embeddings.npz"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "vector_compression.json"))
+    args = parser.parse_args()
+
+    passages, queries = load_corpus(args.embeddings)
+    passages = tile(passages, args.repeat)
+    ks = [int(k) for k in args.top_k.split(",")]
+    factors = [int(f) for f in args.rescore_factors.split(",")]
+    print(f"{len(passages)} vectors of dimension {passages.shape[1]}, {len(queries)} queries")
+
+    results = {"vectors": len(passages), "dimension": int(passages.shape[1]), "queries": len(queries), "runs": []}
+    with tempfile.TemporaryDirectory() as store_dir:
+        full = build_index(store_dir, passages, "")
+        truth = {k: run_queries(full, queries, k)[0] for k in ks}
+        full_latency = run_queries(full, queries, max(ks))[1]
+        full_bytes = search_bytes(full)
+        results["runs"].append({"spec": "full", "rescore_factor": None, "bytes": full_bytes,
+                                "latency_ms": full_latency * 1000, **{f"recall@{k}": 1.0 for k in ks}})
+
+        for spec in filter(None, args.specs.split(",")):
+            index = build_index(store_dir, passages, spec)
+            for factor in factors:
+                index.rescore_factor = factor
+                run = {"spec": spec, "rescore_factor": factor, "bytes": search_bytes(index)}
+                for k in ks:
+                    found, latency = run_queries(index, queries, k)
+                    run[f"recall@{k}"] = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth[k])]))
+                run["latency_ms"] = latency * 1000
+                results["runs"].append(run)
+
+    header = f"{'spec':<20}{'rescore':>8}{'memory':>12}{'vs full':>9}{'latency':>11}" + "".join(f"{'recall@' + str(k):>11}" for k in ks)
+    print(header)
+    for run in results["runs"]:
+        print(f"{run['spec']:<20}{run['rescore_factor'] or '-':>8}{run['bytes'] / 1024:>10.0f}KB"
+              f"{run['bytes'] / full_bytes:>9.2f}{run['latency_ms']:>9.2f}ms"
+              + "".join(f"{run[f'recall@{k}']:>11.3f}" for k in ks))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-from pinecone import Pinecone, ServerlessSpec
-import time
+# Run from the repository root: python -m embedding.chromDBem
+from pinecone import Pinecone
 import json
 import os
 from dotenv import load_dotenv
+from embedding.provisioning import ensure_index
 
 load_dotenv()
 pinecone_api_key = os.getenv("PINECONE_API_KEY")
@@ -17,14 +18,14 @@ contents = [entry['Content'] for entry in data if 'Content' in entry]
 # print("content: ", contents)  
 index_name = "refdocanalysis"
 
-pc.create_index(
-    name=index_name,
+# Creates the index only if it is missing and waits until it is ready
+ensure_index(
+    pc,
+    index_name,
     dimension=1024, # Replace with your model dimensions
     metric="cosine", # Replace with your model metric
-    spec=ServerlessSpec(
-        cloud="aws",
-        region="us-east-1"
-    ) 
+    cloud="aws",
+    region="us-east-1"
 )
 
 embeddings = pc.inference.embed(
@@ -56,5 +57,4 @@ for entry, embedding in zip(data, embeddings):
 index.upsert(
     vectors=vectors,
     namespace="ns"
-)# Wait for the index to be ready
-
+)
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from PreProcessing import resources
+
+DEFAULT_CONTENT_PATH = os.getenv("CONTENT_STORE_PATH", os.path.join(".cache", "content.sqlite3"))
+
+# SQLite caps the number of bound parameters per statement
+_MAX_PARAMS = 900
+
+
+class ContentStore:
+    """
+    Chunk text kept next to the vector index, keyed by (index, namespace,
+    vector ID), so vectors only carry small metadata and retrieval reads
+    the text of all matches with one local query.
+    """
+
+    def __init__(self, path: str = DEFAULT_CONTENT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " index_name TEXT NOT NULL, namespace TEXT NOT NULL, id TEXT NOT NULL, chunk TEXT NOT NULL,"
+                " PRIMARY KEY (index_name, namespace, id))"
+            )
+
+    def put(self, index_name: str, namespace: str, rows: Iterable[Tuple[str, str]]):
+        """Stores (vector ID, text) pairs, replacing existing ones."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (index_name, namespace, id, chunk) VALUES (?, ?, ?, ?)",
+                ((index_name, namespace, vector_id, text) for vector_id, text in rows)
+            )
+
+    def get_many(self, index_name: str, namespace: str, ids: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _MAX_PARAMS):
+                batch = ids[start:start + _MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT id, chunk FROM chunks WHERE index_name = ? AND namespace = ? AND id IN ({','.join('?' * len(batch))})",
+                    [index_name, namespace, *batch]
+                )
+                found.update(rows)
+        return found
+
+    def delete(self, index_name: str, namespace: str, ids: List[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE index_name = ? AND namespace = ? AND id = ?",
+                ((index_name, namespace, vector_id) for vector_id in ids)
+            )
+
+    def delete_namespace(self, index_name: str, namespace: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks WHERE index_name = ? AND namespace = ?", (index_name, namespace))
+
+
+resources.register("content_store", ContentStore)
+
+
+def get_content_store() -> ContentStore:
+    return resources.get("content_store")
+
+
+def attach_chunks(index_name: str, namespace: str, matches: List[dict]) -> List[dict]:
+    """
+    Fills in metadata["chunk"] for matches whose vectors don't carry their text,
+    reading all of them from the content store in one query.
+    """
+    missing = [match["id"] for match in matches if not match["metadata"].get("chunk")]
+    if missing:
+        texts = get_content_store().get_many(index_name, namespace, missing)
+        for match in matches:
+            if match["id"] in texts:
+                match["metadata"]["chunk"] = texts[match["id"]]
+    return matches
@@ -0,0 +1,164 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class FakePineconeError(Exception):
+    """Error of the fake client; transient ones (injected failures) are worth retrying, the rest are not."""
+
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+
+def fake_vector(text: str, dimension: int) -> List[float]:
+    """Deterministic unit vector derived from the text, so equal texts embed equally."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    values = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class FakeInference:
+    def __init__(self, client: "FakePinecone"):
+        self._client = client
+
+    def embed(self, model: str, inputs: List[str], parameters: Optional[dict] = None):
+        self._client._call("embed")
+        if len(inputs) > self._client.max_embed_inputs:
+            raise FakePineconeError(f"Too many inputs: {len(inputs)} > {self._client.max_embed_inputs}")
+        self._client.embed_calls += 1
+        self._client.embedded_inputs += len(inputs)
+        return [{"values": fake_vector(text, self._client.dimension)} for text in inputs]
+
+
+class FakeIndex:
+    def __init__(self, client: "FakePinecone", name: str):
+        self._client = client
+        self.name = name
+        self.namespaces: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: List[dict], namespace: str = ""):
+        self._client._call("upsert")
+        if len(vectors) > self._client.max_upsert_vectors:
+            raise FakePineconeError(f"Too many vectors: {len(vectors)} > {self._client.max_upsert_vectors}")
+        with self._lock:
+            store = self.namespaces.setdefault(namespace, {})
+            for vector in vectors:
+                store[vector["id"]] = {"values": list(vector["values"]), "metadata": dict(vector.get("metadata", {}))}
+        self._client.upsert_calls += 1
+        return {"upserted_count": len(vectors)}
+
+    def query(self, namespace: str = "", vector: Optional[List[float]] = None, top_k: int = 10,
+              include_values: bool = False, include_metadata: bool = False, **kwargs):
+        self._client._call("query")
+        self._client.query_calls += 1
+        with self._lock:
+            items = list(self.namespaces.get(namespace, {}).items())
+        query_norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        scored = []
+        for vector_id, item in items:
+            values = item["values"]
+            norm = math.sqrt(sum(v * v for v in values)) or 1.0
+            scored.append((sum(a * b for a, b in zip(vector, values)) / (norm * query_norm), vector_id, item))
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        matches = []
+        for score, vector_id, item in scored[:top_k]:
+            match = {"id": vector_id, "score": score}
+            if include_values:
+                match["values"] = item["values"]
+            if include_metadata:
+                match["metadata"] = item["metadata"]
+            matches.append(match)
+        return {"matches": matches, "namespace": namespace}
+
+    def fetch(self, ids: List[str], namespace: str = ""):
+        self._client._call("fetch")
+        with self._lock:
+            store = self.namespaces.get(namespace, {})
+            return {"vectors": {vector_id: dict(store[vector_id], id=vector_id) for vector_id in ids if vector_id in store}}
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, namespace: str = ""):
+        self._client._call("delete")
+        with self._lock:
+            if delete_all:
+                self.namespaces.pop(namespace, None)
+            else:
+                store = self.namespaces.get(namespace, {})
+                for vector_id in ids or []:
+                    store.pop(vector_id, None)
+        return {}
+
+    def describe_index_stats(self):
+        with self._lock:
+            return {
+                "dimension": self._client.dimension,
+                "namespaces": {name: {"vector_count": len(store)} for name, store in self.namespaces.items()},
+                "total_vector_count": sum(len(store) for store in self.namespaces.values()),
+            }
+
+
+class FakePinecone:
+    """
+    In-memory stand-in for the Pinecone client used in this repo
+    (inference.embed, create_index/list_indexes/describe_index, Index().upsert/query/fetch/delete).
+
+    Embeddings are deterministic per text. latency adds a sleep to every
+    call, failure_rate makes calls raise FakePineconeError at random, and the
+    request-size limits mirror the hosted service, so batching, concurrency
+    and retries can be exercised offline.
+    """
+
+    def __init__(self, dimension: int = 1024, latency: float = 0.0, failure_rate: float = 0.0,
+                 max_embed_inputs: int = 96, max_upsert_vectors: int = 1000, seed: int = 0):
+        self.dimension = dimension
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_embed_inputs = max_embed_inputs
+        self.max_upsert_vectors = max_upsert_vectors
+        self.inference = FakeInference(self)
+        self.indexes: Dict[str, dict] = {}
+        self._index_objects: Dict[str, FakeIndex] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.embed_calls = 0
+        self.embedded_inputs = 0
+        self.upsert_calls = 0
+        self.query_calls = 0
+
+    def _call(self, operation: str):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+        if fail:
+            raise FakePineconeError(f"Injected failure in {operation}", transient=True)
+
+    def create_index(self, name: str, dimension: int, metric: str = "cosine", spec=None, **kwargs):
+        self._call("create_index")
+        if name in self.indexes:
+            raise FakePineconeError(f"Index '{name}' already exists")
+        self.indexes[name] = {"name": name, "dimension": dimension, "metric": metric, "status": {"ready": True, "state": "Ready"}}
+
+    def list_indexes(self):
+        return [dict(description) for description in self.indexes.values()]
+
+    def describe_index(self, name: str):
+        if name not in self.indexes:
+            raise FakePineconeError(f"Index '{name}' not found")
+        return dict(self.indexes[name])
+
+    def delete_index(self, name: str):
+        self.indexes.pop(name, None)
+        self._index_objects.pop(name, None)
+
+    def Index(self, name: str) -> FakeIndex:
+        with self._lock:
+            if name not in self._index_objects:
+                self._index_objects[name] = FakeIndex(self, name)
+            return self._index_objects[name]
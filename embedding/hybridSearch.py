@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from embedding.contentStore import attach_chunks
+from embedding.lexicalIndex import get_lexical_index
+
+
+def _get(obj, key: str, default=None):
+    """Reads a field from a dict or from a Pinecone response object."""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+def _normalize(scores: Dict[str, float]) -> Dict[str, float]:
+    """Min-max scales scores to [0, 1] so dense and BM25 scores can be mixed."""
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {doc_id: 1.0 for doc_id in scores}
+    return {doc_id: (score - low) / (high - low) for doc_id, score in scores.items()}
+
+
+def _rank(index, index_name: str, namespace: str, query_text: str, query_vector: List[float],
+          top_k: int, dense_weight: float, candidates: Optional[int]) -> Tuple[List[Tuple[str, float]], Dict[str, dict]]:
+    """Ranked (id, score) pairs for one query, plus the metadata the dense query already returned."""
+    candidates = candidates or max(top_k * 3, 10)
+    dense = index.query(
+        namespace=namespace,
+        vector=query_vector,
+        top_k=candidates if dense_weight < 1 else top_k,
+        include_values=False,
+        include_metadata=True
+    )
+    dense_matches = {_get(match, "id"): match for match in _get(dense, "matches", [])}
+    metadata = {doc_id: dict(_get(match, "metadata", None) or {}) for doc_id, match in dense_matches.items()}
+
+    lexical = get_lexical_index(index_name, namespace)
+    if dense_weight >= 1 or not len(lexical):
+        ranked = [(doc_id, _get(match, "score", 0.0)) for doc_id, match in list(dense_matches.items())[:top_k]]
+        return ranked, metadata
+
+    dense_scores = _normalize({doc_id: _get(match, "score", 0.0) for doc_id, match in dense_matches.items()})
+    sparse_scores = _normalize(dict(lexical.search(query_text, top_k=candidates)))
+    fused = {
+        doc_id: dense_weight * dense_scores.get(doc_id, 0.0) + (1 - dense_weight) * sparse_scores.get(doc_id, 0.0)
+        for doc_id in set(dense_scores) | set(sparse_scores)
+    }
+    ranked = sorted(fused, key=lambda doc_id: (-fused[doc_id], doc_id))[:top_k]
+    return [(doc_id, fused[doc_id]) for doc_id in ranked], metadata
+
+
+def _hydrate(index, index_name: str, namespace: str, rankings: List[List[Tuple[str, float]]],
+             metadata: Dict[str, dict]) -> List[dict]:
+    """
+    Turns rankings into query responses. Metadata of BM25-only hits is fetched
+    with one call and chunk text read with one content-store query, for the
+    union of all rankings.
+    """
+    missing = list(dict.fromkeys(doc_id for ranked in rankings for doc_id, _ in ranked if doc_id not in metadata))
+    if missing:
+        fetched = _get(index.fetch(ids=missing, namespace=namespace), "vectors", {})
+        for doc_id in missing:
+            vector = fetched.get(doc_id)
+            if vector is not None:
+                metadata[doc_id] = dict(_get(vector, "metadata", None) or {})
+
+    responses = [
+        {"matches": [{"id": doc_id, "score": score, "metadata": dict(metadata[doc_id])}
+                     for doc_id, score in ranked if doc_id in metadata],
+         "namespace": namespace}
+        for ranked in rankings
+    ]
+    attach_chunks(index_name, namespace, [match for response in responses for match in response["matches"]])
+    return responses
+
+
+def hybrid_query(index, index_name: str, namespace: str, query_text: str, query_vector: List[float],
+                 top_k: int = 3, dense_weight: float = 0.5, candidates: Optional[int] = None) -> dict:
+    """
+    Fuses dense similarity with BM25 over the namespace's lexical index.
+
+    Both retrievers return a short candidate list, their scores are min-max
+    normalised, and each chunk gets
+    dense_weight * dense + (1 - dense_weight) * bm25. Chunks found only by
+    BM25 (exact terms like "SAM.gov" or "CAGE") have their metadata fetched
+    from the vector index. When the namespace has no lexical index, for
+    example one ingested before BM25 existed, this is a plain dense query.
+    Chunk text is read from the local content store in one query for all
+    matches; vectors that still carry it in metadata are used as-is.
+
+    Returns:
+        dict: {"matches": [{"id", "score", "metadata"}], "namespace"}, the same
+        shape index.query returns with include_metadata=True.
+    """
+    ranked, metadata = _rank(index, index_name, namespace, query_text, query_vector, top_k, dense_weight, candidates)
+    return _hydrate(index, index_name, namespace, [ranked], metadata)[0]
+
+
+def multi_hybrid_query(index, index_name: str, namespace: str, queries: List[dict],
+                       max_workers: Optional[int] = None) -> List[dict]:
+    """
+    Runs several hybrid queries against one namespace at once.
+
+    Each query is a dict with "query_text" and "query_vector", and optionally
+    "top_k", "dense_weight" and "candidates" (hybrid_query's defaults
+    otherwise). The vector queries are issued concurrently; metadata and chunk
+    text are then fetched once for the union of all matches, so chunks shared
+    between queries are read a single time.
+
+    Returns:
+        list: one hybrid_query response per query, in the same order.
+    """
+    if not queries:
+        return []
+
+    def rank(query: dict):
+        return _rank(index, index_name, namespace, query["query_text"], query["query_vector"],
+                     query.get("top_k", 3), query.get("dense_weight", 0.5), query.get("candidates"))
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as executor:
+        results = list(executor.map(rank, queries))
+
+    metadata = {}
+    for _, found in results:
+        metadata.update(found)
+    return _hydrate(index, index_name, namespace, [ranked for ranked, _ in results], metadata)
@@ -0,0 +1,138 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_LEXICAL_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join(".cache", "lexical"))
+LEXICAL_VERSION = 1
+
+# Keeps dotted/hyphenated identifiers such as "SAM.gov" or "non-compete" whole
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased tokens; compound tokens are also indexed by their parts."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(_PART.findall(token))
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index (term -> {doc id: term frequency}) for
+    one namespace of a vector index. Built at ingestion next to the dense
+    vectors and kept as a JSON file.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+        self.mtime = None
+        if os.path.exists(path):
+            self.mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == LEXICAL_VERSION:
+                self.postings = state["postings"]
+                self.lengths = state["lengths"]
+                self.total_length = sum(self.lengths.values())
+                for term, docs in self.postings.items():
+                    for doc_id in docs:
+                        self.doc_terms.setdefault(doc_id, []).append(term)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self.lengths:
+            return
+        self.total_length -= self.lengths.pop(doc_id)
+        for term in self.doc_terms.pop(doc_id, []):
+            del self.postings[term][doc_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def add(self, documents: Iterable[Tuple[str, str]]):
+        """Indexes (doc id, text) pairs, replacing documents that are already indexed."""
+        with self._lock:
+            for doc_id, text in documents:
+                self._remove(doc_id)
+                counts = Counter(tokenize(text))
+                for term, count in counts.items():
+                    self.postings.setdefault(term, {})[doc_id] = count
+                self.doc_terms[doc_id] = list(counts)
+                length = sum(counts.values())
+                self.lengths[doc_id] = length
+                self.total_length += length
+
+    def delete(self, doc_ids: Iterable[str]):
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Returns up to top_k (doc id, BM25 score) pairs, best first."""
+        with self._lock:
+            if not self.lengths:
+                return []
+            n = len(self.lengths)
+            average_length = self.total_length / n
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": LEXICAL_VERSION, "postings": self.postings, "lengths": self.lengths}, f)
+            os.replace(tmp_path, self.path)
+            self.mtime = os.path.getmtime(self.path)
+
+
+_indexes: Dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def _lexical_path(index_name: str, namespace: str, lexical_dir: str) -> str:
+    safe = re.sub(r"[^\w.-]+", "_", f"{index_name}__{namespace}")
+    return os.path.join(lexical_dir, f"{safe}.json")
+
+
+def get_lexical_index(index_name: str, namespace: str, lexical_dir: str = DEFAULT_LEXICAL_DIR) -> BM25Index:
+    """The BM25 index for one namespace; reloaded only when another process has rewritten it."""
+    path = _lexical_path(index_name, namespace, lexical_dir)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    with _indexes_lock:
+        if path not in _indexes or (mtime is not None and _indexes[path].mtime != mtime):
+            _indexes[path] = BM25Index(path)
+        return _indexes[path]
+
+
+def remove_lexical_index(index_name: str, namespace: str, lexical_dir: str = DEFAULT_LEXICAL_DIR):
+    path = _lexical_path(index_name, namespace, lexical_dir)
+    with _indexes_lock:
+        _indexes.pop(path, None)
+        if os.path.exists(path):
+            os.remove(path)
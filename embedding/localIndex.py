@@ -0,0 +1,463 @@
+import heapq
+import json
+import math
+import os
+import random
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from embedding.quantization import VectorCompressor
+
+DEFAULT_STORE_DIR = os.getenv("LOCAL_VECTOR_DIR", os.path.join(".cache", "vectors"))
+
+
+class HNSWGraph:
+    """
+    Minimal hierarchical navigable small-world graph over unit vectors
+    (inner product == cosine similarity).
+
+    Nodes are row numbers into the `vectors` array owned by the namespace.
+    Layer 0 keeps up to 2*M neighbours per node, upper layers up to M.
+    """
+
+    def __init__(self, M: int = 16, ef_construction: int = 100, seed: int = 0):
+        self.M = M
+        self.ef_construction = ef_construction
+        self.level_mult = 1 / math.log(M)
+        self.layers: List[Dict[int, List[int]]] = []
+        self.entry_point: Optional[int] = None
+        self.max_level = -1
+        self._rng = random.Random(seed)
+
+    def _search_layer(self, vectors: np.ndarray, query: np.ndarray, entry_points: List[int], ef: int, layer: int) -> List[tuple]:
+        """Best-first search on one layer; returns up to ef (similarity, node) pairs, best first."""
+        graph = self.layers[layer]
+        visited = set(entry_points)
+        sims = vectors[entry_points] @ query
+        candidates = [(-s, n) for s, n in zip(sims.tolist(), entry_points)]
+        heapq.heapify(candidates)
+        best = [(s, n) for s, n in zip(sims.tolist(), entry_points)]
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < best[0][0] and len(best) >= ef:
+                break
+            neighbours = [n for n in graph.get(node, ()) if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for sim, neighbour in zip((vectors[neighbours] @ query).tolist(), neighbours):
+                if len(best) < ef or sim > best[0][0]:
+                    heapq.heappush(candidates, (-sim, neighbour))
+                    heapq.heappush(best, (sim, neighbour))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return sorted(best, reverse=True)
+
+    def add(self, vectors: np.ndarray, node: int):
+        level = int(-math.log(1 - self._rng.random()) * self.level_mult)
+        top = self.max_level
+        while len(self.layers) <= level:
+            self.layers.append({})
+
+        if self.entry_point is not None:
+            query = vectors[node]
+            entry = self.entry_point
+            for layer in range(top, level, -1):
+                entry = self._search_layer(vectors, query, [entry], 1, layer)[0][1]
+
+            entries = [entry]
+            for layer in range(min(level, top), -1, -1):
+                found = self._search_layer(vectors, query, entries, self.ef_construction, layer)
+                max_links = self.M * 2 if layer == 0 else self.M
+                neighbours = [n for _, n in found[:self.M]]
+                self.layers[layer][node] = neighbours
+                for neighbour in neighbours:
+                    links = self.layers[layer][neighbour]
+                    links.append(node)
+                    if len(links) > max_links:
+                        # Keep the closest links only
+                        sims = vectors[links] @ vectors[neighbour]
+                        self.layers[layer][neighbour] = [links[i] for i in np.argsort(-sims)[:max_links]]
+                entries = [n for _, n in found]
+
+        for layer in range(top + 1, level + 1):
+            self.layers[layer][node] = []
+        if level > top:
+            self.entry_point = node
+            self.max_level = level
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int, ef: int) -> List[tuple]:
+        if self.entry_point is None:
+            return []
+        entry = [self.entry_point]
+        for layer in range(self.max_level, 0, -1):
+            entry = [self._search_layer(vectors, query, entry, 1, layer)[0][1]]
+        return self._search_layer(vectors, query, entry, max(ef, k), 0)[:k]
+
+
+class NamespaceStore:
+    def __init__(self, dimension: Optional[int] = None, compressed: bool = False):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        # unit-normalized; not kept in compressed mode, where codes stand in for them
+        self.vectors = None if compressed else np.zeros((0, dimension or 0), dtype=np.float32)
+        self.raw_vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self.metadata: Dict[str, dict] = {}
+        self.deleted: set = set()
+        self.graph: Optional[HNSWGraph] = None
+        # Compressed mode only: reduced/int8 codes in memory, full vectors memory-mapped
+        self.codes: Optional[np.ndarray] = None
+        self.compressor: Optional[VectorCompressor] = None
+        self.fitted_count = 0
+
+    def __len__(self):
+        return len(self.ids) - len(self.deleted)
+
+
+class LocalIndex:
+    """
+    In-process vector index with the same upsert/query/fetch/delete surface
+    as a Pinecone Index.
+
+    Namespaces below hnsw_threshold vectors are searched exactly with one
+    NumPy matrix-vector product. Larger namespaces build an HNSW graph on
+    first query and add later upserts to it incrementally; overwriting or
+    deleting vectors marks the graph for a rebuild. Every write is persisted
+    to <store_dir>/<index name>/ (vectors as .npy, metadata as JSON) and
+    reloaded on start.
+
+    With reduced_dim and/or quantize set, namespaces are searched through a
+    compressed copy instead (see embedding.quantization.VectorCompressor):
+    only the reduced, int8 codes stay in memory, the full vectors are
+    memory-mapped from disk, and the rescore_factor * top_k best candidates
+    by approximate score are re-scored exactly. The projection is refitted
+    whenever a namespace has doubled in size since the last fit.
+    """
+
+    def __init__(self, name: str, store_dir: str = DEFAULT_STORE_DIR, hnsw_threshold: int = 20_000,
+                 M: int = 16, ef_construction: int = 100, ef_search: int = 64, autosave: bool = True,
+                 reduced_dim: Optional[int] = None, reduction: str = "pca", quantize: bool = False,
+                 rescore_factor: int = 4):
+        self.name = name
+        self.directory = os.path.join(store_dir, re.sub(r"[^\w.-]", "_", name))
+        self.hnsw_threshold = hnsw_threshold
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.autosave = autosave
+        self.reduced_dim = reduced_dim
+        self.reduction = reduction
+        self.quantize = quantize
+        self.rescore_factor = rescore_factor
+        self.compressed = reduced_dim is not None or quantize
+        self.namespaces: Dict[str, NamespaceStore] = {}
+        self._lock = threading.RLock()
+        self._deferred = 0
+        self._dirty = set()
+        self._load()
+
+    def _namespace_path(self, namespace: str) -> str:
+        return os.path.join(self.directory, (re.sub(r"[^\w.-]", "_", namespace) or "_default"))
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            base = os.path.join(self.directory, filename[:-5])
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            raw = np.load(base + ".npy", mmap_mode="c" if self.compressed else None)
+            store = NamespaceStore(raw.shape[1] if raw.ndim == 2 else None, self.compressed)
+            store.ids = saved["ids"]
+            store.positions = {vector_id: i for i, vector_id in enumerate(store.ids)}
+            store.metadata = saved["metadata"]
+            if self.compressed:
+                store.raw_vectors = raw
+                self._load_codes(store, base)
+            else:
+                store.raw_vectors = raw.astype(np.float32)
+                store.vectors = _normalize(store.raw_vectors)
+            self.namespaces[saved["namespace"]] = store
+
+    def _new_compressor(self) -> VectorCompressor:
+        return VectorCompressor(self.reduced_dim, self.reduction, int8=self.quantize)
+
+    def _load_codes(self, store: NamespaceStore, base: str):
+        """Reuses saved codes if they were made with the current settings, else re-encodes."""
+        if os.path.exists(base + ".codes.npy") and os.path.exists(base + ".pq.npz"):
+            with np.load(base + ".pq.npz") as state:
+                compressor = VectorCompressor.from_state(state)
+            codes = np.load(base + ".codes.npy")
+            expected = self._new_compressor()
+            # The fitted dim can be below the requested one (PCA keeps at most as many
+            # components as there were vectors), so the settings are compared as requested
+            if (compressor.requested_dim, compressor.reduction, compressor.int8) \
+                    == (expected.requested_dim, expected.reduction, expected.int8) \
+                    and len(codes) == len(store.ids):
+                store.compressor, store.codes, store.fitted_count = compressor, codes, len(store.ids)
+                return
+        self._encode_store(store, refit=True)
+
+    def _encode_store(self, store: NamespaceStore, refit: bool = False, block: int = 65_536):
+        """(Re)fits the compressor on all stored vectors and re-encodes them."""
+        if refit or store.compressor is None:
+            store.compressor = self._new_compressor().fit(_normalize(store.raw_vectors))
+            store.fitted_count = len(store.ids)
+        store.codes = np.concatenate([
+            store.compressor.encode(_normalize(store.raw_vectors[start:start + block]))
+            for start in range(0, len(store.raw_vectors), block)
+        ]) if len(store.raw_vectors) else None
+
+    @contextmanager
+    def deferred_save(self):
+        """
+        Holds back autosaves until the block ends, then saves each changed
+        namespace once; ingestion upserts many batches, and saving after each
+        would rewrite the namespace's files every time.
+        """
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                if not self._deferred:
+                    dirty, self._dirty = self._dirty, set()
+                    for namespace in dirty:
+                        self.save(namespace)
+
+    def _autosave(self, namespace: str):
+        if not self.autosave:
+            return
+        if self._deferred:
+            self._dirty.add(namespace)
+        else:
+            self.save(namespace)
+
+    def save(self, namespace: Optional[str] = None):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in ([namespace] if namespace is not None else list(self.namespaces)):
+                store = self.namespaces.get(name)
+                base = self._namespace_path(name)
+                if store is None:
+                    for ext in (".json", ".npy", ".codes.npy", ".pq.npz"):
+                        if os.path.exists(base + ext):
+                            os.remove(base + ext)
+                    continue
+                self._compact(store)
+                np.save(base + ".tmp.npy", store.raw_vectors)
+                os.replace(base + ".tmp.npy", base + ".npy")
+                if self.compressed and store.codes is not None:
+                    np.save(base + ".codes.tmp.npy", store.codes)
+                    os.replace(base + ".codes.tmp.npy", base + ".codes.npy")
+                    np.savez(base + ".pq.tmp.npz", **store.compressor.state())
+                    os.replace(base + ".pq.tmp.npz", base + ".pq.npz")
+                    # Full vectors go back to disk; only candidate rows are read when re-scoring
+                    store.raw_vectors = np.load(base + ".npy", mmap_mode="c")
+                with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+                    json.dump({"namespace": name, "ids": store.ids, "metadata": store.metadata}, f)
+                os.replace(base + ".json.tmp", base + ".json")
+
+    def _compact(self, store: NamespaceStore):
+        """Drops deleted rows for good; the graph is rebuilt on next query."""
+        if not store.deleted:
+            return
+        keep = [i for i, vector_id in enumerate(store.ids) if vector_id not in store.deleted]
+        store.ids = [store.ids[i] for i in keep]
+        store.positions = {vector_id: i for i, vector_id in enumerate(store.ids)}
+        store.raw_vectors = store.raw_vectors[keep]
+        if store.vectors is not None:
+            store.vectors = store.vectors[keep]
+        if store.codes is not None:
+            store.codes = store.codes[keep]
+        store.deleted = set()
+        store.graph = None
+
+    def upsert(self, vectors: List[dict], namespace: str = ""):
+        with self._lock:
+            if not vectors:
+                return {"upserted_count": 0}
+            values = np.asarray([vector["values"] for vector in vectors], dtype=np.float32)
+            store = self.namespaces.setdefault(namespace, NamespaceStore(values.shape[1], self.compressed))
+            if len(store.ids) and store.raw_vectors.shape[1] != values.shape[1]:
+                raise ValueError(f"Vector dimension {values.shape[1]} does not match namespace dimension {store.raw_vectors.shape[1]}")
+
+            new_rows = []
+            for vector, row in zip(vectors, values):
+                vector_id = str(vector["id"])
+                store.metadata[vector_id] = dict(vector.get("metadata", {}))
+                store.deleted.discard(vector_id)
+                if vector_id in store.positions:
+                    position = store.positions[vector_id]
+                    store.raw_vectors[position] = row
+                    if self.compressed:
+                        store.codes[position] = store.compressor.encode(_normalize(row[None, :]))[0]
+                    else:
+                        store.vectors[position] = _normalize(row[None, :])[0]
+                    store.graph = None  # moved vectors invalidate graph links
+                else:
+                    store.positions[vector_id] = len(store.ids) + len(new_rows)
+                    new_rows.append((vector_id, row))
+
+            if new_rows:
+                first_new = len(store.ids)
+                store.ids.extend(vector_id for vector_id, _ in new_rows)
+                raw = np.vstack([row for _, row in new_rows])
+                store.raw_vectors = np.vstack([store.raw_vectors.reshape(-1, raw.shape[1]), raw])
+                if self.compressed:
+                    if store.compressor is None or len(store.ids) >= 2 * store.fitted_count:
+                        self._encode_store(store, refit=True)
+                    else:
+                        store.codes = np.concatenate([store.codes, store.compressor.encode(_normalize(raw))])
+                else:
+                    store.vectors = np.vstack([store.vectors.reshape(-1, raw.shape[1]), _normalize(raw)])
+                if store.graph is not None:
+                    for node in range(first_new, len(store.ids)):
+                        store.graph.add(store.vectors, node)
+
+            self._autosave(namespace)
+            return {"upserted_count": len(vectors)}
+
+    def query(self, namespace: str = "", vector: Optional[List[float]] = None, top_k: int = 10,
+              include_values: bool = False, include_metadata: bool = False, **kwargs):
+        with self._lock:
+            store = self.namespaces.get(namespace)
+            if store is None or len(store) == 0:
+                return {"matches": [], "namespace": namespace}
+            query = _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+            # Over-fetch so deleted rows can be skipped
+            wanted = top_k + len(store.deleted)
+
+            if self.compressed:
+                scored = self._compressed_search(store, query, wanted)
+            elif len(store.ids) < self.hnsw_threshold:
+                sims = store.vectors @ query
+                if wanted < len(sims):
+                    top = np.argpartition(-sims, wanted)[:wanted]
+                    top = top[np.argsort(-sims[top])]
+                else:
+                    top = np.argsort(-sims)
+                scored = [(float(sims[i]), int(i)) for i in top]
+            else:
+                if store.graph is None:
+                    self._build_graph(store)
+                scored = store.graph.search(store.vectors, query, wanted, self.ef_search)
+
+            matches = []
+            for score, position in scored:
+                vector_id = store.ids[position]
+                if vector_id in store.deleted:
+                    continue
+                match = {"id": vector_id, "score": score}
+                if include_values:
+                    match["values"] = store.raw_vectors[position].tolist()
+                if include_metadata:
+                    match["metadata"] = store.metadata.get(vector_id, {})
+                matches.append(match)
+                if len(matches) == top_k:
+                    break
+            return {"matches": matches, "namespace": namespace}
+
+    def _compressed_search(self, store: NamespaceStore, query: np.ndarray, wanted: int) -> List[tuple]:
+        """Shortlists by approximate score on the codes, then re-scores exactly from the full vectors."""
+        approx = store.compressor.scores(store.codes, query)
+        shortlist = min(len(approx), wanted * max(1, self.rescore_factor))
+        if shortlist < len(approx):
+            candidates = np.argpartition(-approx, shortlist)[:shortlist]
+        else:
+            candidates = np.arange(len(approx))
+        candidates = np.sort(candidates)  # sequential reads from the memory map
+        exact = _normalize(np.asarray(store.raw_vectors[candidates])) @ query
+        order = np.argsort(-exact)[:wanted]
+        return [(float(exact[i]), int(candidates[i])) for i in order]
+
+    def _build_graph(self, store: NamespaceStore):
+        print(f"Building HNSW graph for {len(store.ids)} vectors...")
+        store.graph = HNSWGraph(M=self.M, ef_construction=self.ef_construction)
+        for node in range(len(store.ids)):
+            store.graph.add(store.vectors, node)
+
+    def fetch(self, ids: List[str], namespace: str = ""):
+        with self._lock:
+            store = self.namespaces.get(namespace)
+            vectors = {}
+            for vector_id in ids:
+                if store is None or vector_id not in store.positions or vector_id in store.deleted:
+                    continue
+                vectors[vector_id] = {
+                    "id": vector_id,
+                    "values": store.raw_vectors[store.positions[vector_id]].tolist(),
+                    "metadata": store.metadata.get(vector_id, {}),
+                }
+            return {"vectors": vectors, "namespace": namespace}
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, namespace: str = ""):
+        with self._lock:
+            if delete_all:
+                self.namespaces.pop(namespace, None)
+            else:
+                store = self.namespaces.get(namespace)
+                if store is not None:
+                    for vector_id in ids or []:
+                        if vector_id in store.positions:
+                            store.deleted.add(vector_id)
+                            store.metadata.pop(vector_id, None)
+            self._autosave(namespace)
+            return {}
+
+    def describe_index_stats(self):
+        with self._lock:
+            return {
+                "namespaces": {name: {"vector_count": len(store)} for name, store in self.namespaces.items()},
+                "total_vector_count": sum(len(store) for store in self.namespaces.values()),
+            }
+
+
+def compression_options(spec: str) -> dict:
+    """
+    Parses a compression spec such as "pca256-int8", "truncate512" or "int8"
+    into LocalIndex keyword arguments; "" or "none" means full precision.
+    """
+    options = {}
+    for part in filter(None, (spec or "").lower().split("-")):
+        match = re.fullmatch(r"(pca|truncate)(\d+)", part)
+        if match:
+            options["reduction"], options["reduced_dim"] = match.group(1), int(match.group(2))
+        elif part == "int8":
+            options["quantize"] = True
+        elif part != "none":
+            raise ValueError(f"Unknown vector compression '{part}' in '{spec}'")
+    return options
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class LocalVectorStore:
+    """Client-like holder of LocalIndex objects, so `store.Index(name)` mirrors `pc.Index(name)`."""
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, **index_options):
+        self.store_dir = store_dir
+        self.index_options = index_options
+        self._indexes: Dict[str, LocalIndex] = {}
+        self._lock = threading.Lock()
+
+    def Index(self, name: str) -> LocalIndex:
+        with self._lock:
+            if name not in self._indexes:
+                self._indexes[name] = LocalIndex(name, store_dir=self.store_dir, **self.index_options)
+            return self._indexes[name]
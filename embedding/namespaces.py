@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from embedding.contentStore import get_content_store
+from embedding.lexicalIndex import remove_lexical_index
+from embedding.vectorStore import get_index
+
+# Namespace used before documents got their own; still the default for callers that don't pass one
+DEFAULT_NAMESPACE = "ns"
+NAMESPACE_TTL_SECONDS = float(os.getenv("NAMESPACE_TTL_HOURS", "168")) * 3600
+REGISTRY_PATH = os.getenv("NAMESPACE_REGISTRY", os.path.join(".cache", "namespaces.json"))
+
+_lock = threading.Lock()
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_namespace(pdf_path: str, session_id: Optional[str] = None) -> str:
+    """
+    Namespace for one uploaded RFP, derived from the file's content, so the
+    same file always maps to the same vectors. Pass session_id to keep an
+    analyst's copy apart from everyone else's.
+    """
+    namespace = f"rfp-{file_hash(pdf_path)[:16]}"
+    return f"{namespace}-{session_id}" if session_id else namespace
+
+
+def _load_registry(registry_path: str) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(registry_path):
+        return {}
+    with open(registry_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_registry(registry: Dict[str, Dict[str, float]], registry_path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(registry_path)), exist_ok=True)
+    tmp_path = f"{registry_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, registry_path)
+
+
+def touch_namespace(index_name: str, namespace: str, registry_path: str = REGISTRY_PATH):
+    """Records that a namespace was written or queried now, which restarts its TTL."""
+    if namespace == DEFAULT_NAMESPACE:
+        return
+    with _lock:
+        registry = _load_registry(registry_path)
+        registry.setdefault(index_name, {})[namespace] = time.time()
+        _save_registry(registry, registry_path)
+
+
+def cleanup_expired_namespaces(index_name: Optional[str] = None, ttl_seconds: float = NAMESPACE_TTL_SECONDS,
+                               index=None, registry_path: str = REGISTRY_PATH) -> List[str]:
+    """
+    Deletes every registered namespace that hasn't been used for ttl_seconds,
+    along with its ingestion manifests, BM25 index and stored chunk text.
+    Only namespaces recorded by touch_namespace are considered, so the shared
+    default namespace is never removed.
+
+    Args:
+        index_name (str): Index to clean, as recorded by touch_namespace (e.g. "eligibledocone-384d",
+            see embedding.providers.index_name_for); None cleans every registered index.
+        ttl_seconds (float): Idle time after which a namespace expires.
+        index: Index to delete the namespaces from, for a single index_name; defaults to get_index.
+        registry_path (str): Namespace registry file.
+
+    Returns:
+        list: The namespaces that were deleted.
+    """
+    from PreProcessing.ingestManifest import remove_manifests
+
+    now = time.time()
+    with _lock:
+        registry = _load_registry(registry_path)
+        expired = {
+            name: [ns for ns, last_used in namespaces.items() if now - last_used > ttl_seconds]
+            for name, namespaces in registry.items()
+            if index_name is None or name == index_name
+        }
+
+    deleted = {}
+    for name, namespaces in expired.items():
+        if not namespaces:
+            continue
+        target = index if index is not None else get_index(name)
+        for namespace in namespaces:
+            try:
+                target.delete(delete_all=True, namespace=namespace)
+            except Exception as e:
+                print(f"⚠️ Could not delete namespace '{namespace}' from '{name}': {e}")
+                continue
+            remove_manifests(name, namespace)
+            remove_lexical_index(name, namespace)
+            get_content_store().delete_namespace(name, namespace)
+            deleted.setdefault(name, []).append(namespace)
+    if not deleted:
+        return []
+
+    with _lock:
+        registry = _load_registry(registry_path)
+        for name, namespaces in deleted.items():
+            for namespace in namespaces:
+                registry.get(name, {}).pop(namespace, None)
+        _save_registry(registry, registry_path)
+    for name, namespaces in deleted.items():
+        print(f"🧹 Deleted {len(namespaces)} expired namespaces from '{name}'")
+    return [namespace for namespaces in deleted.values() for namespace in namespaces]
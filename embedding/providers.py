@@ -0,0 +1,167 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+from PreProcessing import resources
+from PreProcessing.embeddingCache import EmbeddingCache
+from PreProcessing.keywords import KEYWORD_TAXONOMY
+
+# "pinecone" (hosted inference, multilingual-e5-large) or "local" (the chunker's SentenceTransformer on CPU)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "pinecone")
+DEFAULT_DIMENSION = 1024
+QUERY_CACHE_DIR = os.getenv("QUERY_CACHE_DIR", os.path.join(".cache", "query_embeddings"))
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE", "1") == "1"
+
+
+class PineconeEmbeddingProvider:
+    """Embeds through pc.inference.embed; requests are split to stay under the service's input limit."""
+
+    def __init__(self, model: str = "multilingual-e5-large", dimension: int = DEFAULT_DIMENSION,
+                 max_batch: int = 96, client=None):
+        self.model = model
+        self.dimension = dimension
+        self.max_batch = max_batch
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client if self._client is not None else resources.get("pinecone")
+
+    def _embed(self, texts: List[str], parameters: dict) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.max_batch):
+            embeddings = self.client.inference.embed(
+                model=self.model,
+                inputs=texts[start:start + self.max_batch],
+                parameters=parameters
+            )
+            vectors.extend(list(embedding['values']) for embedding in embeddings)
+        return vectors
+
+    def embed_passages(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, {"input_type": "passage", "truncate": "END"})
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, {"input_type": "query"})
+
+
+class LocalEmbeddingProvider:
+    """
+    Embeds on this machine with a SentenceTransformer (int8 when
+    EMBEDDER_QUANTIZED=1), so no network hop is needed; by default the one
+    the chunker already loads. Vectors are L2-normalised for cosine indexes,
+    and must have `dimension` components, since index names and caches are
+    keyed by model and dimension.
+    """
+
+    def __init__(self, model: str = resources.SENTENCE_EMBEDDER_MODEL, dimension: int = 384,
+                 batch_size: int = 64, quantized: Optional[bool] = None):
+        self.model = model
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.quantized = os.getenv("EMBEDDER_QUANTIZED", "0") == "1" if quantized is None else quantized
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        embedder = resources.get(resources.sentence_embedder_resource(self.model, self.quantized))
+        vectors = embedder.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Model '{self.model}' returned {vectors.shape[1]}-d vectors, "
+                             f"but the provider was configured with dimension={self.dimension}")
+        return vectors.tolist()
+
+    # Sentence embedders like MiniLM are symmetric, so passages and queries are embedded the same way
+    def embed_passages(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+
+PROVIDERS = {
+    "pinecone": PineconeEmbeddingProvider,
+    "local": LocalEmbeddingProvider,
+}
+
+for _name, _cls in PROVIDERS.items():
+    resources.register(f"embedding_provider:{_name}", _cls)
+
+
+def get_embedding_provider(name: Optional[str] = None, **options):
+    """
+    Returns the embedding provider for this deployment (EMBEDDING_PROVIDER).
+    Without options the shared instance is returned; options such as model,
+    dimension or client build a dedicated one.
+    """
+    name = name or EMBEDDING_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{name}'; expected one of {sorted(PROVIDERS)}")
+    options = {key: value for key, value in options.items() if value is not None}
+    if options:
+        return PROVIDERS[name](**options)
+    return resources.get(f"embedding_provider:{name}")
+
+
+def index_name_for(base_name: str, provider=None) -> str:
+    """
+    Index for a provider's vectors. The original 1024-d index keeps its name;
+    other dimensions get their own index, since an index has a fixed dimension.
+    """
+    provider = provider or get_embedding_provider()
+    if provider.dimension == DEFAULT_DIMENSION:
+        return base_name
+    return f"{base_name}-{provider.dimension}d"
+
+
+_query_caches: Dict[str, EmbeddingCache] = {}
+_query_caches_lock = threading.Lock()
+
+
+def get_query_cache(provider=None) -> EmbeddingCache:
+    """
+    Persistent cache of query vectors for one provider model, shared across
+    processes via QUERY_CACHE_DIR (the app and a prewarm job can write to it
+    at the same time; EmbeddingCache locks the directory).
+    """
+    provider = provider or get_embedding_provider()
+    with _query_caches_lock:
+        # Quantized local vectors differ slightly from fp32 ones, so they get their own cache
+        name = f"{provider.model}{'-int8' if getattr(provider, 'quantized', False) else ''}-query"
+        if name not in _query_caches:
+            _query_caches[name] = EmbeddingCache(name, provider.dimension, cache_dir=QUERY_CACHE_DIR, max_entries=10_000)
+        return _query_caches[name]
+
+
+def embed_queries_cached(texts: List[str], provider=None) -> List[List[float]]:
+    """
+    Query embeddings keyed by model and (whitespace-normalised) text. The
+    agents' queries are fixed keyword lists, so after the first run, or a
+    prewarm_query_cache at deploy time, they need no embedding call at all.
+    Set QUERY_CACHE=0 to bypass the cache.
+    """
+    provider = provider or get_embedding_provider()
+    if not QUERY_CACHE_ENABLED:
+        return provider.embed_queries(texts)
+    return get_query_cache(provider).encode(texts, provider.embed_queries).tolist()
+
+
+def agent_queries() -> List[str]:
+    """The constant keyword queries the agents retrieve with, one per taxonomy category."""
+    return [" ".join(keywords) for keywords in KEYWORD_TAXONOMY.values()]
+
+
+def prewarm_query_cache(queries: Optional[List[str]] = None, provider=None) -> dict:
+    """Embeds the agents' queries (or the given ones) into the persistent cache; returns its stats."""
+    provider = provider or get_embedding_provider()
+    embed_queries_cached(queries or agent_queries(), provider)
+    return get_query_cache(provider).stats()
+
+
+# PREWARM_RESOURCES=query_embeddings fills the cache in the background on startup
+resources.register("query_embeddings", prewarm_query_cache)
+
+
+if __name__ == "__main__":
+    # Deploy step: python -m embedding.providers
+    print(f"Query cache prewarmed: {prewarm_query_cache()}")
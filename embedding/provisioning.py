@@ -0,0 +1,156 @@
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+# Indexes already verified in this process: client -> {index name: description}.
+# Keyed by the client object itself (not its id, which can be reused once it is collected)
+_known_indexes: "weakref.WeakKeyDictionary[object, Dict[str, dict]]" = weakref.WeakKeyDictionary()
+# In-flight checks: client -> {(index name, dimension, metric): future}
+_pending: "weakref.WeakKeyDictionary[object, Dict[Tuple[str, int, str], Future]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="index-provisioning")
+
+
+def _field(obj, name: str, default=None):
+    """Reads a field from either a dict (fake/older clients) or an object (Pinecone models)."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    try:
+        return obj[name]
+    except (TypeError, KeyError):
+        return getattr(obj, name, default)
+
+
+def _index_names(client) -> set:
+    listed = client.list_indexes()
+    if hasattr(listed, "names"):
+        return set(listed.names())
+    return {_field(description, "name") for description in listed}
+
+
+def _is_ready(description) -> bool:
+    status = _field(description, "status") or {}
+    return bool(_field(status, "ready", False))
+
+
+def _serverless_spec(cloud: str, region: str):
+    try:
+        from pinecone import ServerlessSpec
+    except ImportError:
+        # The client also accepts the plain dict form
+        return {"serverless": {"cloud": cloud, "region": region}}
+    return ServerlessSpec(cloud=cloud, region=region)
+
+
+def _per_client(cache: weakref.WeakKeyDictionary, client) -> Optional[dict]:
+    """The client's entry of a cache, or None for clients that can't be weakly referenced (never cached)."""
+    try:
+        return cache.setdefault(client, {})
+    except TypeError:
+        return None
+
+
+def _check_settings(description: dict, dimension: int, metric: str):
+    name = description["name"]
+    if description["dimension"] != dimension:
+        raise ValueError(f"Index '{name}' has dimension {description['dimension']}, expected {dimension}")
+    if description["metric"] != metric:
+        raise ValueError(f"Index '{name}' uses metric '{description['metric']}', expected '{metric}'")
+
+
+def _provision(client, name: str, dimension: int, metric: str, cloud: str, region: str, timeout: float) -> dict:
+    if name not in _index_names(client):
+        print(f"Creating index '{name}'...")
+        try:
+            client.create_index(
+                name=name,
+                dimension=dimension,
+                metric=metric,
+                spec=_serverless_spec(cloud, region)
+            )
+        except Exception:
+            # Someone else may have created it between the check and the call
+            if name not in _index_names(client):
+                raise
+
+    description = client.describe_index(name)
+    existing_dimension = _field(description, "dimension")
+    existing_metric = _field(description, "metric")
+    if existing_dimension is not None and existing_dimension != dimension:
+        raise ValueError(f"Index '{name}' has dimension {existing_dimension}, expected {dimension}")
+    if existing_metric is not None and existing_metric != metric:
+        raise ValueError(f"Index '{name}' uses metric '{existing_metric}', expected '{metric}'")
+
+    delay = 0.5
+    deadline = time.monotonic() + timeout
+    while not _is_ready(description):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Index '{name}' was not ready after {timeout:.0f}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 5.0)
+        description = client.describe_index(name)
+
+    return {"name": name, "dimension": dimension, "metric": metric}
+
+
+def ensure_index_async(client, name: str, dimension: int = 1024, metric: str = "cosine",
+                       cloud: str = "aws", region: str = "us-east-1", timeout: float = 300) -> Future:
+    """
+    Makes sure an index exists with the given dimension/metric and is ready,
+    without blocking the caller.
+
+    The first call per process checks list_indexes, creates the index only
+    if it is missing, verifies dimension and metric, and polls until it
+    reports ready. The result is cached per client, so later calls (repeated
+    ingestions) return an already-completed future without touching the
+    control plane; their dimension and metric are still checked against the
+    cached index, and the future fails with ValueError on a mismatch.
+    Concurrent callers with the same settings share the same in-flight check.
+    """
+    with _lock:
+        known = _per_client(_known_indexes, client)
+        pending = _per_client(_pending, client)
+        if known is not None and name in known:
+            done = Future()
+            try:
+                _check_settings(known[name], dimension, metric)
+                done.set_result(known[name])
+            except ValueError as e:
+                done.set_exception(e)
+            return done
+        key = (name, dimension, metric)
+        if pending is not None and key in pending:
+            return pending[key]
+
+        def run():
+            try:
+                description = _provision(client, name, dimension, metric, cloud, region, timeout)
+                with _lock:
+                    if known is not None:
+                        known[name] = description
+                return description
+            finally:
+                with _lock:
+                    if pending is not None:
+                        pending.pop(key, None)
+
+        future = _executor.submit(run)
+        if pending is not None:
+            pending[key] = future
+        return future
+
+
+def ensure_index(client, name: str, dimension: int = 1024, metric: str = "cosine",
+                 cloud: str = "aws", region: str = "us-east-1", timeout: float = 300) -> dict:
+    """Blocking version of ensure_index_async."""
+    return ensure_index_async(client, name, dimension, metric, cloud, region, timeout).result()
+
+
+def forget_index(client, name: str):
+    """Drops an index from the per-process cache, e.g. after deleting it."""
+    with _lock:
+        known = _known_indexes.get(client)
+        if known is not None:
+            known.pop(name, None)
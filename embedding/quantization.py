@@ -0,0 +1,96 @@
+from typing import Optional
+
+import numpy as np
+
+REDUCTIONS = ("truncate", "pca")
+
+
+class VectorCompressor:
+    """
+    Lossy compact representation of unit vectors used to shortlist candidates.
+
+    Vectors are reduced to `dim` dimensions, either by keeping the leading
+    components ("truncate") or by projecting on the top principal components
+    ("pca"), re-normalised, and optionally quantized to int8 with one scale
+    per dimension. Approximate cosine scores are computed directly on the
+    codes; callers re-score the shortlist with the full-precision vectors.
+    """
+
+    def __init__(self, dim: Optional[int] = None, reduction: str = "pca", int8: bool = True):
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduction}'; expected one of {REDUCTIONS}")
+        self.dim = dim
+        # What was asked for; fit() may settle on fewer dimensions (see below)
+        self.requested_dim = dim
+        self.reduction = reduction
+        self.int8 = int8
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.fitted = False
+
+    def fit(self, vectors: np.ndarray, sample: int = 20_000, seed: int = 0) -> "VectorCompressor":
+        """Fits the projection and quantization scales on (a sample of) the stored vectors."""
+        if len(vectors) > sample:
+            vectors = vectors[np.sort(np.random.RandomState(seed).choice(len(vectors), sample, replace=False))]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = min(self.dim or vectors.shape[1], vectors.shape[1])
+        if self.reduction == "pca" and dim < vectors.shape[1]:
+            self.mean = vectors.mean(axis=0)
+            # Components beyond the sample size carry no information, so keep at most that many
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            self.components = vt[:dim].T.astype(np.float32)
+            dim = self.components.shape[1]
+        else:
+            self.mean, self.components = None, None
+        self.dim = dim
+        if self.int8:
+            reduced = self.project(vectors)
+            self.scale = np.maximum(np.abs(reduced).max(axis=0), 1e-6).astype(np.float32) / 127.0
+        self.fitted = True
+        return self
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduces and re-normalises vectors (rows) to `dim` dimensions."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.components is not None:
+            reduced = (vectors - self.mean) @ self.components
+        else:
+            reduced = vectors[:, :self.dim]
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        return (reduced / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        reduced = self.project(vectors)
+        if not self.int8:
+            return reduced
+        return np.clip(np.rint(reduced / self.scale), -127, 127).astype(np.int8)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray, block: int = 65_536) -> np.ndarray:
+        """Approximate cosine similarity of every code row with a unit query vector."""
+        reduced = self.project(query[None, :])[0]
+        if self.int8:
+            reduced = reduced * self.scale  # fold the dequantization into the query
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block):
+            out[start:start + block] = codes[start:start + block].astype(np.float32) @ reduced
+        return out
+
+    def state(self) -> dict:
+        state = {"dim": np.int64(self.dim), "requested_dim": np.int64(self.requested_dim or 0),
+                 "reduction": np.array(self.reduction), "int8": np.bool_(self.int8)}
+        for name in ("mean", "components", "scale"):
+            if getattr(self, name) is not None:
+                state[name] = getattr(self, name)
+        return state
+
+    @classmethod
+    def from_state(cls, state) -> "VectorCompressor":
+        compressor = cls(int(state["dim"]), str(state["reduction"]), bool(state["int8"]))
+        if "requested_dim" in state:
+            compressor.requested_dim = int(state["requested_dim"]) or None
+        for name in ("mean", "components", "scale"):
+            if name in state:
+                setattr(compressor, name, np.asarray(state[name], dtype=np.float32))
+        compressor.fitted = True
+        return compressor
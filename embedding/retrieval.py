@@ -0,0 +1,32 @@
+from typing import Dict
+
+from embedding.hybridSearch import multi_hybrid_query
+from embedding.namespaces import DEFAULT_NAMESPACE, touch_namespace
+from embedding.providers import embed_queries_cached, index_name_for
+from embedding.vectorStore import get_index
+
+
+def retrieve_for_agents(queries: Dict[str, dict], namespace: str = DEFAULT_NAMESPACE,
+                        base_index_name: str = "eligibledocone") -> Dict[str, dict]:
+    """
+    Shared retrieval stage for the analysis agents.
+
+    `queries` maps a name to a query spec, {"query_text", "top_k",
+    "dense_weight"} (each agent module's RETRIEVAL_QUERY). All query texts are
+    embedded in one batched (cached) call, the vector queries run
+    concurrently, and metadata and chunk text are fetched once for the union
+    of matches. Pass each agent its entry of the result as `retrieved`.
+
+    Returns:
+        dict: name -> hybrid_query response ({"matches", "namespace"}), ranked.
+    """
+    index_name = index_name_for(base_index_name)
+    index = get_index(index_name)
+    names = list(queries)
+    vectors = embed_queries_cached([queries[name]["query_text"] for name in names])
+    responses = multi_hybrid_query(
+        index, index_name, namespace,
+        [{**queries[name], "query_vector": vector} for name, vector in zip(names, vectors)]
+    )
+    touch_namespace(index_name, namespace)
+    return dict(zip(names, responses))
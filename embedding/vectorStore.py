@@ -0,0 +1,30 @@
+import os
+
+from PreProcessing import resources
+
+# "pinecone" (hosted index) or "local" (embedding/localIndex.py, in-process and on disk)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+# Local backend only, e.g. "pca256-int8": search compressed vectors and re-score exactly
+LOCAL_VECTOR_COMPRESSION = os.getenv("LOCAL_VECTOR_COMPRESSION", "")
+
+
+def _load_local_vector_store():
+    from embedding.localIndex import LocalVectorStore, compression_options
+    return LocalVectorStore(**compression_options(LOCAL_VECTOR_COMPRESSION))
+
+
+resources.register("local_vector_store", _load_local_vector_store)
+
+
+def is_local(backend: str = None) -> bool:
+    return (backend or VECTOR_BACKEND) == "local"
+
+
+def get_index(index_name: str, backend: str = None):
+    """
+    Returns the index used for upserts and queries. Both backends expose the
+    same upsert/query(namespace, vector, top_k, include_metadata) surface.
+    """
+    if is_local(backend):
+        return resources.get("local_vector_store").Index(index_name)
+    return resources.get("pinecone").Index(index_name)
@@ -2,6 +2,7 @@ import streamlit as st
 import json
 import os
 import re
+import tempfile
 from PIL import Image
 import pandas as pd
 
@@ -9,10 +10,18 @@ import pandas as pd
 from PreProcessing.Chunking import semantic_chunk_pdf_json
 from PreProcessing.create_embedding import generate_embeddings_with_keywords
 from PreProcessing.extractComData import extract_company_data
-from Agents.compliance_check import run_compliance_check
-from Agents.contractRisk import analyze_contract_risks
-from Agents.mandatoryEligibility import extract_eligibility_criteria
-from Agents.submissionCheck import generate_submission_checklist
+from Agents.compliance_check import RETRIEVAL_QUERY as COMPLIANCE_QUERY, run_compliance_check
+from Agents.contractRisk import RETRIEVAL_QUERY as RISK_QUERY, analyze_contract_risks
+from Agents.mandatoryEligibility import RETRIEVAL_QUERY as ELIGIBILITY_QUERY, extract_eligibility_criteria
+from Agents.submissionCheck import RETRIEVAL_QUERY as SUBMISSION_QUERY, generate_submission_checklist
+from Agents.orchestrator import results_of, run_agents
+from PreProcessing import resources
+from embedding.namespaces import cleanup_expired_namespaces, document_namespace
+from embedding.retrieval import retrieve_for_agents
+
+# Models and clients load on first use; set PREWARM_RESOURCES (e.g.
+# "pinecone,tiktoken,sentence_embedder") to load them in the background instead
+resources.prewarm_from_env()
 
 # Set page config
 st.set_page_config(page_title="RFP Analysis Tool", layout="wide")
@@ -79,6 +88,12 @@ def parse_json_safely(data):
             return {"error": "Could not parse JSON data"}
     return data if isinstance(data, dict) else {"error": "Data is not a dictionary"}
 
+# Uploads go to their own temp file, so concurrent sessions never overwrite each other's
+def save_upload(uploaded_file, suffix):
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        f.write(uploaded_file.getbuffer())
+        return f.name
+
 # Session state initialization
 if 'company_data' not in st.session_state:
     st.session_state.company_data = None
@@ -113,64 +128,69 @@ with col2:
 if st.button("Process Documents", disabled=(rfp_file is None or company_file is None)):
     with st.spinner("Processing documents..."):
         # Save uploaded files temporarily
-        temp_rfp_path = f"temp_rfp.pdf"
-        temp_company_path = f"temp_company.docx"
-        
-        with open(temp_rfp_path, "wb") as f:
-            f.write(rfp_file.getbuffer())
-        
-        with open(temp_company_path, "wb") as f:
-            f.write(company_file.getbuffer())
-        
-        # Process RFP
-        st.info("Creating semantic chunks from RFP...")
-        # rfp_chunks = semantic_chunk_pdf_json(temp_rfp_path)
-        # st.session_state.rfp_chunks = rfp_chunks
-        
-        st.info("Generating embeddings...")
-        # embeddings = generate_embeddings_with_keywords(rfp_chunks)
-        # st.session_state.embeddings = embeddings
-        company_data = extract_company_data(temp_company_path)
-        # Process Company Data
-        st.info("Extracting company data...")
-        
-        st.session_state.company_data = parse_json_safely(company_data)
-        
-        # Run analysis
-        st.info("Running compliance check...")
+        temp_rfp_path = save_upload(rfp_file, ".pdf")
+        temp_company_path = save_upload(company_file, ".docx")
         try:
-            compliance_check = run_compliance_check(company_data)
-            st.session_state.compliance_check = compliance_check
-        except Exception as e:
-            st.session_state.compliance_check = compliance_check
+            # Each RFP gets its own namespace keyed by its content, so concurrent
+            # analyses don't read each other's chunks and re-uploads reuse vectors
+            namespace = document_namespace(temp_rfp_path)
+            st.session_state.namespace = namespace
 
+            # Process RFP
+            st.info("Creating semantic chunks from RFP...")
+            # Sentences of an RFP uploaded again (or amended) come from the on-disk embedding cache
+            rfp_chunks = semantic_chunk_pdf_json(temp_rfp_path, use_cache=True)
+            st.session_state.rfp_chunks = rfp_chunks
         
-        st.info("Extracting eligibility criteria...")
-        try:
-            eligibility_criteria = extract_eligibility_criteria(company_data)
-            st.session_state.eligibility_criteria = eligibility_criteria
-        except Exception as e:
-            st.session_state.eligibility_criteria = eligibility_criteria
-
-
-        st.info("Generating submission checklist...")
-        try:
-            submission_checklist = generate_submission_checklist()
-            st.session_state.submission_checklist = submission_checklist
-        except Exception as e:
-            st.session_state.submission_checklist = submission_checklist
+            st.info("Generating embeddings...")
+            embeddings = generate_embeddings_with_keywords(rfp_chunks, namespace=namespace, document_id=namespace)
+            st.session_state.embeddings = embeddings
+            company_data = extract_company_data(temp_company_path)
+            # Process Company Data
+            st.info("Extracting company data...")
+        
+            st.session_state.company_data = parse_json_safely(company_data)
+        
+            # One retrieval pass for all agents: a batched query embedding, concurrent
+            # index queries and a single read of the matched chunks
+            st.info("Retrieving relevant RFP sections...")
+            try:
+                retrieved = retrieve_for_agents({
+                    "compliance": COMPLIANCE_QUERY,
+                    "eligibility": ELIGIBILITY_QUERY,
+                    "submission": SUBMISSION_QUERY,
+                    "risk": RISK_QUERY,
+                }, namespace)
+            except Exception as e:
+                print(f"⚠️ Shared retrieval failed, agents will retrieve on their own: {e}")
+                retrieved = {}
 
+            # Run the agents concurrently; one failing or timing out leaves the others' results
+            st.info("Running compliance check, eligibility extraction, submission checklist and contract risk analysis...")
+            outcomes = run_agents({
+                "compliance_check": lambda: run_compliance_check(company_data, namespace, retrieved.get("compliance")),
+                "eligibility_criteria": lambda: extract_eligibility_criteria(company_data, namespace, retrieved.get("eligibility")),
+                "submission_checklist": lambda: generate_submission_checklist(namespace, retrieved.get("submission")),
+                "contract_risks": lambda: analyze_contract_risks(company_data, namespace, retrieved.get("risk")),
+            })
+            for name, outcome in outcomes.items():
+                if outcome["status"] != "ok":
+                    st.warning(f"{name.replace('_', ' ').capitalize()} {outcome['status']}: {outcome['error'] or 'no result'}")
+            results = results_of(outcomes)
+            st.session_state.compliance_check = results["compliance_check"]
+            st.session_state.eligibility_criteria = results["eligibility_criteria"]
+            st.session_state.submission_checklist = results["submission_checklist"]
+            st.session_state.contract_risks = results["contract_risks"] or {}
+        finally:
+            # Clean up temp files, also when a step fails
+            os.remove(temp_rfp_path)
+            os.remove(temp_company_path)
 
-        st.info("Analyzing contract risks...")
+        # Drop namespaces of RFPs nobody has analyzed within NAMESPACE_TTL_HOURS
         try:
-            contract_risks = analyze_contract_risks(company_data)
-            st.session_state.contract_risks = contract_risks
+            cleanup_expired_namespaces()
         except Exception as e:
-            st.session_state.contract_risks = {}
-        
-        # Clean up temp files
-        os.remove(temp_rfp_path)
-        os.remove(temp_company_path)
+            print(f"⚠️ Namespace cleanup failed: {e}")
         
         st.session_state.processing_complete = True
         st.success("Processing complete!")
@@ -0,0 +1,109 @@
+import re
+from collections import Counter
+
+import pytest
+import tiktoken
+
+from PreProcessing import Chunking, resources
+
+# cl100k_base's pre-tokenizer, so the trained encoding splits text the way the real one does
+CL100K_PATTERN = (r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*"""
+                  r"""|\s*[\r\n]|\s+(?!\S)|\s+""")
+
+SENTENCES = [
+    "The contractor shall provide weekly status reports to the contracting officer.",
+    "Proposals must not exceed 25 pages, excluding the table of contents and appendices.",
+    "Key personnel must hold an active clearance; résumés are required for each of them.",
+    "Le soumissionnaire doit fournir une garantie de soumission égale à 5 % du prix.",
+    "बोलीदाता को पिछले तीन वर्षों का लेखा परीक्षित वित्तीय विवरण जमा करना होगा।",
+    "投标人必须在截止日期前提交所有文件，逾期将不予受理。",
+    "Late submissions 🚫 will not be evaluated ✅ under any circumstances.",
+    "Ok.",
+    "See §4.",
+    "—",
+    "Payment terms are net 30 days from receipt of a proper invoice (FAR 52.232-25).",
+    "All deliverables are subject to review and approval by the contracting officer.",
+]
+
+
+def train_encoding(corpus: str, merges: int = 400) -> tiktoken.Encoding:
+    """Small byte-level BPE trained on the test corpus, for machines without the cl100k_base download."""
+    ranks = {bytes([b]): b for b in range(256)}
+    words = [[bytes([b]) for b in word.encode("utf-8")] for word in re.findall(r" ?\S+|\s+", corpus)]
+    for _ in range(merges):
+        pairs = Counter(pair for word in words for pair in zip(word, word[1:]))
+        if not pairs:
+            break
+        (left, right), _count = pairs.most_common(1)[0]
+        ranks[left + right] = len(ranks)
+        for word in words:
+            i = 0
+            while i < len(word) - 1:
+                if word[i] == left and word[i + 1] == right:
+                    word[i:i + 2] = [left + right]
+                i += 1
+    return tiktoken.Encoding("test_bpe", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={})
+
+
+@pytest.fixture(params=["trained", "cl100k_base"])
+def encoding(request, monkeypatch):
+    if request.param == "trained":
+        encoding = train_encoding(" ".join(SENTENCES * 3))
+    else:
+        try:
+            encoding = resources.get("tiktoken")
+        except Exception as e:
+            pytest.skip(f"cl100k_base is not available: {e}")
+    monkeypatch.setattr(Chunking, "encoding", encoding)
+    return encoding
+
+
+def old_merge_chunks(clusters, max_tokens=1500, overlap_tokens=50):
+    """merge_chunks before tail_tokens: the whole chunk is re-encoded at every boundary."""
+    encoding = Chunking.encoding
+    final_chunks = []
+    for cluster in clusters:
+        current_chunk = []
+        current_token_count = 0
+        for sentence in cluster:
+            sentence_token_count = len(encoding.encode(sentence))
+            if current_token_count + sentence_token_count > max_tokens:
+                chunk_text = " ".join(current_chunk).strip()
+                final_chunks.append(chunk_text)
+                all_tokens = encoding.encode(chunk_text)
+                overlap_text = encoding.decode(all_tokens[-overlap_tokens:])
+                current_chunk = [overlap_text.strip(), sentence]
+                current_token_count = len(encoding.encode(current_chunk[0])) + sentence_token_count
+            else:
+                current_chunk.append(sentence)
+                current_token_count += sentence_token_count
+        if current_chunk:
+            final_chunks.append(" ".join(current_chunk).strip())
+    return final_chunks
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 7, 20, 60, 500])
+def test_tail_tokens_equals_encoding_the_whole_chunk(encoding, n):
+    for start in range(len(SENTENCES)):
+        for end in range(start + 1, len(SENTENCES) + 1):
+            pieces = SENTENCES[start:end]
+            chunk_text = " ".join(pieces).strip()
+            counts = [len(encoding.encode(piece)) for piece in pieces]
+            assert Chunking.tail_tokens(pieces, counts, chunk_text, n) == encoding.encode(chunk_text)[-n:]
+
+
+def test_tail_tokens_with_pieces_that_are_not_stripped(encoding):
+    # Overlap pieces come from decoding a token slice and may be empty or carry spaces
+    pieces = ["", "  leading", SENTENCES[4], "trailing ", SENTENCES[5], "line\n", "42", "  ", SENTENCES[7], "end\n\n", "§4"]
+    chunk_text = " ".join(pieces).strip()
+    counts = [len(encoding.encode(piece)) for piece in pieces]
+    for n in range(0, 40):
+        assert Chunking.tail_tokens(pieces, counts, chunk_text, n) == encoding.encode(chunk_text)[-n:]
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [
+    (20, 5), (30, 10), (40, 25), (60, 50), (25, 100), (200, 50), (1500, 50),
+])
+def test_merge_chunks_matches_full_re_encoding(encoding, max_tokens, overlap_tokens):
+    clusters = [SENTENCES, SENTENCES[::-1], SENTENCES[4:7] * 4, ["Ok.", "See §4.", "—"] * 10, []]
+    assert Chunking.merge_chunks(clusters, max_tokens, overlap_tokens) == old_merge_chunks(clusters, max_tokens, overlap_tokens)
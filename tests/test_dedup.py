@@ -0,0 +1,22 @@
+from PreProcessing.dedup import dedupe_chunks
+
+CLAUSE = ("The contractor shall provide weekly status reports to the contracting officer including staffing "
+          "levels, open positions and any issues affecting delivery of the services described in this section. "
+          "Reports are due by the fifth business day of each month and must be submitted electronically through "
+          "the portal designated by the agency, with copies retained for the duration of the contract and made "
+          "available for audit upon request by the agency or its authorized representatives")
+
+
+def test_default_merges_exact_copies_only():
+    data = [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": CLAUSE.upper() + "."},
+            {"id": 3, "chunk": CLAUSE + " as amended"}]
+    unique, assignment, _ = dedupe_chunks(data)
+    assert assignment == [0, 0, 1]
+    assert unique[0]["sources"] == ["1", "2"]
+
+
+def test_fuzzy_merge_keeps_negated_and_renumbered_clauses_apart():
+    data = [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": CLAUSE.replace("shall", "shall not")},
+            {"id": 3, "chunk": CLAUSE.replace("weekly", "30 day")}, {"id": 4, "chunk": CLAUSE + " as amended"}]
+    _, assignment, _ = dedupe_chunks(data, threshold=0.8)
+    assert assignment == [0, 1, 2, 0]
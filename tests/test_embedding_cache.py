@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+
+from PreProcessing.embeddingCache import EmbeddingCache
+
+DIM = 4
+
+
+def fake_encode(texts):
+    """Deterministic vectors that differ per text."""
+    return np.array([[sum(map(ord, text)) + i for i in range(DIM)] for text in texts], dtype=np.float32)
+
+
+def test_two_instances_on_one_directory_never_share_a_slot(tmp_path):
+    a = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    b = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+
+    a.encode(["query one"], fake_encode)
+    b.encode(["query two"], fake_encode)
+    a.encode(["query three"], fake_encode)
+
+    fresh = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    texts = ["query one", "query two", "query three"]
+    np.testing.assert_array_equal(fresh.encode(texts, no_encode), fake_encode(texts))
+    # Instances opened before the others wrote see their entries too
+    np.testing.assert_array_equal(a.encode(texts, no_encode), fake_encode(texts))
+    np.testing.assert_array_equal(b.encode(texts, no_encode), fake_encode(texts))
+
+
+def test_eviction_by_another_instance_is_not_read_under_the_old_key(tmp_path):
+    a = EmbeddingCache("model", DIM, cache_dir=str(tmp_path), max_entries=1)
+    b = EmbeddingCache("model", DIM, cache_dir=str(tmp_path), max_entries=1)
+
+    a.encode(["first"], fake_encode)
+    b.encode(["second"], fake_encode)  # reuses the only slot
+
+    np.testing.assert_array_equal(a.encode(["first"], fake_encode), fake_encode(["first"]))
+    assert a.misses == 2
+
+
+def no_encode(texts):
+    raise AssertionError(f"unexpected encode of {texts}")
+
+
+def test_batches_are_journaled_instead_of_rewriting_the_index(tmp_path, monkeypatch):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    rewrites = []
+    save = cache._save
+    monkeypatch.setattr(cache, "_save", lambda: rewrites.append(1) or save())
+    texts = [f"sentence {i}" for i in range(20)]
+    for text in texts:
+        cache.encode([text], fake_encode)
+    assert rewrites == []
+
+    np.testing.assert_array_equal(EmbeddingCache("model", DIM, cache_dir=str(tmp_path)).encode(texts, no_encode),
+                                  fake_encode(texts))
+    cache.save()
+    assert rewrites == [1] and os.path.getsize(cache.journal_path) == 0
+    np.testing.assert_array_equal(EmbeddingCache("model", DIM, cache_dir=str(tmp_path)).encode(texts, no_encode),
+                                  fake_encode(texts))
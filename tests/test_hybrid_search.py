@@ -0,0 +1,103 @@
+from embedding.contentStore import get_content_store
+from embedding.fakePinecone import FakePinecone
+from embedding.hybridSearch import hybrid_query
+from embedding.lexicalIndex import BM25Index, get_lexical_index, tokenize
+from PreProcessing.create_embedding import generate_embeddings_with_keywords
+
+CHUNKS = [
+    "Offerors must be registered in SAM.gov and list their CAGE code on the cover page.",
+    "The contractor shall provide weekly status reports to the contracting officer.",
+    "Proposals are limited to 25 pages in 12 point font with one inch margins.",
+    "Key personnel must hold an active security clearance at the time of award.",
+    "Payment terms are net 30 days from receipt of a proper invoice.",
+]
+
+
+def ingest(client, chunks, namespace):
+    data = [{"id": position + 1, "chunk": chunk} for position, chunk in enumerate(chunks)]
+    generate_embeddings_with_keywords(data, index_name="test", dimension=8, namespace=namespace, dedupe_threshold=None,
+                                      document_id="rfp.pdf", client=client)
+    return client.Index("test-8d")
+
+
+def texts_of(index, namespace):
+    """Vector ID -> chunk text; the text lives in the content store, not in the vectors' metadata."""
+    return get_content_store().get_many("test-8d", namespace, list(index.namespaces[namespace]))
+
+
+def ids_of(response):
+    return [match["id"] for match in response["matches"]]
+
+
+def test_bm25_ranks_documents_with_the_query_terms_first(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.json"))
+    index.add((str(position), chunk) for position, chunk in enumerate(CHUNKS))
+
+    assert index.search("CAGE code")[0][0] == "0"
+    assert [doc_id for doc_id, _ in index.search("security clearance")] == ["3"]
+    assert index.search("contracting officer status")[0][0] == "1"
+    assert index.search("zebra giraffe") == []
+    # Compound tokens are indexed whole and by their parts
+    assert {"sam.gov", "sam", "gov"} <= set(tokenize("SAM.gov"))
+    assert index.search("gov")[0][0] == "0"
+
+
+def test_bm25_prefers_rarer_terms_and_shorter_documents(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.json"))
+    index.add([("short", "invoice payment"), ("long", "invoice payment " + "filler words " * 20),
+               ("common", "payment payment schedule")])
+    # "invoice" is in two documents, so it outweighs "payment", which is in all three
+    assert [doc_id for doc_id, _ in index.search("invoice payment")] == ["short", "long", "common"]
+
+
+def test_bm25_survives_a_save_and_reload(tmp_path):
+    path = str(tmp_path / "lexical" / "bm25.json")
+    index = BM25Index(path)
+    index.add((str(position), chunk) for position, chunk in enumerate(CHUNKS))
+    index.save()
+    assert BM25Index(path).search("weekly reports") == index.search("weekly reports")
+
+
+def test_dense_weight_zero_is_pure_bm25_and_one_is_pure_dense(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    index = ingest(client, CHUNKS, "hybrid-weights")
+    lexical = get_lexical_index("test-8d", "hybrid-weights")
+    # Query vector equal to the payment chunk's vector, query text naming the CAGE chunk's terms
+    payment_id = next(vector_id for vector_id, text in texts_of(index, "hybrid-weights").items() if "invoice" in text)
+    query_vector = index.namespaces["hybrid-weights"][payment_id]["values"]
+    query_text = "CAGE code"
+
+    lexical_ids = [doc_id for doc_id, _ in lexical.search(query_text)]
+    dense_ids = [match["id"] for match in index.query(namespace="hybrid-weights", vector=query_vector, top_k=3)["matches"]]
+    assert dense_ids[0] == payment_id and lexical_ids[0] != payment_id
+
+    pure_lexical = hybrid_query(index, "test-8d", "hybrid-weights", query_text, query_vector, top_k=3, dense_weight=0)
+    assert ids_of(pure_lexical)[0] == lexical_ids[0]
+    assert "CAGE code" in pure_lexical["matches"][0]["metadata"]["chunk"]
+
+    pure_dense = hybrid_query(index, "test-8d", "hybrid-weights", query_text, query_vector, top_k=3, dense_weight=1)
+    assert ids_of(pure_dense) == dense_ids
+
+    # In between, both retrievers' best chunks make the top 2
+    mixed = hybrid_query(index, "test-8d", "hybrid-weights", query_text, query_vector, top_k=2, dense_weight=0.5)
+    assert set(ids_of(mixed)) == {payment_id, lexical_ids[0]}
+
+
+def test_lexical_index_follows_reingestion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    ingest(client, CHUNKS, "hybrid-reingest")
+    assert get_lexical_index("test-8d", "hybrid-reingest").search("CAGE")
+
+    amended = ["Offerors must be registered in SAM.gov and list their UEI on the cover page."] + CHUNKS[1:]
+    index = ingest(client, amended, "hybrid-reingest")
+    lexical = get_lexical_index("test-8d", "hybrid-reingest")
+    assert lexical.search("CAGE") == []
+    assert len(lexical) == len(amended)
+
+    stored = index.namespaces["hybrid-reingest"]
+    response = hybrid_query(index, "test-8d", "hybrid-reingest", "UEI", [1.0] * 8, top_k=1, dense_weight=0)
+    assert ids_of(response) == [doc_id for doc_id, _ in lexical.search("UEI")]
+    assert "UEI" in response["matches"][0]["metadata"]["chunk"]
+    assert set(lexical.lengths) == set(stored)
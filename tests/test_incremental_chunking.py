@@ -0,0 +1,62 @@
+import json
+import os
+
+from PreProcessing.incrementalChunking import save_state, stable_chunk_ids
+
+# A document as its chunks: numbered sections, each ending in the same boilerplate chunk
+BOILERPLATE = "All deliverables are subject to review and approval by the contracting officer."
+DOCUMENT = [
+    "1. Scope. The contractor shall operate the help desk for all agency staff.",
+    BOILERPLATE,
+    "2. Staffing. Key personnel must hold an active security clearance.",
+    BOILERPLATE,
+    "3. Reporting. Weekly status reports are due every Monday.",
+    BOILERPLATE,
+    "4. Transition. A ninety day transition plan is required at award.",
+]
+
+
+def test_ids_are_unique_and_repeatable():
+    ids = stable_chunk_ids(DOCUMENT)
+    assert len(set(ids)) == len(DOCUMENT)
+    assert ids == stable_chunk_ids(list(DOCUMENT))
+    # Chunks that appear once are named by their content alone
+    assert ids[0] == stable_chunk_ids([DOCUMENT[0]])[0]
+
+
+def test_editing_one_section_keeps_the_other_ids():
+    edited = list(DOCUMENT)
+    edited[4] = "3. Reporting. Weekly status reports are due every Friday."
+    before, after = stable_chunk_ids(DOCUMENT), stable_chunk_ids(edited)
+    # Only the edited chunk (and at most the boilerplate copies next to it) get new IDs
+    changed = {i for i, (old, new) in enumerate(zip(before, after)) if old != new}
+    assert 4 in changed and changed <= {3, 4, 5}
+
+
+def test_inserting_an_earlier_duplicate_does_not_renumber_later_chunks():
+    inserted = DOCUMENT[:2] + ["1a. Hours. The help desk is staffed from 7am to 7pm.", BOILERPLATE] + DOCUMENT[2:]
+    before, after = stable_chunk_ids(DOCUMENT), stable_chunk_ids(inserted)
+    # The boilerplate copy just before the insertion has a new neighbour; every later ID is kept
+    assert after[0] == before[0]
+    assert after[4:] == before[2:]
+
+
+def test_removing_a_section_keeps_the_remaining_ids():
+    removed = DOCUMENT[:2] + DOCUMENT[4:]
+    before, after = stable_chunk_ids(DOCUMENT), stable_chunk_ids(removed)
+    # Only the copy that now borders the gap changes
+    assert after[0] == before[0]
+    assert after[2:] == before[4:]
+
+
+def test_copies_with_the_same_neighbours_stay_unique():
+    ids = stable_chunk_ids(["a", "b", "a", "b", "a", "b"])
+    assert len(set(ids)) == 6
+
+
+def test_save_state_creates_the_state_directory(tmp_path):
+    state_path = str(tmp_path / "fresh" / "checkout" / "state.json")
+    save_state(state_path, {"version": 1, "chunk_ids": ["a"]})
+    with open(state_path, encoding="utf-8") as f:
+        assert json.load(f)["chunk_ids"] == ["a"]
+    assert not os.path.exists(state_path + ".tmp")
@@ -0,0 +1,60 @@
+from embedding.contentStore import get_content_store
+from embedding.fakePinecone import FakePinecone
+from PreProcessing.create_embedding import generate_embeddings_with_keywords
+from PreProcessing.ingestManifest import IngestManifest
+
+CLAUSE = "Offerors shall submit three references from contracts of similar size."
+
+
+def ingest(client, data, document_id="rfp.pdf", namespace="rfp"):
+    generate_embeddings_with_keywords(data, index_name="test", dimension=8, namespace=namespace, dedupe_threshold=None,
+                                      document_id=document_id, client=client)
+    # Providers whose dimension isn't 1024 get their own index, see embedding.providers.index_name_for
+    return client.Index("test-8d").namespaces[namespace]
+
+
+def test_identical_chunks_share_one_vector_listing_every_source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    stored = ingest(client, [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": "Other text."}, {"id": 3, "chunk": CLAUSE}])
+    assert len(stored) == 2
+    assert sorted(vector["metadata"]["sources"] for vector in stored.values()) == [["1", "3"], ["2"]]
+
+
+def test_renumbered_chunks_get_their_new_sources_without_reembedding(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    ingest(client, [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": "Other text."}])
+    embedded = client.embedded_inputs
+
+    stored = ingest(client, [{"id": 1, "chunk": "New first page."}, {"id": 2, "chunk": CLAUSE},
+                             {"id": 3, "chunk": "Other text."}])
+    assert client.embedded_inputs == embedded + 1
+    assert sorted(vector["metadata"]["sources"] for vector in stored.values()) == [["1"], ["2"], ["3"]]
+
+
+def test_documents_sharing_a_chunk_keep_it_when_one_of_them_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    ingest(client, [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": "Only in A."}], "a.pdf", "shared")
+    ingest(client, [{"id": 1, "chunk": CLAUSE}, {"id": 2, "chunk": "Only in B."}], "b.pdf", "shared")
+    a_ids = set(IngestManifest("a.pdf", "test-8d", "shared").vectors.values())
+
+    stored = ingest(client, [{"id": 1, "chunk": CLAUSE + " Amended."}, {"id": 2, "chunk": "Only in B."}],
+                    "b.pdf", "shared")
+    assert a_ids <= set(stored)
+    assert set(get_content_store().get_many("test-8d", "shared", list(a_ids))) == a_ids
+
+
+def test_stale_vectors_another_manifest_lists_are_not_deleted(tmp_path, monkeypatch):
+    # Manifests written before vector IDs included the document share IDs for equal chunks
+    monkeypatch.chdir(tmp_path)
+    client = FakePinecone(dimension=8)
+    ingest(client, [{"id": 1, "chunk": CLAUSE}], "a.pdf", "legacy")
+    a = IngestManifest("a.pdf", "test-8d", "legacy")
+    b = IngestManifest("b.pdf", "test-8d", "legacy")
+    b.vectors = dict(a.vectors)
+    b.save(list(a.vectors), [["1"]])
+
+    stored = ingest(client, [{"id": 1, "chunk": "Rewritten."}], "b.pdf", "legacy")
+    assert set(a.vectors.values()) <= set(stored)
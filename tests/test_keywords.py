@@ -0,0 +1,56 @@
+import pytest
+
+from PreProcessing.keywords import ALL_KEYWORDS, KeywordMatcher, get_matcher
+
+# Chunking.CHECKPOINT_KEYWORDS before the central taxonomy, duplicates included
+OLD_CHECKPOINT_KEYWORDS = [
+    "Registration", "Certification", "Experience", "Compliance", "Eligibility", "Audit", "Security", "Turnover",
+    "GST", "Insurance", "Terminate", "Liability", "Indemnity", "Warranty", "Damages", "Penalty", "Unilateral",
+    "Amendment", "Obligation", "Exclusive", "Jurisdiction", "Force Majeure", "Non-compete", "Payment terms",
+    "Intellectual property", "Required", "Mandatory", "Must", "Minimum", "Qualification", "Criteria",
+    "Eligibility", "Prerequisite", "Essential", "Experience", "Certification", "License", "Registration",
+    "submit", "submission", "requirement", "format", "guideline", "instruction", "page limit", "page count",
+    "font", "margin", "spacing", "attachment", "form", "deadline", "due date", "table of contents", "TOC",
+    "appendix", "header", "footer", "binding", "electronic", "hard copy", "template",
+]
+
+TEXTS = [
+    "The agency may have terminated the contract; termination requires written notice.",
+    "Proposals submitted after the deadline are rejected. Submission must be formatted per the template.",
+    "Only licensed vendors with general liability Insurance and a GST registration are eligible.",
+    "Past performance, the platform protocol and the formal TOC are reviewed at the MUST-attend meeting.",
+    "",
+]
+
+
+def old_extract_keywords(text):
+    lowered = text.lower()
+    return [keyword for keyword in OLD_CHECKPOINT_KEYWORDS if keyword.lower() in lowered]
+
+
+def test_taxonomy_keeps_every_old_keyword():
+    assert set(ALL_KEYWORDS) >= set(OLD_CHECKPOINT_KEYWORDS)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_default_matching_equals_the_old_substring_test(text):
+    expected = list(dict.fromkeys(old_extract_keywords(text)))
+    assert sorted(get_matcher().keywords_in(text)) == sorted(expected)
+
+
+def test_offsets_include_keywords_inside_longer_ones():
+    found = KeywordMatcher(["form", "format"]).match("Formatted forms")
+    assert found == {"form": {"count": 2, "offsets": [(0, 4), (10, 14)]}, "format": {"count": 1, "offsets": [(0, 6)]}}
+
+
+@pytest.mark.parametrize("text, keyword", [
+    ("terminated", "Terminate"), ("submitted", "submit"), ("submitting", "submit"),
+    ("licensed", "License"), ("requirements", "requirement"), ("attachments", "attachment"),
+])
+def test_whole_words_still_match_inflections(text, keyword):
+    assert get_matcher(whole_words=True).keywords_in(f"The {text} item") == [keyword]
+
+
+@pytest.mark.parametrize("text", ["performance", "platform", "protocol", "termination"])
+def test_whole_words_skip_keywords_inside_other_words(text):
+    assert get_matcher(whole_words=True).keywords_in(f"The {text} item") == []
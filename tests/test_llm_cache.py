@@ -0,0 +1,43 @@
+from PreProcessing import llmCache
+from PreProcessing.llmCache import LLMResponseCache, generate_text, parse_json_response
+
+
+class ScriptedBackend:
+    name = "scripted"
+    cacheable = True
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def generate(self, model_name, generation_config, prompt):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_malformed_json_is_not_cached(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llmCache, "get_llm_cache", lambda: cache)
+    backend = ScriptedBackend('{"passed": tr', '```json\n{"passed": true}\n```')
+
+    def ask():
+        return generate_text("model", {}, "Return JSON", backend=backend, validate=parse_json_response)
+
+    assert ask() == '{"passed": tr'
+    assert parse_json_response(ask()) == {"passed": True}
+    assert parse_json_response(ask()) == {"passed": True}
+    assert backend.calls == 2
+
+
+def test_cached_response_failing_validation_is_a_dropped_miss(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llmCache, "get_llm_cache", lambda: cache)
+    # Stored without validation, e.g. by a free-text caller or an older version
+    generate_text("model", {}, "Return JSON", backend=ScriptedBackend('{"passed": tr'))
+
+    backend = ScriptedBackend('{"passed": true}')
+    assert generate_text("model", {}, "Return JSON", backend=backend, validate=parse_json_response) == '{"passed": true}'
+    assert backend.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (0, 2, 1)
+    assert cache.get(llmCache.response_key("model", {}, "Return JSON", "scripted")) == '{"passed": true}'
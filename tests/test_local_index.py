@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from embedding.localIndex import LocalIndex
+
+DIM = 8
+
+
+def vectors(start: int, count: int):
+    rng = np.random.default_rng(start)
+    return [{"id": f"v{i}", "values": rng.standard_normal(DIM).tolist(), "metadata": {"n": i}}
+            for i in range(start, start + count)]
+
+
+def test_deferred_save_writes_each_namespace_once(tmp_path, monkeypatch):
+    index = LocalIndex("test", store_dir=str(tmp_path))
+    saved = []
+    save = index.save
+    monkeypatch.setattr(index, "save", lambda namespace=None: saved.append(namespace) or save(namespace))
+
+    with index.deferred_save():
+        for start in range(0, 50, 10):
+            index.upsert(vectors(start, 10), namespace="rfp")
+        index.delete(ids=["v0"], namespace="rfp")
+        assert saved == []
+    assert saved == ["rfp"]
+
+    reloaded = LocalIndex("test", store_dir=str(tmp_path))
+    assert reloaded.describe_index_stats()["namespaces"]["rfp"]["vector_count"] == 49
+
+
+def test_small_compressed_namespace_reuses_its_codes_on_load(tmp_path, monkeypatch):
+    # PCA keeps at most as many components as there are vectors, here 5 of the 6 requested
+    index = LocalIndex("test", store_dir=str(tmp_path), reduced_dim=6)
+    index.upsert(vectors(0, 5), namespace="rfp")
+    assert index.namespaces["rfp"].compressor.dim == 5
+
+    monkeypatch.setattr(LocalIndex, "_encode_store", lambda *args, **kwargs: pytest.fail("codes were refit on load"))
+    reloaded = LocalIndex("test", store_dir=str(tmp_path), reduced_dim=6)
+    assert reloaded.query(namespace="rfp", vector=vectors(0, 1)[0]["values"], top_k=1)["matches"][0]["id"] == "v0"
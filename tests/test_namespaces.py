@@ -0,0 +1,22 @@
+import time
+
+from embedding.fakePinecone import FakePinecone
+from embedding.namespaces import _load_registry, cleanup_expired_namespaces, touch_namespace
+
+
+def test_cleanup_finds_namespaces_of_dimension_specific_indexes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = str(tmp_path / "namespaces.json")
+    client = FakePinecone(dimension=8)
+    index = client.Index("eligibledocone-384d")
+    index.upsert([{"id": "a", "values": [1.0] * 8, "metadata": {}}], namespace="rfp-old")
+    touch_namespace("eligibledocone-384d", "rfp-old", registry_path=registry)
+    touch_namespace("eligibledocone-384d", "rfp-new", registry_path=registry)
+    monkeypatch.setattr(time, "time", lambda now=time.time(): now + 3600)
+    touch_namespace("eligibledocone-384d", "rfp-new", registry_path=registry)
+
+    deleted = cleanup_expired_namespaces(ttl_seconds=60, index=index, registry_path=registry)
+
+    assert deleted == ["rfp-old"]
+    assert "rfp-old" not in index.namespaces
+    assert list(_load_registry(registry)["eligibledocone-384d"]) == ["rfp-new"]
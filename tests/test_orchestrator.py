@@ -0,0 +1,73 @@
+import threading
+import time
+
+from Agents.orchestrator import results_of, run_agents
+from PreProcessing.llmBackends import FakeLLMBackend
+from PreProcessing.llmCache import generate_text
+
+
+def agent(prompt, **backend_options):
+    """An agent that makes one LLM call through a fake backend with injected latency or failures."""
+    backend = FakeLLMBackend(responses={prompt: f"{prompt} done"}, **backend_options)
+    return lambda: generate_text("fake-model", {}, prompt, backend=backend)
+
+
+def test_slow_and_failing_agents_do_not_hold_up_the_others():
+    finished = []
+    started = time.monotonic()
+    outcomes = run_agents({
+        "slow": agent("slow", latency=0.6),
+        "failing": agent("failing", latency=0.05, failure_rate=1.0),
+        "fast": agent("fast", latency=0.05),
+    }, on_done=lambda name, outcome: finished.append(name))
+    elapsed = time.monotonic() - started
+
+    assert list(outcomes) == ["slow", "failing", "fast"]
+    assert finished[-1] == "slow"
+    assert [outcome["status"] for outcome in outcomes.values()] == ["ok", "error", "ok"]
+    assert "FakeLLMError" in outcomes["failing"]["error"]
+    assert outcomes["fast"]["seconds"] < 0.5
+    # Concurrent: about as long as the slowest agent, not the sum
+    assert elapsed < 1.0
+    assert results_of(outcomes, default="n/a") == {"slow": "slow done", "failing": "n/a", "fast": "fast done"}
+
+
+def test_results_follow_agent_order_not_completion_order():
+    latencies = {"a": 0.3, "b": 0.2, "c": 0.1, "d": 0.0}
+    finished = []
+    outcomes = run_agents({name: agent(name, latency=latency) for name, latency in latencies.items()},
+                          on_done=lambda name, outcome: finished.append(name))
+    assert finished == ["d", "c", "b", "a"]
+    assert list(outcomes) == list(results_of(outcomes)) == ["a", "b", "c", "d"]
+    assert list(results_of(outcomes).values()) == ["a done", "b done", "c done", "d done"]
+
+
+def test_agent_past_its_timeout_is_abandoned():
+    started = time.monotonic()
+    outcomes = run_agents({
+        "stuck": agent("stuck", latency=2.0),
+        "fast": agent("fast", latency=0.05),
+    }, timeouts={"stuck": 0.2})
+    assert time.monotonic() - started < 1.5
+    assert outcomes["stuck"]["status"] == "timeout"
+    assert outcomes["stuck"]["result"] is None
+    assert outcomes["fast"]["status"] == "ok"
+
+
+def test_injected_failures_only_affect_their_own_agent():
+    # A seeded 50% failure rate: agents 4 and 7 fail, every other agent still gets its result
+    outcomes = run_agents({f"agent{i}": agent(f"agent{i}", latency=0.01, failure_rate=0.5, seed=i) for i in range(8)})
+    assert [name for name, outcome in outcomes.items() if outcome["status"] == "error"] == ["agent4", "agent7"]
+    for name, outcome in outcomes.items():
+        assert outcome["result"] == (f"{name} done" if outcome["status"] == "ok" else None)
+
+
+def test_cancel_skips_agents_that_have_not_started():
+    cancel = threading.Event()
+    outcomes = run_agents({
+        "first": agent("first", latency=0.05),
+        "second": agent("second", latency=0.05),
+        "third": agent("third", latency=0.05),
+    }, max_workers=1, cancel=cancel, on_done=lambda name, outcome: cancel.set())
+    assert outcomes["first"]["status"] == "ok"
+    assert outcomes["third"]["status"] == "cancelled"
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from embedding.providers import LocalEmbeddingProvider
+from PreProcessing import resources
+
+
+class FakeSentenceTransformer:
+    def __init__(self, model_name, dimension):
+        self.model_name = model_name
+        self.dimension = dimension
+
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), self.dimension), dtype=np.float32) / np.sqrt(self.dimension)
+
+
+def test_local_provider_embeds_with_the_model_it_is_named_after(monkeypatch):
+    loaded = []
+
+    def load(model_name=None):
+        loaded.append(model_name)
+        return FakeSentenceTransformer(model_name, 768)
+
+    monkeypatch.setattr(resources, "_load_sentence_embedder", load)
+    provider = LocalEmbeddingProvider(model="test-mpnet-768", dimension=768)
+
+    assert len(provider.embed_passages(["a", "b"])[0]) == 768
+    provider.embed_queries(["c"])
+    assert loaded == ["test-mpnet-768"]
+
+
+def test_local_provider_rejects_vectors_of_another_dimension(monkeypatch):
+    monkeypatch.setattr(resources, "_load_sentence_embedder", lambda model_name=None: FakeSentenceTransformer(model_name, 384))
+    provider = LocalEmbeddingProvider(model="test-minilm-384", dimension=768)
+    with pytest.raises(ValueError, match="384-d"):
+        provider.embed_passages(["a"])
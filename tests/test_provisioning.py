@@ -0,0 +1,35 @@
+import gc
+import weakref
+
+import pytest
+
+from embedding import provisioning
+from embedding.fakePinecone import FakePinecone
+from embedding.provisioning import ensure_index
+
+
+def test_cached_index_is_checked_against_later_settings():
+    client = FakePinecone(dimension=8)
+    ensure_index(client, "rfp", dimension=8)
+
+    assert ensure_index(client, "rfp", dimension=8)["dimension"] == 8
+    with pytest.raises(ValueError, match="dimension 8, expected 384"):
+        ensure_index(client, "rfp", dimension=384)
+    with pytest.raises(ValueError, match="metric 'cosine', expected 'dotproduct'"):
+        ensure_index(client, "rfp", dimension=8, metric="dotproduct")
+
+
+def test_cache_does_not_outlive_its_client():
+    client = FakePinecone(dimension=8)
+    ensure_index(client, "rfp", dimension=8)
+    assert "rfp" in provisioning._known_indexes[client]
+    collected = weakref.ref(client)
+
+    del client
+    gc.collect()
+    assert collected() is None
+
+    # Even if the new client reuses the old one's id, its index is created rather than assumed
+    fresh = FakePinecone(dimension=8)
+    ensure_index(fresh, "rfp", dimension=8)
+    assert "rfp" in fresh.indexes
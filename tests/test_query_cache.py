@@ -0,0 +1,49 @@
+import multiprocessing
+
+import numpy as np
+
+DIM = 8
+
+
+class FakeProvider:
+    model = "fake-query-model"
+    dimension = DIM
+
+    def embed_queries(self, texts):
+        return [[float(sum(map(ord, text)) + i) for i in range(DIM)] for text in texts]
+
+
+def embed_in_process(cache_dir: str, prefix: str, count: int, queue):
+    import os
+    os.environ["QUERY_CACHE_DIR"] = cache_dir
+    from embedding.providers import embed_queries_cached
+
+    for i in range(count):
+        embed_queries_cached([f"{prefix} query {i}"], FakeProvider())
+    queue.put(prefix)
+
+
+def test_processes_sharing_the_query_cache_get_their_own_vectors(tmp_path, monkeypatch):
+    # A prewarm job and the app writing to the same cache at the same time
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workers = [context.Process(target=embed_in_process, args=(str(tmp_path), prefix, 50, queue))
+               for prefix in ("prewarm", "app")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    assert sorted(queue.get(timeout=5) for _ in workers) == ["app", "prewarm"]
+
+    from embedding import providers
+    monkeypatch.setattr(providers, "QUERY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(providers, "_query_caches", {})
+
+    def no_embed(texts):
+        raise AssertionError(f"unexpected embed of {texts}")
+
+    provider = FakeProvider()
+    monkeypatch.setattr(provider, "embed_queries", no_embed)
+    texts = [f"{prefix} query {i}" for prefix in ("prewarm", "app") for i in range(50)]
+    np.testing.assert_array_equal(np.asarray(providers.embed_queries_cached(texts, provider)),
+                                  np.asarray(FakeProvider().embed_queries(texts)))
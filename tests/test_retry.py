@@ -0,0 +1,55 @@
+import pytest
+
+from embedding.fakePinecone import FakePinecone, FakePineconeError
+from PreProcessing import create_embedding
+from PreProcessing.create_embedding import is_transient, with_retry
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(create_embedding.time, "sleep", delays.append)
+    return delays
+
+
+def failing(*errors):
+    errors = list(errors)
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    return call
+
+
+def test_transient_errors_are_retried(sleeps):
+    call = failing(TimeoutError("read timed out"), HTTPError(429), HTTPError(503),
+                   FakePineconeError("Injected failure in upsert", transient=True))
+    assert with_retry(call, max_retries=5) == "ok"
+    assert len(sleeps) == 4
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("Vector dimension 8 does not match namespace dimension 16"),
+    HTTPError(401),
+    HTTPError(400),
+])
+def test_deterministic_errors_surface_without_retrying(sleeps, error):
+    with pytest.raises(type(error)):
+        with_retry(failing(error), max_retries=5)
+    assert sleeps == []
+
+
+def test_oversized_fake_upsert_is_not_retried(sleeps):
+    index = FakePinecone(dimension=2, max_upsert_vectors=1).Index("test")
+    vectors = [{"id": str(i), "values": [1.0, 0.0]} for i in range(2)]
+    with pytest.raises(FakePineconeError, match="Too many vectors"):
+        with_retry(lambda: index.upsert(vectors=vectors, namespace="ns"))
+    assert sleeps == []
+    assert not is_transient(FakePineconeError("Too many vectors: 2 > 1"))